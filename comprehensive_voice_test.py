@@ -19,128 +19,27 @@ project_root = Path(__file__).parent
 sys.path.append(str(project_root))
 
 from core.voice_clone_detection_production import VoiceCloneDetectionProduction
+from core.synthetic_voices import SyntheticVoiceGenerator
 
 class ComprehensiveVoiceTester:
     """Test voice clone detection with various audio samples"""
     
-    def __init__(self):
+    def __init__(self, seed: int = None):
         self.detector = VoiceCloneDetectionProduction()
+        self.voice_generator = SyntheticVoiceGenerator(sample_rate=22050, seed=seed)
         self.test_results = []
         print("🧪 Comprehensive Voice Clone Detection Tester")
         print("=" * 60)
     
     def generate_real_voice_sample(self, duration: float = 3.0) -> np.ndarray:
         """Generate a realistic human voice sample"""
-        sr = 22050
-        samples = int(duration * sr)
-        t = np.linspace(0, duration, samples)
-        
-        # Human voice characteristics
-        base_freq = np.random.uniform(120, 200)  # Typical human range
-        
-        # Natural harmonic series with realistic weights
-        harmonics = [1, 2, 3, 4, 5, 6]
-        harmonic_weights = [1.0, 0.6, 0.4, 0.25, 0.15, 0.1]
-        
-        # Natural vibrato (4-6 Hz)
-        vibrato_rate = np.random.uniform(4.5, 5.5)
-        vibrato_depth = 0.04
-        
-        signal = np.zeros(samples)
-        
-        for harmonic, weight in zip(harmonics, harmonic_weights):
-            freq = base_freq * harmonic
-            
-            # Add natural vibrato
-            vibrato = vibrato_depth * np.sin(2 * np.pi * vibrato_rate * t)
-            instantaneous_freq = freq * (1 + vibrato)
-            
-            # Generate harmonic with natural variations
-            phase = 2 * np.pi * np.cumsum(instantaneous_freq) / sr
-            harmonic_signal = weight * np.sin(phase)
-            
-            # Add natural amplitude modulation
-            amplitude_variation = 1 + 0.1 * np.sin(2 * np.pi * 0.5 * t)
-            harmonic_signal *= amplitude_variation
-            
-            signal += harmonic_signal
-        
-        # Natural envelope (attack, sustain, decay)
-        envelope = np.ones(samples)
-        attack_samples = int(0.1 * sr)
-        decay_samples = int(0.2 * sr)
-        
-        envelope[:attack_samples] = np.linspace(0, 1, attack_samples)
-        envelope[-decay_samples:] = np.linspace(1, 0, decay_samples)
-        
-        signal *= envelope
-        
-        # Add natural breath noise
-        breath_noise = 0.001 * np.random.randn(samples)
-        signal += breath_noise
-        
-        # Normalize
-        if np.max(np.abs(signal)) > 0:
-            signal = signal / np.max(np.abs(signal)) * 0.7
-        
-        return signal.astype(np.float32)
+        audio, _ = self.voice_generator.generate('test_real', 1, duration)
+        return audio[0]
     
     def generate_fake_voice_sample(self, duration: float = 3.0) -> np.ndarray:
         """Generate a fake/cloned voice sample with AI artifacts"""
-        sr = 22050
-        samples = int(duration * sr)
-        t = np.linspace(0, duration, samples)
-        
-        # AI voice characteristics (less natural)
-        base_freq = np.random.uniform(130, 180)
-        
-        # More uniform harmonic distribution (AI artifact)
-        harmonics = [1, 2, 3, 4, 5, 6, 7, 8]
-        harmonic_weights = [1.0, 0.8, 0.7, 0.6, 0.4, 0.3, 0.2, 0.15]  # Too uniform
-        
-        # Slightly irregular vibrato (AI artifact)
-        vibrato_rate = np.random.uniform(3, 7)  # More variable
-        vibrato_depth = 0.08  # More pronounced
-        
-        signal = np.zeros(samples)
-        
-        for harmonic, weight in zip(harmonics, harmonic_weights):
-            freq = base_freq * harmonic
-            
-            # Add artificial vibrato patterns
-            vibrato = vibrato_depth * np.sin(2 * np.pi * vibrato_rate * t + np.random.uniform(0, 2*np.pi))
-            instantaneous_freq = freq * (1 + vibrato)
-            
-            phase = 2 * np.pi * np.cumsum(instantaneous_freq) / sr
-            harmonic_signal = weight * np.sin(phase)
-            
-            signal += harmonic_signal
-        
-        # More mechanical envelope (AI artifact)
-        envelope = np.ones(samples)
-        attack_samples = int(0.05 * sr)  # Too fast attack
-        decay_samples = int(0.1 * sr)   # Too fast decay
-        
-        envelope[:attack_samples] = np.linspace(0, 1, attack_samples)
-        envelope[-decay_samples:] = np.linspace(1, 0, decay_samples)
-        
-        signal *= envelope
-        
-        # Add digital artifacts
-        # Quantization noise (AI artifact)
-        quantization_noise = 0.002 * np.random.randint(-2, 3, samples)
-        
-        # Slight periodic artifacts (AI processing artifacts)
-        artifact_freq = sr / 256  # Typical AI processing artifact
-        processing_artifact = 0.001 * np.sin(2 * np.pi * artifact_freq * t)
-        
-        signal += quantization_noise + processing_artifact
-        
-        # Normalize
-        if np.max(np.abs(signal)) > 0:
-            signal = signal / np.max(np.abs(signal)) * 0.7
-        
-        return signal.astype(np.float32)
+        audio, _ = self.voice_generator.generate('test_fake', 1, duration)
+        return audio[0]
     
     def test_audio_sample(self, audio: np.ndarray, expected_label: str, description: str):
         """Test a single audio sample"""
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserProfile, DeepfakeDetectionLog, FraudDetectionLog, VoiceDetectionLog
+from .models import UserProfile, DeepfakeDetectionLog, FraudDetectionLog, VoiceDetectionLog, DetectionStat, ReportArtifact
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
@@ -24,3 +24,16 @@ class VoiceDetectionLogAdmin(admin.ModelAdmin):
     list_filter = ('submission_type', 'result', 'created_at')
     search_fields = ('user__username',)
     readonly_fields = ('created_at', 'processing_time')
+
+@admin.register(DetectionStat)
+class DetectionStatAdmin(admin.ModelAdmin):
+    list_display = ('user', 'source', 'analysis_type', 'result', 'day', 'count')
+    list_filter = ('source', 'day')
+    search_fields = ('user__username',)
+
+@admin.register(ReportArtifact)
+class ReportArtifactAdmin(admin.ModelAdmin):
+    list_display = ('key', 'kind', 'report_type', 'user', 'status', 'size', 'created_at', 'completed_at')
+    list_filter = ('kind', 'status', 'template_version')
+    search_fields = ('key', 'user__username')
+    readonly_fields = ('key', 'sha256', 'size', 'created_at', 'started_at', 'completed_at')
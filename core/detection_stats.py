@@ -0,0 +1,283 @@
+"""
+Materialized Detection Statistics
+=================================
+
+Dashboard counts read from the DetectionStat table instead of counting
+the log tables on every page load.
+
+DetectionStat holds one counter per user, log type (source), analysis
+type, result and day, plus the same counters for all users (user NULL).
+Signal handlers keep it current: saving a new log increments its
+counters, deleting a log decrements them, and a saved log whose result
+changes (e.g. a voice job that completes) moves its count to the new
+result. The counters share the transaction of the log write.
+
+A dashboard reads all counters of a user with one query over the
+(user, source, analysis_type, result, day) unique index, see
+get_detection_stats().
+
+Writes through ``QuerySet.update()`` or ``bulk_create()`` send no model
+signals and are not counted; run ``python manage.py rebuild_detection_stats``
+after such bulk changes to recount every log. The voice job queue changes
+statuses with conditional updates and moves the counters itself, see
+record_status_update().
+
+Author: SAP GHOST AI Team
+Version: 1.0
+"""
+
+import copy
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models import Case, CharField, Count, F, Q, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# (user id, source, analysis type, result, day)
+StatKey = Tuple[Optional[int], str, str, str, date]
+
+# Source -> (model, timestamp field, fields the counters are derived from)
+STAT_SOURCES = {
+    'detection': ('DetectionLog', 'timestamp', ('analysis_type', 'result')),
+    'deepfake': ('DeepfakeDetectionLog', 'created_at', ('is_fake',)),
+    'voice': ('VoiceDetectionLog', 'created_at', ('analysis_type', 'result', 'status')),
+    'fraud': ('FraudDetectionLog', 'created_at', ('is_fraudulent',)),
+}
+
+# Days counted as recent activity, today included
+RECENT_DAYS = 7
+
+# Attribute holding the key a loaded or saved log is counted under
+_KEY_ATTR = '_detection_stat_key'
+
+
+def _analysis_type(source: str, log) -> str:
+    return log.analysis_type if source in ('detection', 'voice') else ''
+
+
+def _result(source: str, log) -> str:
+    if source == 'deepfake':
+        return 'fake' if log.is_fake else 'real'
+    if source == 'fraud':
+        return 'fraudulent' if log.is_fraudulent else 'legitimate'
+    if source == 'voice' and log.status != 'completed':
+        # Unfinished jobs are counted by status until their verdict exists
+        return log.status
+    return log.result
+
+
+def _expressions(source: str) -> Tuple[Any, Any]:
+    """Database expressions computing _analysis_type() and _result() of a source"""
+    analysis_type = F('analysis_type') if source in ('detection', 'voice') else Value('')
+    if source == 'deepfake':
+        result = Case(When(is_fake=True, then=Value('fake')), default=Value('real'), output_field=CharField())
+    elif source == 'fraud':
+        result = Case(When(is_fraudulent=True, then=Value('fraudulent')), default=Value('legitimate'),
+                      output_field=CharField())
+    elif source == 'voice':
+        result = Case(When(status='completed', then=F('result')), default=F('status'), output_field=CharField())
+    else:
+        result = F('result')
+    return analysis_type, result
+
+
+def _day(timestamp) -> date:
+    return timezone.localtime(timestamp).date() if timezone.is_aware(timestamp) else timestamp.date()
+
+
+def stat_key(source: str, log) -> Optional[StatKey]:
+    """Counter key of a log, or None if it cannot be derived (unsaved or deferred fields)"""
+    _, timestamp_field, fields = STAT_SOURCES[source]
+    deferred = log.get_deferred_fields()
+    if deferred & {timestamp_field, 'user', 'user_id', *fields}:
+        return None
+    timestamp = getattr(log, timestamp_field)
+    if timestamp is None:
+        return None
+    return (log.user_id, source, _analysis_type(source, log), _result(source, log), _day(timestamp))
+
+
+def _increment(user_id: Optional[int], source: str, analysis_type: str, result: str, day: date, delta: int):
+    from .models import DetectionStat
+
+    lookup = dict(user_id=user_id, source=source, analysis_type=analysis_type, result=result, day=day)
+    if DetectionStat.objects.filter(**lookup).update(count=F('count') + delta) or delta < 0:
+        # Nothing to decrement when the row is gone (e.g. deleted along with its user)
+        return
+    try:
+        with transaction.atomic():
+            DetectionStat.objects.create(count=delta, **lookup)
+    except IntegrityError:
+        # Created concurrently by another writer
+        DetectionStat.objects.filter(**lookup).update(count=F('count') + delta)
+
+
+def record(key: StatKey, delta: int):
+    """Add delta to a log's counters for its user and for all users"""
+    user_id, source, analysis_type, result, day = key
+    if user_id is not None:
+        _increment(user_id, source, analysis_type, result, day, delta)
+    _increment(None, source, analysis_type, result, day, delta)
+
+
+def record_status_update(log, previous_status: str):
+    """
+    Move a voice log's counter after its status was changed through
+    ``QuerySet.update()``, which sends no signals
+
+    Args:
+        log: The log as stored after the update
+        previous_status: Its status before the update
+    """
+    key = stat_key('voice', log)
+    previous_log = copy.copy(log)
+    previous_log.status = previous_status
+    previous = stat_key('voice', previous_log)
+    if previous is not None and key is not None and key != previous:
+        record(previous, -1)
+        record(key, 1)
+    setattr(log, _KEY_ATTR, key)
+
+
+def _source_of(sender) -> Optional[str]:
+    for source, (model_name, _, _) in STAT_SOURCES.items():
+        if sender.__name__ == model_name:
+            return source
+    return None
+
+
+def _remember_key(sender, instance, **kwargs):
+    setattr(instance, _KEY_ATTR, stat_key(_source_of(sender), instance))
+
+
+def _log_saved(sender, instance, created, **kwargs):
+    source = _source_of(sender)
+    key = stat_key(source, instance)
+    previous = None if created else getattr(instance, _KEY_ATTR, None)
+    try:
+        if created:
+            if key is not None:
+                record(key, 1)
+        elif previous is not None and key is not None and key != previous:
+            record(previous, -1)
+            record(key, 1)
+    except Exception as e:
+        logger.error(f"Could not update detection statistics for {sender.__name__} {instance.pk}: {e}")
+    setattr(instance, _KEY_ATTR, key)
+
+
+def _log_deleted(sender, instance, **kwargs):
+    key = getattr(instance, _KEY_ATTR, None) or stat_key(_source_of(sender), instance)
+    if key is None:
+        return
+    try:
+        record(key, -1)
+    except Exception as e:
+        logger.error(f"Could not update detection statistics for {sender.__name__} {instance.pk}: {e}")
+
+
+def connect_signals():
+    """Keep DetectionStat in step with the log tables (called from CoreConfig.ready)"""
+    for source, (model_name, _, _) in STAT_SOURCES.items():
+        model = apps.get_model('core', model_name)
+        post_init.connect(_remember_key, sender=model, dispatch_uid=f'detection_stats_init_{source}')
+        post_save.connect(_log_saved, sender=model, dispatch_uid=f'detection_stats_save_{source}')
+        post_delete.connect(_log_deleted, sender=model, dispatch_uid=f'detection_stats_delete_{source}')
+
+
+class DetectionStats:
+    """Counters of one user (or all users), summed per source, analysis type and result"""
+
+    def __init__(self, rows):
+        self._total = defaultdict(int)
+        self._recent = defaultdict(int)
+        for row in rows:
+            for key in ((row['source'], None, None),
+                        (row['source'], row['analysis_type'], None),
+                        (row['source'], None, row['result']),
+                        (row['source'], row['analysis_type'], row['result'])):
+                self._total[key] += row['total'] or 0
+                self._recent[key] += row['recent'] or 0
+
+    def total(self, source: str, analysis_type: Optional[str] = None, result: Optional[str] = None) -> int:
+        """Logs of a source, optionally of one analysis type and/or result"""
+        return self._total[(source, analysis_type, result)]
+
+    def recent(self, source: str, analysis_type: Optional[str] = None, result: Optional[str] = None) -> int:
+        """Like total(), for the last RECENT_DAYS days"""
+        return self._recent[(source, analysis_type, result)]
+
+
+def get_detection_stats(user=None, recent_days: int = RECENT_DAYS, day_from: Optional[date] = None,
+                        day_to: Optional[date] = None) -> DetectionStats:
+    """
+    All counters of a user (None: all users) in one query, optionally only
+    those of the days from day_from to day_to (inclusive, local dates)
+    """
+    from .models import DetectionStat
+
+    since = timezone.localdate() - timedelta(days=recent_days - 1)
+    counters = DetectionStat.objects.filter(user=user)
+    if day_from is not None:
+        counters = counters.filter(day__gte=day_from)
+    if day_to is not None:
+        counters = counters.filter(day__lte=day_to)
+    rows = (counters
+            .values('source', 'analysis_type', 'result')
+            .annotate(total=Sum('count'), recent=Sum('count', filter=Q(day__gte=since))))
+    return DetectionStats(rows)
+
+
+def rebuild_detection_stats(get_model: Callable[[str], Any] = None) -> int:
+    """
+    Recount every log into DetectionStat, replacing its current rows
+
+    Args:
+        get_model: Model lookup by class name (migrations pass their historical models)
+
+    Returns:
+        Number of counter rows written
+    """
+    get_model = get_model or (lambda name: apps.get_model('core', name))
+    DetectionStat = get_model('DetectionStat')
+
+    with transaction.atomic():
+        DetectionStat.objects.all().delete()
+        global_counts: Dict[Tuple[str, str, str, date], int] = defaultdict(int)
+        written = 0
+
+        for source, (model_name, timestamp_field, _) in STAT_SOURCES.items():
+            analysis_type, result = _expressions(source)
+            groups = (get_model(model_name).objects
+                      .order_by()
+                      .annotate(stat_type=analysis_type, stat_result=result, stat_day=TruncDate(timestamp_field))
+                      .values('user_id', 'stat_type', 'stat_result', 'stat_day')
+                      .annotate(n=Count('pk')))
+
+            rows = []
+            for group in groups.iterator():
+                key = (source, group['stat_type'] or '', group['stat_result'] or '', group['stat_day'])
+                global_counts[key] += group['n']
+                if group['user_id'] is not None:
+                    rows.append(DetectionStat(user_id=group['user_id'], source=key[0], analysis_type=key[1],
+                                              result=key[2], day=key[3], count=group['n']))
+            DetectionStat.objects.bulk_create(rows, batch_size=1000)
+            written += len(rows)
+
+        DetectionStat.objects.bulk_create(
+            [DetectionStat(user_id=None, source=source, analysis_type=analysis_type, result=result, day=day, count=n)
+             for (source, analysis_type, result, day), n in global_counts.items()],
+            batch_size=1000
+        )
+        written += len(global_counts)
+
+    logger.info(f"Rebuilt detection statistics: {written} counters")
+    return written
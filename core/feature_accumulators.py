@@ -0,0 +1,423 @@
+"""
+Incremental Voice Feature Accumulators
+======================================
+
+Builds the 154-dimensional voice feature vector from audio that arrives in
+chunks, without keeping the frames of the whole recording in memory.
+
+Every frame-level feature of the vector (MFCC, spectral centroid, rolloff,
+bandwidth and contrast, zero crossing rate, chroma, the 13-band mel
+spectrogram, RMS and flatness) is only ever reduced to its mean, standard
+deviation, minimum and maximum. Those are kept as running statistics
+(Welford's algorithm, merged a block of frames at a time) and updated as
+frames become available, so memory stays constant however long the
+recording runs.
+
+With ``window_seconds`` the accumulator describes only the most recent
+audio instead of the whole stream: statistics are kept per block of
+``block_seconds`` and the blocks covering the window are merged when the
+vector is read. Adding audio then costs the frames of the new audio only;
+frames that leave the window are dropped a block at a time.
+
+Chunks are framed exactly as the batch engine frames the whole clip (the
+centre padding is added at the start and end of the stream), so each frame
+is identical to the batch frame at the same position. The remaining
+differences to SpectralFeatureEngine.extract() are:
+
+- The 80 dB floor of the log-mel spectrograms follows the loudest frame
+  seen so far instead of the loudest frame of the whole clip. It only
+  matters for frames more than 80 dB below the peak.
+- Chroma tuning is estimated once from the first TUNING_SECONDS of audio
+  instead of the whole clip.
+- Harmonic/percussive ratios, tempo and tonnetz have no running form; they
+  are computed from the most recent ``context_seconds`` of audio (the whole
+  clip when it is shorter; the window when there is one).
+- A window starts at a block boundary and its first frames overlap the
+  audio before it, where the batch engine would zero-pad a clip.
+
+For clips shorter than TUNING_SECONDS the vector matches the batch one to
+floating point accuracy. For longer clips everything but chroma still
+does; chroma drifts with the tuning when the pitch moves over the clip
+(up to about 0.2 for a tone gliding 20 % over 8 seconds), see
+test_accumulator_parity().
+
+Usage:
+    accumulator = StreamingFeatureAccumulator(target_sr=22050)
+    for chunk in chunks:
+        accumulator.update(chunk)
+    features = accumulator.vector()  # may be called at any time
+
+Author: SAP GHOST AI Team
+Version: 1.1
+"""
+
+import copy
+import numpy as np
+import librosa
+from collections import deque
+from typing import Dict, List, Optional
+
+from .voice_features import (SpectralFeatureEngine, FRAME_STATISTICS, FEATURE_LAYOUT, DEFAULT_PROFILE,
+                             NUM_FEATURES, N_FFT, HOP_LENGTH)
+
+# Audio used to estimate the chroma tuning before chroma frames are accumulated
+TUNING_SECONDS = 2.0
+
+# Dynamic range of the log-mel spectrograms (librosa.power_to_db default)
+TOP_DB = 80.0
+
+# Bands of the log-mel spectrogram the MFCCs are computed from (librosa default)
+MFCC_MELS = 128
+
+# Rows of each running statistic; tonnetz is computed from the context window
+FRAME_FEATURE_SIZES = {group: size for group, size, stats in FEATURE_LAYOUT
+                       if stats is not None and group != 'tonnetz'}
+
+
+class RunningStats:
+    """Running mean, variance, minimum and maximum of per-frame feature rows"""
+
+    def __init__(self, size: int):
+        self.count = 0
+        self.mean = np.zeros(size, dtype=np.float64)
+        self.m2 = np.zeros(size, dtype=np.float64)
+        self.min = np.full(size, np.inf)
+        self.max = np.full(size, -np.inf)
+
+    def update(self, frames: np.ndarray):
+        """
+        Fold a block of frames, shaped (size, n_frames), into the statistics
+
+        The block's own mean and sum of squared deviations are merged with
+        the running ones (Chan et al.), which is Welford's update applied
+        to many frames at once.
+        """
+        frames = np.asarray(frames, dtype=np.float64)
+        if frames.shape[1] == 0:
+            return
+
+        block_mean = frames.mean(axis=1)
+        self._merge(frames.shape[1], block_mean, np.sum((frames - block_mean[:, None]) ** 2, axis=1),
+                    frames.min(axis=1), frames.max(axis=1))
+
+    def merge(self, other: 'RunningStats'):
+        """Fold another instance's statistics into these ones"""
+        if other.count:
+            self._merge(other.count, other.mean, other.m2, other.min, other.max)
+
+    def _merge(self, count: int, mean: np.ndarray, m2: np.ndarray, minimum: np.ndarray, maximum: np.ndarray):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * (count / total)
+        self.m2 += m2 + delta ** 2 * (self.count * count / total)
+        self.count = total
+
+        np.minimum(self.min, minimum, out=self.min)
+        np.maximum(self.max, maximum, out=self.max)
+
+    @property
+    def std(self) -> np.ndarray:
+        """Population standard deviation, as np.std"""
+        return np.sqrt(self.m2 / max(self.count, 1))
+
+    def summary(self) -> Dict[str, np.ndarray]:
+        """Mean, std, min and max by name"""
+        return {'mean': self.mean, 'std': self.std, 'min': self.min, 'max': self.max}
+
+
+def _new_block() -> Dict:
+    """Statistics of one block of frames"""
+    return {
+        'stats': {name: RunningStats(size) for name, size in FRAME_FEATURE_SIZES.items()},
+        'mel13_db_max': -np.inf,
+        'peak': 0.0,
+        # Power spectra waiting for the chroma tuning estimate
+        'tuning_power': []
+    }
+
+
+class StreamingFeatureAccumulator:
+    """
+    154-dimensional feature vector of a stream of audio chunks at target_sr
+
+    Args:
+        window_seconds: Describe only the most recent audio (None: the
+            whole stream). Also the context of the whole-clip features.
+        block_seconds: Granularity at which audio leaves the window
+        normalize: Produce the vector of the peak-normalized audio (as
+            preprocess_audio() would), from chunks at their recorded level
+    """
+
+    def __init__(self, target_sr: int = 22050, profile: str = DEFAULT_PROFILE,
+                 context_seconds: float = 30.0, window_seconds: Optional[float] = None,
+                 block_seconds: float = 1.0, normalize: bool = False,
+                 n_fft: int = N_FFT, hop_length: int = HOP_LENGTH):
+        self.engine = SpectralFeatureEngine(target_sr=target_sr, n_fft=n_fft, hop_length=hop_length,
+                                            profile=profile)
+        self.target_sr = target_sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.normalize = normalize
+        self._pad = n_fft // 2
+        self._tuning_frames = 1 + int(TUNING_SECONDS * target_sr) // hop_length
+
+        if window_seconds is not None:
+            context_seconds = window_seconds
+            self._block_frames = max(1, int(round(block_seconds * target_sr / hop_length)))
+            n_blocks = int(np.ceil(window_seconds / block_seconds))
+            # The open block plus the closed ones still inside the window
+            self._blocks = deque([_new_block()], maxlen=n_blocks + 1)
+        else:
+            self._block_frames = None
+            self._blocks = deque([_new_block()])
+        self._context_size = int(context_seconds * target_sr)
+
+        self.samples = 0
+        self._last_sample = 0.0
+        # Unframed samples; the spectral stream is zero padded at the start,
+        # the zero crossing stream edge padded, as in the batch features
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._zcr_pending = np.zeros(0, dtype=np.float32)
+        self._context = np.zeros(0, dtype=np.float32)
+
+        self._floors = {'mel_db_max': -np.inf, 'mel13_db_max': -np.inf, 'tuning': None}
+
+    @property
+    def seconds(self) -> float:
+        return self.samples / self.target_sr
+
+    @property
+    def frames(self) -> int:
+        """Frames accumulated in the statistics that are kept"""
+        return sum(block['stats']['rms'].count for block in self._blocks)
+
+    @property
+    def peak(self) -> float:
+        """Largest absolute sample of the audio the vector describes"""
+        return max(block['peak'] for block in self._window_blocks(self._blocks))
+
+    def update(self, audio_chunk: np.ndarray):
+        """Add the next chunk of mono audio"""
+        chunk = np.asarray(audio_chunk, dtype=np.float32).ravel()
+        if len(chunk) == 0:
+            return
+
+        if self.samples == 0:
+            self._pending = np.zeros(self._pad, dtype=np.float32)
+            self._zcr_pending = np.full(self._pad, chunk[0], dtype=np.float32)
+        self.samples += len(chunk)
+        self._last_sample = chunk[-1]
+        self._context = np.concatenate([self._context, chunk])[-self._context_size:]
+        self._blocks[-1]['peak'] = max(self._blocks[-1]['peak'], float(np.max(np.abs(chunk))))
+
+        self._pending = np.concatenate([self._pending, chunk])
+        self._zcr_pending = np.concatenate([self._zcr_pending, chunk])
+
+        n_frames = self._complete_frames(len(self._pending))
+        while n_frames:
+            block = self._blocks[-1]
+            if self._block_frames is not None:
+                room = self._block_frames - block['stats']['rms'].count
+                if room <= 0:
+                    self._blocks.append(_new_block())
+                    continue
+                n_frames = min(n_frames, room)
+            end = (n_frames - 1) * self.hop_length + self.n_fft
+            self._fold(self._blocks, self._floors, self._pending[:end], self._zcr_pending[:end])
+            self._pending = self._pending[n_frames * self.hop_length:]
+            self._zcr_pending = self._zcr_pending[n_frames * self.hop_length:]
+            n_frames = self._complete_frames(len(self._pending))
+
+    def vector(self) -> np.ndarray:
+        """
+        Feature vector of the audio added so far (or of the window)
+
+        The end of the stream is padded on a copy of the running state, so
+        more chunks can be added afterwards.
+        """
+        if self.samples == 0:
+            raise ValueError("No audio has been added")
+
+        blocks = copy.deepcopy(self._blocks)
+        floors = dict(self._floors)
+        tail = np.concatenate([self._pending, np.zeros(self._pad, dtype=np.float32)])
+        zcr_tail = np.concatenate([self._zcr_pending, np.full(self._pad, self._last_sample, dtype=np.float32)])
+        n_frames = self._complete_frames(len(tail))
+        if n_frames:
+            end = (n_frames - 1) * self.hop_length + self.n_fft
+            self._fold(blocks, floors, tail[:end], zcr_tail[:end])
+        self._fold_chroma(blocks, floors, final=True)
+
+        return self._assemble(self._window_blocks(blocks))
+
+    def _window_blocks(self, blocks: deque) -> List[Dict]:
+        """The blocks the vector describes; the oldest drops out once the open one has frames"""
+        blocks = list(blocks)
+        if blocks and len(blocks) == self._blocks.maxlen and blocks[-1]['stats']['rms'].count:
+            blocks = blocks[1:]
+        return blocks
+
+    def _complete_frames(self, length: int) -> int:
+        if length < self.n_fft:
+            return 0
+        return 1 + (length - self.n_fft) // self.hop_length
+
+    def _fold(self, blocks: deque, floors: Dict, segment: np.ndarray, zcr_segment: np.ndarray):
+        """Compute the frames of an already padded segment and add them to the open block"""
+        sr = self.target_sr
+        block = blocks[-1]
+        stats = block['stats']
+
+        stft = librosa.stft(segment, n_fft=self.n_fft, hop_length=self.hop_length, center=False)
+        magnitude = np.abs(stft)
+        power = magnitude ** 2
+
+        # MFCC from the 128-band log-mel spectrogram
+        mel_db = librosa.power_to_db(librosa.feature.melspectrogram(S=power, sr=sr, n_mels=MFCC_MELS),
+                                     top_db=None)
+        floors['mel_db_max'] = max(floors['mel_db_max'], float(mel_db.max()))
+        mel_db = np.maximum(mel_db, floors['mel_db_max'] - TOP_DB)
+        stats['mfcc'].update(librosa.feature.mfcc(S=mel_db, sr=sr, n_mfcc=13))
+
+        # Spectral shape
+        centroid = librosa.feature.spectral_centroid(S=magnitude, sr=sr)
+        stats['centroid'].update(centroid)
+        stats['rolloff'].update(librosa.feature.spectral_rolloff(S=magnitude, sr=sr))
+        stats['bandwidth'].update(librosa.feature.spectral_bandwidth(S=magnitude, sr=sr, centroid=centroid))
+        stats['contrast'].update(librosa.feature.spectral_contrast(S=magnitude, sr=sr))
+        stats['flatness'].update(librosa.feature.spectral_flatness(S=magnitude))
+
+        # 13-band mel spectrogram; the ref=np.max offset is subtracted when assembling
+        mel13_db = librosa.power_to_db(librosa.feature.melspectrogram(S=power, sr=sr, n_mels=13), top_db=None)
+        block['mel13_db_max'] = max(block['mel13_db_max'], float(mel13_db.max()))
+        floors['mel13_db_max'] = max(floors['mel13_db_max'], block['mel13_db_max'])
+        stats['mel'].update(np.maximum(mel13_db, floors['mel13_db_max'] - TOP_DB))
+
+        # Time domain
+        stats['rms'].update(librosa.feature.rms(y=segment, frame_length=self.n_fft,
+                                                hop_length=self.hop_length, center=False))
+        stats['zcr'].update(librosa.feature.zero_crossing_rate(zcr_segment, frame_length=self.n_fft,
+                                                               hop_length=self.hop_length, center=False))
+
+        block['tuning_power'].append(power)
+        self._fold_chroma(blocks, floors)
+
+    def _fold_chroma(self, blocks: deque, floors: Dict, final: bool = False):
+        """Accumulate chroma once enough audio has been seen to estimate the tuning"""
+        buffered = [power for block in blocks for power in block['tuning_power']]
+        if not buffered:
+            return
+
+        if floors['tuning'] is None:
+            if not final and sum(p.shape[1] for p in buffered) < self._tuning_frames:
+                return
+            floors['tuning'] = float(librosa.estimate_tuning(S=np.concatenate(buffered, axis=1),
+                                                             sr=self.target_sr, bins_per_octave=12))
+
+        # Each block's chroma goes into that block, so it leaves the window with its frames
+        for block in blocks:
+            for power in block['tuning_power']:
+                block['stats']['chroma'].update(librosa.feature.chroma_stft(S=power, sr=self.target_sr,
+                                                                            tuning=floors['tuning']))
+            block['tuning_power'] = []
+
+    def _assemble(self, blocks: List[Dict]) -> np.ndarray:
+        """Merge the blocks' statistics and lay them out through FRAME_STATISTICS"""
+        merged = {name: RunningStats(size) for name, size in FRAME_FEATURE_SIZES.items()}
+        for block in blocks:
+            for name, stats in block['stats'].items():
+                merged[name].merge(stats)
+        summaries = {group: stats.summary() for group, stats in merged.items()}
+
+        # Gain of peak normalization; only log-mel levels and RMS depend on it
+        peak = max(block['peak'] for block in blocks)
+        gain = 1.0 / peak if self.normalize and peak > 0 else 1.0
+
+        audio = self._context * gain
+        spec = self.engine.compute_spectrogram(audio)
+        harmonic_ratios, harmonic = self.engine.harmonic_ratios(audio, spec)
+        tonnetz = self.engine.tonnetz(harmonic)
+
+        # A level offset of every mel band only moves the 0th (orthonormal DCT) MFCC
+        mfcc_offset = 20 * np.log10(gain) * np.sqrt(MFCC_MELS)
+        for stat in ('mean', 'min', 'max'):
+            summaries['mfcc'][stat] = summaries['mfcc'][stat].copy()
+            summaries['mfcc'][stat][0] += mfcc_offset
+        summaries['rms'] = {stat: values * gain for stat, values in summaries['rms'].items()}
+        # power_to_db(ref=np.max): the reference is the loudest 13-band mel bin
+        summaries['mel']['mean'] = summaries['mel']['mean'] - max(block['mel13_db_max'] for block in blocks)
+        summaries['tonnetz'] = {'mean': np.mean(tonnetz, axis=1), 'std': np.std(tonnetz, axis=1)}
+
+        row_stats = {stat: np.zeros(FRAME_STATISTICS.dims) for stat in ('mean', 'std', 'min', 'max')}
+        for group, row, size in FRAME_STATISTICS.frame_groups:
+            for stat, values in summaries[group].items():
+                row_stats[stat][row:row + size] = values
+        values = {
+            'hpss': harmonic_ratios,
+            'tempo': [self.engine.tempo(spec['mel_db'])]
+        }
+        return FRAME_STATISTICS.assemble(row_stats, values)
+
+
+# Test function
+def _layout_positions(group: str) -> np.ndarray:
+    """Positions of a FEATURE_LAYOUT group in the feature vector"""
+    position = 0
+    for name, size, stats in FEATURE_LAYOUT:
+        width = size * (len(stats) if stats is not None else 1)
+        if name == group:
+            return np.arange(position, position + width)
+        position += width
+    raise KeyError(group)
+
+
+def test_accumulator_parity(audio: Optional[np.ndarray] = None, sr: int = 22050, duration: float = 1.5,
+                            rtol: float = 1e-3, atol: float = 1e-3, chroma_atol: float = 0.25,
+                            seed: int = 0) -> bool:
+    """
+    Check that chunked accumulation reproduces the batch feature vector
+
+    Clips longer than TUNING_SECONDS get their chroma tuning from the start
+    of the clip only, so chroma is compared within chroma_atol there.
+    """
+    print(f"🧪 Testing incremental feature accumulator parity ({duration:.1f}s)...")
+
+    rng = np.random.default_rng(seed)
+    if audio is None:
+        t = np.linspace(0, duration, int(sr * duration), endpoint=False)
+        # Gliding pitch and a changing level, so late frames differ from early ones
+        pitch = 220 * (1 + 0.2 * t / duration)
+        level = 0.3 * (1 + 0.5 * np.sin(2 * np.pi * t / max(duration, 1.0)))
+        phase = 2 * np.pi * np.cumsum(pitch) / sr
+        audio = level * (np.sin(phase) + 0.5 * np.sin(2 * phase))
+        audio = (audio + rng.normal(0, 0.01, len(t))).astype(np.float32)
+
+    expected = SpectralFeatureEngine(target_sr=sr).extract(audio)
+
+    accumulator = StreamingFeatureAccumulator(target_sr=sr)
+    position = 0
+    while position < len(audio):
+        size = int(rng.integers(100, 5000))
+        accumulator.update(audio[position:position + size])
+        position += size
+    actual = accumulator.vector()
+
+    assert actual.shape == (NUM_FEATURES,), f"Expected {NUM_FEATURES} features, got {actual.shape}"
+    tolerance = np.full(NUM_FEATURES, atol)
+    if len(audio) / sr > TUNING_SECONDS:
+        tolerance[_layout_positions('chroma')] = chroma_atol
+    mismatched = np.flatnonzero(~np.isclose(actual, expected, rtol=rtol, atol=tolerance))
+    if len(mismatched):
+        print(f"❌ {len(mismatched)} features differ: indices {mismatched.tolist()}")
+        return False
+
+    chroma_drift = np.max(np.abs(actual - expected)[_layout_positions('chroma')])
+    print(f"✅ All {NUM_FEATURES} features match the batch vector ({accumulator.frames} frames, "
+          f"{len(audio) / sr:.1f}s in chunks, chroma drift {chroma_drift:.3f})")
+    return True
+
+
+if __name__ == "__main__":
+    # Below the tuning window, and long enough for tuning, floors and context to matter
+    test_accumulator_parity(duration=1.5)
+    test_accumulator_parity(duration=8.0)
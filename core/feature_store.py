@@ -0,0 +1,193 @@
+"""
+Training Feature Store
+======================
+
+Persistent feature vectors of training samples, so retraining only
+extracts features for samples that are new or whose audio changed.
+
+One directory per feature schema (``feature_schema_id()``: schema
+version, profile and sample rate) holds numbered shards. Each shard is a
+float32 ``features-NNNNNN.npy`` matrix, opened memory-mapped, and an
+``index-NNNNNN.json`` listing the sample id and audio digest of every row.
+New vectors are appended as a new shard; a sample stored twice resolves to
+its latest row. The index is written after the matrix, so an interrupted
+write leaves no half-indexed shard behind.
+
+A stored vector is reused only while the sample's audio digest still
+matches, so edited or re-decoded samples are featurized again.
+
+Usage:
+    store = FeatureStore("feature_store", feature_schema_id("full", 22050))
+    features = extract_with_store(store, ParallelFeatureExtractor(), clips)
+    store.compact()  # optional: merge shards and drop superseded rows
+
+Author: SAP GHOST AI Team
+Version: 1.0
+"""
+
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+DEFAULT_STORE_DIR = "feature_store"
+
+
+def audio_digest(audio: np.ndarray, sample_rate: int) -> str:
+    """Content hash of decoded audio and its sample rate"""
+    audio = np.ascontiguousarray(audio)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{audio.dtype.str}:{audio.shape}:{sample_rate}".encode())
+    digest.update(audio.tobytes())
+    return digest.hexdigest()
+
+
+class FeatureStore:
+    """Memory-mapped feature vectors of one feature schema, keyed by sample id"""
+
+    def __init__(self, root: Union[str, Path], schema_id: str):
+        self.schema_id = schema_id
+        self.directory = Path(root) / schema_id
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._index: Dict[str, Tuple[int, int, str]] = {}  # sample id -> (shard, row, digest)
+        self._shards: Dict[int, np.ndarray] = {}
+        self._next_shard = 1
+        self._load_index()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, sample_id: str) -> bool:
+        return sample_id in self._index
+
+    def _paths(self, shard: int) -> Tuple[Path, Path]:
+        return (self.directory / f"features-{shard:06d}.npy",
+                self.directory / f"index-{shard:06d}.json")
+
+    def _load_index(self):
+        for index_path in sorted(self.directory.glob("index-*.json")):
+            shard = int(index_path.stem.split('-')[1])
+            self._next_shard = max(self._next_shard, shard + 1)
+            if not self._paths(shard)[0].exists():
+                continue
+            with open(index_path, 'r') as f:
+                entries = json.load(f)
+            for row, (sample_id, digest) in enumerate(entries):
+                self._index[sample_id] = (shard, row, digest)
+
+    def _shard(self, shard: int) -> np.ndarray:
+        if shard not in self._shards:
+            self._shards[shard] = np.load(self._paths(shard)[0], mmap_mode='r')
+        return self._shards[shard]
+
+    def get(self, sample_id: str, digest: str) -> Optional[np.ndarray]:
+        """Stored vector of a sample, or None if missing or computed from different audio"""
+        entry = self._index.get(sample_id)
+        if entry is None or entry[2] != digest:
+            return None
+        shard, row, _ = entry
+        return self._shard(shard)[row]
+
+    def put_many(self, sample_ids: Sequence[str], digests: Sequence[str], features: np.ndarray) -> int:
+        """
+        Append vectors as a new shard
+
+        Returns:
+            Number of vectors written
+        """
+        if len(sample_ids) == 0:
+            return 0
+        features = np.asarray(features, dtype=np.float32)
+        if features.shape[0] != len(sample_ids) or len(digests) != len(sample_ids):
+            raise ValueError("sample_ids, digests and features must have the same length")
+
+        shard = self._next_shard
+        self._next_shard += 1
+        features_path, index_path = self._paths(shard)
+
+        # Matrix first, index last: a shard only counts once its index exists
+        tmp_features = features_path.with_name(features_path.stem + '.tmp.npy')
+        np.save(tmp_features, features)
+        tmp_features.replace(features_path)
+        tmp_index = index_path.with_suffix('.tmp')
+        with open(tmp_index, 'w') as f:
+            json.dump([[sample_id, digest] for sample_id, digest in zip(sample_ids, digests)], f)
+        tmp_index.replace(index_path)
+
+        for row, (sample_id, digest) in enumerate(zip(sample_ids, digests)):
+            self._index[sample_id] = (shard, row, digest)
+        return len(sample_ids)
+
+    def compact(self) -> int:
+        """
+        Rewrite all current vectors into a single shard and delete the old ones
+
+        Returns:
+            Number of vectors kept
+        """
+        old_shards = sorted({shard for shard, _, _ in self._index.values()} |
+                            {int(p.stem.split('-')[1]) for p in self.directory.glob("index-*.json")})
+        if len(old_shards) <= 1:
+            return len(self._index)
+
+        sample_ids = list(self._index)
+        digests = [self._index[sample_id][2] for sample_id in sample_ids]
+        features = np.stack([self._shard(self._index[s][0])[self._index[s][1]] for s in sample_ids])
+        self.put_many(sample_ids, digests, features)
+
+        for shard in old_shards:
+            self._shards.pop(shard, None)
+            for path in self._paths(shard):
+                path.unlink(missing_ok=True)
+        return len(sample_ids)
+
+    def get_stats(self) -> Dict[str, Union[str, int]]:
+        shards = list(self.directory.glob("features-*.npy"))
+        return {
+            'schema': self.schema_id,
+            'samples': len(self._index),
+            'shards': len(shards),
+            'size_bytes': sum(p.stat().st_size for p in shards)
+        }
+
+
+def extract_with_store(store: Optional[FeatureStore], extractor, clips: Iterable[Tuple[str, np.ndarray, int]],
+                       total: Optional[int] = None, desc: str = "Feature extraction") -> List[Optional[np.ndarray]]:
+    """
+    Feature vectors of (sample_id, audio, sample_rate) clips in input order
+
+    Stored vectors are reused; the remaining clips are featurized by the
+    extractor (a ParallelFeatureExtractor) and added to the store.
+    Without a store every clip is featurized.
+    """
+    if store is None:
+        return extractor.extract_all(((audio, sr) for _, audio, sr in clips), total=total, desc=desc)
+
+    results: List[Optional[np.ndarray]] = []
+    missing: List[Tuple[int, str, str]] = []  # (position, sample id, digest)
+
+    def missing_clips():
+        for sample_id, audio, sr in clips:
+            digest = audio_digest(audio, sr)
+            results.append(store.get(sample_id, digest))
+            if results[-1] is None:
+                missing.append((len(results) - 1, sample_id, digest))
+                yield audio, sr
+
+    extracted = extractor.extract_all(missing_clips(), total=None, desc=desc)
+
+    new_ids, new_digests, new_features = [], [], []
+    for (position, sample_id, digest), features in zip(missing, extracted):
+        results[position] = features
+        if features is not None:
+            new_ids.append(sample_id)
+            new_digests.append(digest)
+            new_features.append(features)
+    if new_features:
+        store.put_many(new_ids, new_digests, np.stack(new_features))
+
+    print(f"♻️  Feature store {store.schema_id}: {len(results) - len(missing)} reused, "
+          f"{len(new_features)} extracted and stored ({len(store)} samples stored)")
+    return results
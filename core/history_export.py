@@ -0,0 +1,138 @@
+"""
+Streaming History Export
+========================
+
+CSV and Excel exports of the detection history that run in constant
+memory however many logs there are.
+
+Rows are read with ``values_list().iterator(chunk_size=...)``: the
+database hands them over a chunk at a time and no model instances are
+built. CSV lines are sent to the client as they are produced. An xlsx
+file is a zip archive that can only be sent once complete, so the
+workbook is written in xlsxwriter's ``constant_memory`` mode (each row is
+flushed to disk as soon as the next one starts) into a temporary file,
+which is then streamed in blocks and deleted when the response closes.
+Histories longer than Excel's 1,048,576 rows continue on further sheets.
+
+Author: SAP GHOST AI Team
+Version: 1.0
+"""
+
+import csv
+import tempfile
+from typing import Iterable, Iterator, List, Sequence
+
+import xlsxwriter
+from django.db.models import QuerySet
+from django.http import FileResponse, StreamingHttpResponse
+
+from .models import DetectionLog
+
+# Rows fetched from the database per round trip
+EXPORT_CHUNK_SIZE = 2000
+
+HEADERS = ['Request ID', 'Timestamp', 'Analysis Type', 'Result', 'Confidence (%)', 'Subscription Plan', 'IP Address']
+
+# (field, xlsx column width) in HEADERS order
+_COLUMNS = [
+    ('request_id', 20),
+    ('timestamp', 20),
+    ('analysis_type', 15),
+    ('result', 12),
+    ('confidence', 12),
+    ('subscription_plan', 15),
+    ('ip_address', 15),
+]
+
+# Rows per worksheet, header included
+XLSX_MAX_ROWS = 1048576
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def export_rows(logs: QuerySet, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[List]:
+    """Display values of the logs in HEADERS order, newest first"""
+    analysis_types = dict(DetectionLog.DETECTION_TYPES)
+    results = dict(DetectionLog.RESULT_CHOICES)
+    values = (logs.order_by('-timestamp', '-id')
+              .values_list(*(field for field, _ in _COLUMNS))
+              .iterator(chunk_size=chunk_size))
+    for request_id, timestamp, analysis_type, result, confidence, plan, ip_address in values:
+        yield [
+            str(request_id),
+            timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+            analysis_types.get(analysis_type, analysis_type),
+            results.get(result, result),
+            confidence,
+            plan,
+            ip_address or 'N/A'
+        ]
+
+
+class _Echo:
+    """File-like object whose write() returns the line for the response to send"""
+
+    def write(self, value):
+        return value
+
+
+def csv_response(rows: Iterable[Sequence], filename: str) -> StreamingHttpResponse:
+    """Stream rows as a CSV download, one line at a time"""
+    writer = csv.writer(_Echo())
+
+    def lines():
+        yield writer.writerow(HEADERS)
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(lines(), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def xlsx_response(rows: Iterable[Sequence], filename: str, sheet_name: str = 'Detection History') -> FileResponse:
+    """Write rows to an xlsx temp file in constant memory and stream it as a download"""
+    # Deleted by the OS once the response has been sent and closes it
+    output = tempfile.TemporaryFile(suffix='.xlsx')
+    try:
+        workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+
+        header_format = workbook.add_format({
+            'bold': True,
+            'bg_color': '#1A1A40',
+            'font_color': 'white',
+            'align': 'center',
+            'valign': 'vcenter'
+        })
+        cell_format = workbook.add_format({
+            'align': 'center',
+            'valign': 'vcenter'
+        })
+
+        def add_sheet(number):
+            worksheet = workbook.add_worksheet(sheet_name if number == 1 else f'{sheet_name} {number}')
+            for col, (_, width) in enumerate(_COLUMNS):
+                worksheet.set_column(col, col, width)
+            # constant_memory only accepts rows in order: headers first
+            worksheet.write_row(0, 0, HEADERS, header_format)
+            return worksheet
+
+        sheets = 1
+        worksheet = add_sheet(sheets)
+        row = 0
+        for values in rows:
+            row += 1
+            if row == XLSX_MAX_ROWS:
+                # Continue on a new sheet past Excel's row limit
+                sheets += 1
+                worksheet = add_sheet(sheets)
+                row = 1
+            worksheet.write_row(row, 0, values, cell_format)
+
+        workbook.close()
+        output.seek(0)
+    except Exception:
+        output.close()
+        raise
+
+    return FileResponse(output, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
@@ -0,0 +1,154 @@
+"""
+Voice Analysis Inference Pool
+=============================
+
+Runs voice clone detection in a pool of worker processes so the CPU-bound
+librosa and scikit-learn work happens outside the web server's request
+threads and off their GIL.
+
+Each worker process loads the trained models once, when it starts, and
+then serves analyses from the pool's task queue. Callers get a future
+back and either block on it (sync views) or await it (async code).
+
+Author: SAP GHOST AI Team
+Version: 1.0
+"""
+
+import os
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Detector owned by the current worker process (set by _init_worker)
+_worker_detector = None
+
+
+def _init_worker(models_dir: Optional[str], feature_profile: Optional[str], threads_per_worker: int,
+                 reload_interval: float, detector_options: Dict[str, Any]):
+    """Load the models once per worker process"""
+    global _worker_detector
+
+    # Keep BLAS/OpenMP from oversubscribing cores across workers;
+    # must happen before numpy is imported in this process
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ.setdefault(var, str(threads_per_worker))
+
+    from .voice_clone_detection_production import VoiceCloneDetectionProduction
+
+    _worker_detector = VoiceCloneDetectionProduction(models_dir=models_dir, feature_profile=feature_profile,
+                                                     **detector_options)
+    _worker_detector.initialize()
+
+    # Pick up retrained models without restarting the worker
+    if reload_interval:
+        _worker_detector.start_model_watcher(reload_interval)
+
+
+def _run_analysis(source: Union[str, bytes], format_hint: Optional[str], streaming: bool) -> Dict[str, Any]:
+    """Analyze one recording with this worker's preloaded detector"""
+    if streaming:
+        return _worker_detector.predict_stream(source, format_hint=format_hint)
+    return _worker_detector.predict_file(source, format_hint=format_hint)
+
+
+def _run_feature_analysis(features, feature_schema: str, audio_info: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Score a feature vector with this worker's preloaded detector"""
+    return _worker_detector.predict_features(features, feature_schema, audio_info)
+
+
+class InferencePool:
+    """
+    Pool of worker processes with preloaded voice clone detection models
+
+    Sources must be picklable: a file path the workers can read, or the
+    encoded audio as bytes. detector_options are passed on to each
+    worker's VoiceCloneDetectionProduction (cache size, cascade, ...).
+    """
+
+    def __init__(self, num_workers: Optional[int] = None, models_dir: Optional[str] = None,
+                 feature_profile: Optional[str] = None, threads_per_worker: int = 1,
+                 reload_interval: float = 0, detector_options: Optional[Dict[str, Any]] = None,
+                 start_method: str = 'spawn'):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.models_dir = str(models_dir) if models_dir is not None else None
+        self.feature_profile = feature_profile
+        self.threads_per_worker = threads_per_worker
+        self.reload_interval = reload_interval
+        self.detector_options = dict(detector_options or {})
+        self.start_method = start_method
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> ProcessPoolExecutor:
+        """Start the worker processes (idempotent)"""
+        with self._lock:
+            if self._executor is None:
+                logger.info(f"Starting voice inference pool with {self.num_workers} workers")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.num_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker,
+                    initargs=(self.models_dir, self.feature_profile, self.threads_per_worker,
+                              self.reload_interval, self.detector_options)
+                )
+            return self._executor
+
+    def submit(self, source: Union[str, bytes], format_hint: Optional[str] = None,
+               streaming: bool = False) -> Future:
+        """Queue an analysis (windowed over the whole recording if streaming) and return its future"""
+        return self.start().submit(_run_analysis, source, format_hint, streaming)
+
+    def analyze(self, source: Union[str, bytes], format_hint: Optional[str] = None,
+                timeout: Optional[float] = None, streaming: bool = False) -> Dict[str, Any]:
+        """Queue an analysis and block until its result is ready"""
+        try:
+            return self.submit(source, format_hint, streaming).result(timeout=timeout)
+        except BrokenProcessPool as e:
+            # A worker died (e.g. OOM-killed); drop the pool so the next call starts a fresh one
+            logger.error(f"Voice inference pool broken, restarting on next request: {e}")
+            self._discard()
+            raise
+
+    async def analyze_async(self, source: Union[str, bytes], format_hint: Optional[str] = None) -> Dict[str, Any]:
+        """Queue an analysis and await its result without blocking the event loop"""
+        try:
+            return await asyncio.wrap_future(self.submit(source, format_hint))
+        except BrokenProcessPool as e:
+            logger.error(f"Voice inference pool broken, restarting on next request: {e}")
+            self._discard()
+            raise
+
+    async def analyze_features_async(self, features, feature_schema: str,
+                                     audio_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Await the scoring of a feature vector (e.g. a live stream's) without blocking the event loop"""
+        try:
+            return await asyncio.wrap_future(
+                self.start().submit(_run_feature_analysis, features, feature_schema, audio_info)
+            )
+        except BrokenProcessPool as e:
+            logger.error(f"Voice inference pool broken, restarting on next request: {e}")
+            self._discard()
+            raise
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def _discard(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
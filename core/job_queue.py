@@ -0,0 +1,189 @@
+"""
+Database-Backed Job Queues
+==========================
+
+Shared mechanics of the background queues (voice analysis jobs in
+core.voice_jobs, rendered reports in core.report_jobs). Each queue is a
+model table whose rows carry ``status`` (pending, processing, completed,
+failed), ``created_at``, ``started_at`` and ``heartbeat_at``; no external
+broker is needed.
+
+- Claims are a conditional UPDATE (pending -> processing), so several
+  workers can poll the same database safely.
+- A claim is a lease: the worker renews ``heartbeat_at`` from a background
+  thread while the job runs, and only jobs whose lease has expired (e.g.
+  after a worker crash) are requeued. Jobs that simply take long are never
+  picked up twice.
+- Status changes made with ``QuerySet.update()`` send no model signals; a
+  queue can pass ``on_status_change`` to keep derived data (e.g. the
+  DetectionStat counters) in step, in the same transaction.
+
+Author: SAP GHOST AI Team
+Version: 1.0
+"""
+
+import time
+import logging
+import threading
+from datetime import timedelta
+from typing import Any, Callable, Optional
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Statuses a job can no longer leave
+FINISHED_STATUSES = ('completed', 'failed')
+
+
+class JobHeartbeat:
+    """
+    Renew a claimed job's lease from a background thread until stopped
+
+    Used as a context manager around the work, which may run for far
+    longer than the stale timeout.
+    """
+
+    def __init__(self, model, job_id: int, interval: float):
+        self.model = model
+        self.job_id = job_id
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'{model.__name__.lower()}-{job_id}-heartbeat',
+                                        daemon=True)
+
+    def _run(self):
+        try:
+            while not self._stop.wait(self.interval):
+                try:
+                    self.model.objects.filter(id=self.job_id, status='processing').update(
+                        heartbeat_at=timezone.now()
+                    )
+                except Exception as e:
+                    logger.warning(f"Could not renew lease of {self.model.__name__} {self.job_id}: {str(e)}")
+        finally:
+            # Connections are per thread; do not leak this one
+            connections.close_all()
+
+    def __enter__(self) -> 'JobHeartbeat':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+class JobQueue:
+    """
+    Claims, leases and requeues of one job table
+    """
+
+    def __init__(self, model, name: str, describe: Optional[Callable[[Any], str]] = None,
+                 on_status_change: Optional[Callable[[Any, str], None]] = None):
+        """
+        Args:
+            model: The job model
+            name: What a job is called in log messages
+            describe: Log label of a job (default: name and id)
+            on_status_change: Called with a job as stored after a claim or
+                requeue and its previous status, inside the transaction
+        """
+        self.model = model
+        self.name = name
+        self.describe = describe or (lambda job: f"{name} {job.pk}")
+        self.on_status_change = on_status_change
+
+    def claim_next(self):
+        """
+        Atomically move the oldest pending job to processing and return it
+        """
+        while True:
+            job_id = (self.model.objects
+                      .filter(status='pending')
+                      .order_by('created_at', 'id')
+                      .values_list('id', flat=True)
+                      .first())
+            if job_id is None:
+                return None
+
+            # Only one worker wins the pending -> processing transition
+            now = timezone.now()
+            with transaction.atomic():
+                claimed = self.model.objects.filter(id=job_id, status='pending').update(
+                    status='processing', started_at=now, heartbeat_at=now
+                )
+                if claimed:
+                    job = self.model.objects.get(id=job_id)
+                    if self.on_status_change is not None:
+                        self.on_status_change(job, 'pending')
+                    return job
+
+    def requeue_stale(self, stale_after: float) -> int:
+        """
+        Return jobs whose lease has not been renewed for stale_after seconds
+        (e.g. after a worker crash) to the queue
+        """
+        cutoff = timezone.now() - timedelta(seconds=stale_after)
+        stale = self.model.objects.filter(status='processing', heartbeat_at__lt=cutoff)
+        requeued = 0
+        for job in stale:
+            # One job at a time, so a lease renewed meanwhile is left alone
+            with transaction.atomic():
+                if stale.filter(id=job.id).update(status='pending', started_at=None, heartbeat_at=None):
+                    job.status, job.started_at, job.heartbeat_at = 'pending', None, None
+                    if self.on_status_change is not None:
+                        self.on_status_change(job, 'processing')
+                    requeued += 1
+        if requeued:
+            logger.warning(f"Requeued {requeued} stale {self.name}s")
+        return requeued
+
+    def heartbeat(self, job_id: int, interval: float) -> JobHeartbeat:
+        """Lease renewal for a claimed job, as a context manager"""
+        return JobHeartbeat(self.model, job_id, interval)
+
+    def run_worker(self, process: Callable[[Any, float], Any], poll_interval: float = 1.0,
+                   stale_after: float = 600.0, once: bool = False) -> int:
+        """
+        Process queued jobs until interrupted (or until the queue is empty with once=True)
+
+        Args:
+            process: Runs a claimed job and records its outcome; called with
+                the job and the interval to renew its lease at
+            stale_after: Requeue jobs whose lease has not been renewed for
+                this many seconds; running jobs renew theirs several times
+                per period
+
+        Returns:
+            Number of jobs processed
+        """
+        heartbeat_interval = max(stale_after / 4, 1.0)
+        processed = 0
+        self.requeue_stale(stale_after)
+
+        while True:
+            job = self.claim_next()
+            if job is None:
+                if once:
+                    return processed
+                time.sleep(poll_interval)
+                self.requeue_stale(stale_after)
+                continue
+
+            logger.info(f"Processing {self.describe(job)}")
+            job = process(job, heartbeat_interval)
+            processed += 1
+            logger.info(f"{self.describe(job)} {job.status}")
+
+    @staticmethod
+    def wait_for(job, timeout: float, poll_interval: float = 0.5):
+        """
+        Long-poll: refresh a job until it finishes or the timeout expires
+        """
+        deadline = time.monotonic() + timeout
+        while job.status not in FINISHED_STATUSES and time.monotonic() < deadline:
+            time.sleep(min(poll_interval, max(0.0, deadline - time.monotonic())))
+            job.refresh_from_db()
+        return job
@@ -0,0 +1,174 @@
+"""
+Management command to benchmark the history queries with and without the log indexes
+"""
+
+import time
+import random
+import statistics
+from datetime import timedelta
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = ('Fill a throwaway test database with log rows, then compare the query plans and timings of the '
+            'history queries with the composite indexes and after dropping them')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000_000,
+                            help='DetectionLog rows to generate (default: 10,000,000)')
+        parser.add_argument('--voice-rows', type=int, default=1_000_000,
+                            help='VoiceDetectionLog rows to generate (default: 1,000,000)')
+        parser.add_argument('--users', type=int, default=1000,
+                            help='Users the rows are spread over')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Runs per query; the median is reported')
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help='Rows per insert')
+
+    def handle(self, *args, **options):
+        # The benchmark never touches the configured database: it runs in a
+        # freshly migrated test database that is destroyed afterwards
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        if connection.vendor == 'sqlite' and not test_settings.get('NAME'):
+            # On disk: millions of rows do not fit comfortably in an in-memory database
+            test_settings['NAME'] = 'benchmark_history.sqlite3'
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+        try:
+            user_id = self._populate(options)
+            queries = self._queries(user_id)
+
+            self.stdout.write('\n📈 Measuring with the composite indexes...')
+            after = self._measure(queries, options['repeat'])
+
+            self._drop_indexes()
+            self.stdout.write('📉 Measuring without them...')
+            before = self._measure(queries, options['repeat'])
+
+            self._report(before, after)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def _populate(self, options) -> int:
+        """Generate users and log rows; returns the user the per-user queries run for"""
+        from django.contrib.auth.models import User
+        from core.models import DetectionLog, VoiceDetectionLog
+
+        rng = random.Random(42)
+        now = timezone.now()
+        year = 365 * 24 * 3600
+
+        User.objects.bulk_create(
+            [User(username=f'benchmark_{i}') for i in range(options['users'])], batch_size=options['batch_size']
+        )
+        user_ids = list(User.objects.values_list('id', flat=True))
+
+        detection_types = [choice for choice, _ in DetectionLog.DETECTION_TYPES] + ['voice_otp']
+        detection_results = [choice for choice, _ in DetectionLog.RESULT_CHOICES]
+        voice_results = [choice for choice, _ in VoiceDetectionLog.RESULT_CHOICES]
+
+        def detection_logs():
+            for _ in range(options['rows']):
+                yield DetectionLog(
+                    user_id=rng.choice(user_ids),
+                    timestamp=now - timedelta(seconds=rng.randrange(year)),
+                    analysis_type=rng.choice(detection_types),
+                    result=rng.choice(detection_results),
+                    confidence=rng.uniform(50, 100)
+                )
+
+        def voice_logs():
+            for _ in range(options['voice_rows']):
+                yield VoiceDetectionLog(
+                    user_id=rng.choice(user_ids),
+                    created_at=now - timedelta(seconds=rng.randrange(year)),
+                    status='pending' if rng.random() < 0.01 else 'completed',
+                    result=rng.choice(voice_results),
+                    confidence_score=rng.random()
+                )
+
+        self._insert(DetectionLog, 'timestamp', detection_logs(), options['rows'], options['batch_size'])
+        self._insert(VoiceDetectionLog, 'created_at', voice_logs(), options['voice_rows'], options['batch_size'])
+
+        # Give the planner statistics of the generated data
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        return user_ids[0]
+
+    def _insert(self, model, timestamp_field: str, rows, total: int, batch_size: int):
+        """Bulk insert generated rows, keeping their generated timestamps"""
+        field = model._meta.get_field(timestamp_field)
+        auto_now_add = field.auto_now_add
+        field.auto_now_add = False
+        try:
+            start = time.perf_counter()
+            inserted = 0
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                model.objects.bulk_create(batch)
+                inserted += len(batch)
+                if inserted % 1_000_000 < batch_size or inserted == total:
+                    self.stdout.write(f'   {model.__name__}: {inserted:,}/{total:,} rows '
+                                      f'({time.perf_counter() - start:.0f}s)')
+        finally:
+            field.auto_now_add = auto_now_add
+
+    def _queries(self, user_id: int):
+        """The access paths of the history views (first keyset pages, newest first by (timestamp, id))"""
+        from core.models import DetectionLog, VoiceDetectionLog
+
+        return {
+            'get_all_detection_history': DetectionLog.objects.filter(user_id=user_id).order_by('-timestamp', '-id')[:50],
+            'get_otp_history': DetectionLog.objects.filter(
+                user_id=user_id, analysis_type='otp').order_by('-timestamp', '-id')[:50],
+            'history (type filter)': DetectionLog.objects.filter(analysis_type='deepfake').order_by('-timestamp', '-id')[:15],
+            'history (result filter)': DetectionLog.objects.filter(
+                result__in=['suspicious', 'fraudulent', 'rejected']).order_by('-timestamp', '-id')[:15],
+            'get_voice_history': VoiceDetectionLog.objects.filter(user_id=user_id).order_by('-created_at', '-id')[:50],
+            'voice job claim': VoiceDetectionLog.objects.filter(
+                status='pending').order_by('created_at', 'id').values_list('id', flat=True)[:1],
+        }
+
+    def _measure(self, queries, repeat: int):
+        results = {}
+        for name, queryset in queries.items():
+            plan = queryset.explain()
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - start) * 1000)
+            results[name] = (plan, statistics.median(timings))
+        return results
+
+    def _drop_indexes(self):
+        from core.models import DetectionLog, DeepfakeDetectionLog, VoiceDetectionLog, FraudDetectionLog
+
+        with connection.schema_editor() as editor:
+            for model in (DetectionLog, DeepfakeDetectionLog, VoiceDetectionLog, FraudDetectionLog):
+                for index in model._meta.indexes:
+                    editor.remove_index(model, index)
+
+    def _report(self, before, after):
+        self.stdout.write('\n' + '=' * 60)
+        self.stdout.write('HISTORY QUERY BENCHMARK')
+        self.stdout.write('=' * 60)
+        for name in after:
+            plan_before, ms_before = before[name]
+            plan_after, ms_after = after[name]
+            speedup = ms_before / ms_after if ms_after else float('inf')
+            self.stdout.write(self.style.SUCCESS(
+                f'\n🔍 {name}: {ms_before:.1f} ms → {ms_after:.1f} ms ({speedup:.0f}x)'))
+            self.stdout.write('   Plan without indexes:')
+            self.stdout.write('      ' + plan_before.replace('\n', '\n      '))
+            self.stdout.write('   Plan with indexes:')
+            self.stdout.write('      ' + plan_after.replace('\n', '\n      '))
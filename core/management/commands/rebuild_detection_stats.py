@@ -0,0 +1,14 @@
+"""
+Management command to recount the materialized dashboard statistics
+"""
+
+from django.core.management.base import BaseCommand
+
+class Command(BaseCommand):
+    help = 'Recount every detection log into the DetectionStat table read by the dashboards'
+    
+    def handle(self, *args, **options):
+        from core.detection_stats import rebuild_detection_stats
+        
+        written = rebuild_detection_stats()
+        self.stdout.write(self.style.SUCCESS(f'✅ Rebuilt detection statistics ({written} counters)'))
@@ -0,0 +1,53 @@
+"""
+Management command to roll out retrained voice clone detection models
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Verify the models on disk against the canary set and signal running detectors to reload them'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only verify the models, do not signal a reload'
+        )
+    
+    def handle(self, *args, **options):
+        from core.voice_clone_detection_production import VoiceCloneDetectionProduction
+        from core.model_bundle import request_reload
+        
+        detector = VoiceCloneDetectionProduction(
+            feature_profile=getattr(settings, 'VOICE_FEATURE_PROFILE', None),
+            canary_min_accuracy=getattr(settings, 'VOICE_CANARY_MIN_ACCURACY', 0.8)
+        )
+        if not detector.initialize():
+            raise CommandError(f'Could not load models from {detector.models_dir}')
+        
+        report = detector.verify_models()
+        self.stdout.write(f"Model version: {detector.model_version}")
+        self.stdout.write(f"Canary samples: {report['samples']}")
+        for model_name, accuracy in report['accuracy'].items():
+            self.stdout.write(f"   {model_name}: {accuracy:.3f}")
+        
+        if not report['passed']:
+            raise CommandError(f"Canary check failed: {report.get('error')}")
+        
+        self.stdout.write(self.style.SUCCESS('✅ Canary check passed'))
+        
+        if options['dry_run']:
+            return
+        
+        # Detectors watching the directory reload on their next poll
+        request_reload(detector.models_dir)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"🔄 Reload requested; workers pick it up within "
+                f"{getattr(settings, 'VOICE_MODEL_RELOAD_INTERVAL', 0)}s"
+            )
+        )
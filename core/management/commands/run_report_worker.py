@@ -0,0 +1,60 @@
+"""
+Management command to run the background report worker
+"""
+
+from django.core.management.base import BaseCommand
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Render queued PDF and Excel reports into the report artifact store'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between queue polls when idle'
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=float,
+            default=600.0,
+            help='Requeue rendering reports whose worker has not renewed their lease for this many seconds'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit when the queue is empty instead of polling'
+        )
+        parser.add_argument(
+            '--purge-older-than',
+            type=int,
+            default=None,
+            metavar='DAYS',
+            help='Delete stored reports created more than DAYS days ago before starting'
+        )
+    
+    def handle(self, *args, **options):
+        from core.report_jobs import purge_reports, run_report_worker
+        
+        if options['purge_older_than'] is not None:
+            purged = purge_reports(options['purge_older_than'])
+            self.stdout.write(f'🧹 Purged {purged} stored reports')
+        
+        self.stdout.write(
+            self.style.SUCCESS('🚀 Report worker started')
+        )
+        
+        try:
+            processed = run_report_worker(
+                poll_interval=options['poll_interval'],
+                stale_after=options['stale_after'],
+                once=options['once']
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f'✅ Queue empty, rendered {processed} reports')
+            )
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('⚠️  Report worker stopped'))
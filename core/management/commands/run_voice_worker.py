@@ -0,0 +1,49 @@
+"""
+Management command to run the background voice analysis worker
+"""
+
+from django.core.management.base import BaseCommand
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Process queued voice clone detection jobs'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between queue polls when idle'
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=float,
+            default=600.0,
+            help='Requeue processing jobs whose worker has not renewed their lease for this many seconds'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit when the queue is empty instead of polling'
+        )
+    
+    def handle(self, *args, **options):
+        from core.voice_jobs import run_worker
+        
+        self.stdout.write(
+            self.style.SUCCESS('🚀 Voice analysis worker started')
+        )
+        
+        try:
+            processed = run_worker(
+                poll_interval=options['poll_interval'],
+                stale_after=options['stale_after'],
+                once=options['once']
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f'✅ Queue empty, processed {processed} jobs')
+            )
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('⚠️  Voice analysis worker stopped'))
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.2 on 2026-10-17 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_add_voice_language_analysis"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="voicedetectionlog",
+            name="started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="voicedetectionlog",
+            name="completed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="voicedetectionlog",
+            name="error_message",
+            field=models.TextField(blank=True, default=""),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.0.2 on 2026-10-17 09:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_detection_stats(apps, schema_editor):
+    from core.detection_stats import rebuild_detection_stats
+
+    rebuild_detection_stats(get_model=lambda name: apps.get_model("core", name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_voicedetectionlog_job_tracking"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DetectionStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[
+                            ("detection", "Detection Log"),
+                            ("deepfake", "Deepfake Detection Log"),
+                            ("voice", "Voice Detection Log"),
+                            ("fraud", "Fraud Detection Log"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("analysis_type", models.CharField(blank=True, default="", max_length=50)),
+                ("result", models.CharField(blank=True, default="", max_length=20)),
+                ("day", models.DateField()),
+                ("count", models.BigIntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="detection_stats",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Detection Statistic",
+                "verbose_name_plural": "Detection Statistics",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "source", "analysis_type", "result", "day"),
+                        name="unique_detection_stat",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_detection_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.0.2 on 2026-10-17 09:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_detectionstat"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="detectionlog",
+            index=models.Index(fields=["user", "-timestamp"], name="detlog_user_ts_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="detectionlog",
+            index=models.Index(
+                fields=["user", "analysis_type", "-timestamp"], name="detlog_user_type_ts_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="detectionlog",
+            index=models.Index(fields=["-timestamp"], name="detlog_ts_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="detectionlog",
+            index=models.Index(fields=["analysis_type", "-timestamp"], name="detlog_type_ts_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="detectionlog",
+            index=models.Index(fields=["result", "-timestamp"], name="detlog_result_ts_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="deepfakedetectionlog",
+            index=models.Index(fields=["user", "-created_at"], name="deepfake_user_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="voicedetectionlog",
+            index=models.Index(fields=["user", "-created_at"], name="voice_user_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="voicedetectionlog",
+            index=models.Index(
+                fields=["user", "status", "-created_at"], name="voice_user_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="voicedetectionlog",
+            index=models.Index(fields=["status", "created_at", "id"], name="voice_queue_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="voicedetectionlog",
+            index=models.Index(fields=["status", "started_at"], name="voice_stale_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="frauddetectionlog",
+            index=models.Index(fields=["user", "-created_at"], name="fraud_user_created_idx"),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.2 on 2026-10-17 09:00
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def start_leases(apps, schema_editor):
+    # Jobs already processing keep the lease they had under started_at
+    VoiceDetectionLog = apps.get_model("core", "VoiceDetectionLog")
+    VoiceDetectionLog.objects.filter(status="processing").update(heartbeat_at=F("started_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_reportartifact"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="voicedetectionlog",
+            name="heartbeat_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(start_leases, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="voicedetectionlog",
+            name="voice_stale_idx",
+        ),
+        migrations.AddIndex(
+            model_name="voicedetectionlog",
+            index=models.Index(fields=["status", "heartbeat_at"], name="voice_stale_idx"),
+        ),
+    ]
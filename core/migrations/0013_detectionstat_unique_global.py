@@ -0,0 +1,40 @@
+# Generated by Django 5.0.2 on 2026-10-17 09:00
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_global_duplicates(apps, schema_editor):
+    # Concurrent first writes could create the same all-users counter twice, after
+    # which every increment went to both rows. Neither row nor their sum is the
+    # right count, so the counters are recounted from the logs, one row per key.
+    DetectionStat = apps.get_model("core", "DetectionStat")
+    duplicated = (DetectionStat.objects
+                  .filter(user__isnull=True)
+                  .values("source", "analysis_type", "result", "day")
+                  .annotate(rows=Count("id"))
+                  .filter(rows__gt=1)
+                  .order_by())
+    if duplicated.exists():
+        from core.detection_stats import rebuild_detection_stats
+
+        rebuild_detection_stats(get_model=lambda name: apps.get_model("core", name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_voicedetectionlog_heartbeat"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_global_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="detectionstat",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("user__isnull", True)),
+                fields=("source", "analysis_type", "result", "day"),
+                name="unique_global_detection_stat",
+            ),
+        ),
+    ]
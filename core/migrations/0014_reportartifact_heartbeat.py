@@ -0,0 +1,34 @@
+# Generated by Django 5.0.2 on 2026-10-17 09:00
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def start_leases(apps, schema_editor):
+    # Reports already rendering keep the lease they had under started_at
+    ReportArtifact = apps.get_model("core", "ReportArtifact")
+    ReportArtifact.objects.filter(status="processing").update(heartbeat_at=F("started_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0013_detectionstat_unique_global"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reportartifact",
+            name="heartbeat_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(start_leases, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="reportartifact",
+            name="report_stale_idx",
+        ),
+        migrations.AddIndex(
+            model_name="reportartifact",
+            index=models.Index(fields=["status", "heartbeat_at"], name="report_stale_idx"),
+        ),
+    ]
@@ -0,0 +1,277 @@
+"""
+Voice Clone Detection Model Bundle
+==================================
+
+A trained model set (feature scaler, classifiers and metadata) stored as a
+single versioned artifact, ``voice_models.joblib``.
+
+The bundle is written uncompressed so it can be loaded with ``mmap_mode``.
+Only estimators that keep plain numpy arrays benefit: the SVC support
+vectors and dual coefficients are then mapped copy-on-write from the file and
+shared by every worker through the OS page cache. RandomForest trees are
+rebuilt by ``Tree.__setstate__``, which copies the node arrays, and the
+XGBoost booster is unpickled from a raw byte buffer, so both still cost
+their full size in every process that loads them.
+
+A SHA-256 of the bundle file is stored next to it and identifies the model
+set in result-cache keys and logs.
+
+A models directory may also hold a canary set (``canary_set.npz``: held-out
+feature vectors and labels) that a new model set must classify correctly
+before a running detector swaps it in, and a ``reload.request`` file whose
+modification asks running detectors to reload. The canary set is written
+with every bundle from that training run's own held-out split, so it always
+matches the bundle's feature schema and never overlaps its training data.
+
+Usage:
+    # Build a bundle from the per-model pickles in a directory
+    python -m core.model_bundle trained_models
+
+Author: SAP GHOST AI Team
+Version: 1.0
+"""
+
+import sys
+import json
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+import joblib
+
+BUNDLE_FILENAME = "voice_models.joblib"
+HASH_FILENAME = "voice_models.sha256"
+METADATA_FILENAME = "model_metadata.json"
+CANARY_FILENAME = "canary_set.npz"
+RELOAD_TRIGGER_FILENAME = "reload.request"
+BUNDLE_FORMAT_VERSION = 1
+
+# Per-model pickles written by the training scripts before bundles existed
+LEGACY_MODEL_FILES = {
+    'xgboost': 'xgboost_model.pkl',
+    'random_forest': 'random_forest_model.pkl',
+    'svm': 'svm_model.pkl'
+}
+LEGACY_SCALER_FILE = "scaler.pkl"
+
+
+class ModelBundle:
+    """Scaler, classifiers and metadata of one trained model set"""
+
+    def __init__(self, models: Dict[str, Any], scaler: Any, metadata: Dict[str, Any],
+                 content_hash: Optional[str] = None, path: Optional[Path] = None):
+        self.models = models
+        self.scaler = scaler
+        self.metadata = metadata
+        self.content_hash = content_hash
+        self.path = path
+
+    @property
+    def version(self) -> Optional[str]:
+        """Short form of the content hash for cache keys and logs"""
+        return self.content_hash[:16] if self.content_hash else None
+
+
+def file_sha256(path: Union[str, Path], chunk_size: int = 1 << 20) -> str:
+    """Hash a file without reading it into memory at once"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def bundle_exists(models_dir: Union[str, Path]) -> bool:
+    return (Path(models_dir) / BUNDLE_FILENAME).exists()
+
+
+def disk_signature(models_dir: Union[str, Path]) -> Tuple:
+    """
+    Cheap fingerprint (names, sizes, modification times) of the model files
+    in a directory, for noticing that a new model set was deployed
+    """
+    models_dir = Path(models_dir)
+    names = [BUNDLE_FILENAME, HASH_FILENAME, METADATA_FILENAME, LEGACY_SCALER_FILE,
+             *LEGACY_MODEL_FILES.values()]
+    signature = []
+    for name in names:
+        path = models_dir / name
+        if path.exists():
+            stat = path.stat()
+            signature.append((name, stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+
+def reload_requested_at(models_dir: Union[str, Path]) -> Optional[int]:
+    """Modification time of the reload trigger file, if any"""
+    trigger = Path(models_dir) / RELOAD_TRIGGER_FILENAME
+    return trigger.stat().st_mtime_ns if trigger.exists() else None
+
+
+def request_reload(models_dir: Union[str, Path]):
+    """Ask detectors watching a directory to reload their models"""
+    (Path(models_dir) / RELOAD_TRIGGER_FILENAME).touch()
+
+
+def save_bundle(models_dir: Union[str, Path], models: Dict[str, Any], scaler: Any,
+                metadata: Dict[str, Any],
+                canary_set: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> str:
+    """
+    Write a model set as a single bundle
+
+    The metadata is also written to model_metadata.json so it stays
+    readable without loading the bundle. The file is replaced atomically,
+    so a process loading the directory never sees a half-written bundle.
+
+    The canary set (held-out features and labels) replaces the one in the
+    directory before the bundle does, so a watching detector checks the new
+    models against their own held-out data. Without one, a previous canary
+    set is removed: it belongs to other models and may overlap the new
+    training data.
+
+    Returns:
+        SHA-256 of the bundle file
+    """
+    models_dir = Path(models_dir)
+    models_dir.mkdir(parents=True, exist_ok=True)
+    bundle_path = models_dir / BUNDLE_FILENAME
+
+    if canary_set is not None:
+        save_canary_set(models_dir, *canary_set)
+    else:
+        (models_dir / CANARY_FILENAME).unlink(missing_ok=True)
+
+    payload = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'metadata': metadata,
+        'scaler': scaler,
+        'models': models
+    }
+
+    # compress=0 keeps plain numpy arrays memory-mappable
+    tmp_path = bundle_path.with_suffix('.tmp')
+    joblib.dump(payload, tmp_path, compress=0)
+    content_hash = file_sha256(tmp_path)
+    tmp_path.replace(bundle_path)
+
+    (models_dir / HASH_FILENAME).write_text(content_hash + "\n")
+    with open(models_dir / METADATA_FILENAME, 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    return content_hash
+
+
+def read_bundle_hash(models_dir: Union[str, Path]) -> Optional[str]:
+    """Content hash of the bundle in a directory, from its sidecar file when present"""
+    models_dir = Path(models_dir)
+    bundle_path = models_dir / BUNDLE_FILENAME
+    if not bundle_path.exists():
+        return None
+
+    hash_path = models_dir / HASH_FILENAME
+    if hash_path.exists() and hash_path.stat().st_mtime_ns >= bundle_path.stat().st_mtime_ns:
+        return hash_path.read_text().strip()
+    return file_sha256(bundle_path)
+
+
+def load_bundle(models_dir: Union[str, Path], mmap_mode: Optional[str] = 'c') -> ModelBundle:
+    """
+    Load the bundle in a directory
+
+    Args:
+        models_dir: Directory containing voice_models.joblib
+        mmap_mode: Passed to joblib.load; 'c' maps the plain numpy arrays
+            (SVC, scaler) copy-on-write instead of copying them, so pages
+            stay shared until written. libsvm rejects read-only buffers,
+            so 'r' breaks SVC predictions. None loads into memory. Tree
+            ensembles are copied either way.
+    """
+    bundle_path = Path(models_dir) / BUNDLE_FILENAME
+    payload = joblib.load(bundle_path, mmap_mode=mmap_mode)
+
+    format_version = payload.get('format_version')
+    if format_version != BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported model bundle format {format_version} in {bundle_path}")
+
+    return ModelBundle(
+        models=payload['models'],
+        scaler=payload['scaler'],
+        metadata=payload.get('metadata', {}),
+        content_hash=read_bundle_hash(models_dir),
+        path=bundle_path
+    )
+
+
+def legacy_content_hash(models_dir: Union[str, Path]) -> str:
+    """Combined SHA-256 of the per-model pickles and metadata in a directory"""
+    models_dir = Path(models_dir)
+    digest = hashlib.sha256()
+    for name in [METADATA_FILENAME, LEGACY_SCALER_FILE, *LEGACY_MODEL_FILES.values()]:
+        path = models_dir / name
+        if path.exists():
+            digest.update(f"{name}:{file_sha256(path)};".encode())
+    return digest.hexdigest()
+
+
+def load_legacy_models(models_dir: Union[str, Path]) -> ModelBundle:
+    """Load a model set stored as separate per-model pickles"""
+    models_dir = Path(models_dir)
+    content_hash = legacy_content_hash(models_dir)
+
+    metadata = {}
+    metadata_path = models_dir / METADATA_FILENAME
+    if metadata_path.exists():
+        with open(metadata_path, 'r') as f:
+            metadata = json.load(f)
+
+    models = {}
+    for name, filename in LEGACY_MODEL_FILES.items():
+        model_path = models_dir / filename
+        if model_path.exists():
+            models[name] = joblib.load(model_path)
+
+    return ModelBundle(
+        models=models,
+        scaler=joblib.load(models_dir / LEGACY_SCALER_FILE),
+        metadata=metadata,
+        content_hash=content_hash,
+        path=models_dir
+    )
+
+
+def save_canary_set(models_dir: Union[str, Path], features: np.ndarray, labels: np.ndarray):
+    """
+    Store held-out (unscaled) feature vectors and labels for verifying new
+    model sets, replacing any previous canary set atomically
+    """
+    canary_path = Path(models_dir) / CANARY_FILENAME
+    tmp_path = canary_path.with_name(f"{canary_path.stem}.tmp.npz")
+    np.savez(tmp_path, features=np.asarray(features, dtype=np.float32), labels=np.asarray(labels))
+    tmp_path.replace(canary_path)
+
+
+def load_canary_set(models_dir: Union[str, Path]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Load the canary feature vectors and labels of a directory, if present"""
+    canary_path = Path(models_dir) / CANARY_FILENAME
+    if not canary_path.exists():
+        return None
+    with np.load(canary_path) as data:
+        return data['features'], data['labels']
+
+
+def convert_legacy_models(models_dir: Union[str, Path]) -> str:
+    """Build a bundle from the per-model pickles in a directory"""
+    legacy = load_legacy_models(models_dir)
+    if not legacy.models:
+        raise FileNotFoundError(f"No model pickles found in {models_dir}")
+    # Same models, so their canary set stays valid
+    return save_bundle(models_dir, legacy.models, legacy.scaler, legacy.metadata,
+                       canary_set=load_canary_set(models_dir))
+
+
+if __name__ == "__main__":
+    target_dir = sys.argv[1] if len(sys.argv) > 1 else "trained_models"
+    bundle_hash = convert_legacy_models(target_dir)
+    print(f"✅ Wrote {Path(target_dir) / BUNDLE_FILENAME}")
+    print(f"   Content hash: {bundle_hash}")
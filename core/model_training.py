@@ -0,0 +1,305 @@
+"""
+Voice Clone Detection Model Training
+====================================
+
+Fits the classifiers of a training script and measures what each one
+costs at inference time: fit seconds, prediction latency (per sample in a
+batch and for a single vector, as the detector scores it) and pickled
+model size, reported next to accuracy and AUC.
+
+Two modes:
+
+- **Standard** (``fast=False``): every model is fitted on the whole
+  training set, one after the other, with all threads of the budget.
+- **Fast** (``fast=True``): the stratified fold splits are built once and
+  reused. The first fold is held out as validation set: XGBoost uses the
+  ``hist`` tree method and stops adding trees once the validation loss has
+  not improved for ``early_stopping_rounds`` rounds, and RandomForest is
+  grown with ``warm_start`` ``forest_step`` trees at a time until the
+  validation loss stops improving, then cut back to the best round.
+  Calibrated models are frozen and calibrated on the validation fold
+  instead of being refitted three times. All models train
+  concurrently, the thread budget split between them.
+
+Cross-validation reuses the same folds. In fast mode it refits each model
+with the tree count found above instead of early stopping again.
+
+Usage:
+    trainer = ModelTrainer(fast=True, thread_budget=8)
+    results = trainer.train_all(models, X_train, y_train, X_test, y_test, cross_validate=True)
+    metadata['models'] = {name: model_report(result) for name, result in results.items()}
+
+Author: SAP GHOST AI Team
+Version: 1.0
+"""
+
+import os
+import time
+import pickle
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, log_loss, roc_auc_score
+from sklearn.model_selection import StratifiedKFold, cross_val_score
+
+try:
+    # scikit-learn >= 1.6; cv='prefit' was removed in 1.8
+    from sklearn.frozen import FrozenEstimator
+except ImportError:
+    FrozenEstimator = None
+
+Fold = Tuple[np.ndarray, np.ndarray]
+
+# Vectors timed one at a time for the single-prediction latency
+LATENCY_SAMPLES = 20
+
+
+def build_folds(y: np.ndarray, n_splits: int = 5, seed: int = 42) -> List[Fold]:
+    """Stratified (train indices, validation indices) splits of the labels"""
+    splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed)
+    return list(splitter.split(np.zeros(len(y)), y))
+
+
+def model_size_bytes(model: Any) -> int:
+    """Size of the pickled model"""
+    return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _is_xgboost(model: Any) -> bool:
+    return type(model).__module__.split('.')[0] == 'xgboost'
+
+
+def _tree_count(model: Any) -> Optional[int]:
+    if _is_xgboost(model):
+        best_iteration = getattr(model, 'best_iteration', None)
+        return best_iteration + 1 if best_iteration is not None else model.n_estimators
+    if isinstance(model, RandomForestClassifier):
+        return len(getattr(model, 'estimators_', ())) or model.n_estimators
+    return None
+
+
+def base_estimator(model: Any) -> Any:
+    """The classifier inside a calibrated (and possibly frozen) model"""
+    if isinstance(model, CalibratedClassifierCV):
+        model = model.estimator
+    if FrozenEstimator is not None and isinstance(model, FrozenEstimator):
+        model = model.estimator
+    return model
+
+
+def calibrate_prefit(model: Any, X_val: np.ndarray, y_val: np.ndarray) -> CalibratedClassifierCV:
+    """Calibrate an already fitted model on held-out data without refitting it"""
+    if FrozenEstimator is not None:
+        return CalibratedClassifierCV(FrozenEstimator(model), method='sigmoid').fit(X_val, y_val)
+    return CalibratedClassifierCV(model, method='sigmoid', cv='prefit').fit(X_val, y_val)
+
+
+def fixed_size(model: Any) -> Any:
+    """Unfitted copy of a fitted model that trains the number of trees it ended up with"""
+    copy = clone(model)
+    if _is_xgboost(model):
+        copy.set_params(n_estimators=_tree_count(model), early_stopping_rounds=None)
+    elif isinstance(model, RandomForestClassifier):
+        copy.set_params(n_estimators=_tree_count(model), warm_start=False)
+    return copy
+
+
+def model_report(result: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-serializable metrics of one train_all() result"""
+    keys = ('accuracy', 'auc_score', 'training_time', 'fit_seconds', 'predict_ms',
+            'predict_single_ms', 'model_size_bytes', 'n_estimators', 'cv_mean', 'cv_std')
+    return {key: result[key] for key in keys if result.get(key) is not None}
+
+
+class ModelTrainer:
+    """
+    Fits and evaluates a set of classifiers, standard or fast mode
+    """
+
+    def __init__(self, fast: bool = False, thread_budget: Optional[int] = None,
+                 n_splits: int = 5, early_stopping_rounds: int = 20,
+                 forest_step: int = 50, forest_tolerance: float = 1e-3, seed: int = 42):
+        self.fast = fast
+        self.thread_budget = thread_budget or os.cpu_count() or 1
+        self.n_splits = n_splits
+        self.early_stopping_rounds = early_stopping_rounds
+        self.forest_step = forest_step
+        self.forest_tolerance = forest_tolerance
+        self.seed = seed
+        self._folds: Dict[str, List[Fold]] = {}
+
+    def folds(self, y: np.ndarray) -> List[Fold]:
+        """Fold splits of these labels, built on first use"""
+        key = hashlib.blake2b(np.ascontiguousarray(y).tobytes(), digest_size=16).hexdigest()
+        if key not in self._folds:
+            self._folds[key] = build_folds(y, self.n_splits, self.seed)
+        return self._folds[key]
+
+    def validation_split(self, y: np.ndarray) -> Fold:
+        """(fit indices, validation indices) used in fast mode"""
+        return self.folds(y)[0]
+
+    def _set_threads(self, model: Any, n_jobs: int) -> Any:
+        if 'n_jobs' in model.get_params():
+            model.set_params(n_jobs=n_jobs)
+        return model
+
+    def _grow_forest(self, model: RandomForestClassifier, X_fit: np.ndarray, y_fit: np.ndarray,
+                     X_val: np.ndarray, y_val: np.ndarray):
+        """
+        Add forest_step trees at a time until the validation loss stops
+        improving, then drop the trees of the last round that did not help
+        """
+        max_trees = model.n_estimators
+        model.set_params(warm_start=True)
+        best_loss = np.inf
+        best_trees = trees = 0
+        while trees < max_trees:
+            trees = min(trees + self.forest_step, max_trees)
+            model.set_params(n_estimators=trees)
+            model.fit(X_fit, y_fit)
+            loss = log_loss(y_val, model.predict_proba(X_val), labels=model.classes_)
+            if best_loss - loss < self.forest_tolerance:
+                break
+            best_loss, best_trees = loss, trees
+
+        if best_trees < len(model.estimators_):
+            # Trees are independent, so the first best_trees are exactly the best round's forest
+            del model.estimators_[best_trees:]
+            model.set_params(n_estimators=best_trees)
+
+    def fit(self, model: Any, X_train: np.ndarray, y_train: np.ndarray,
+            n_jobs: int, calibrate: bool = False) -> Tuple[Any, float]:
+        """
+        Fit one model in the trainer's mode
+
+        Returns:
+            (fitted model, calibrated if requested; fit seconds)
+        """
+        start = time.perf_counter()
+        self._set_threads(model, n_jobs)
+
+        if not self.fast:
+            if calibrate:
+                # Calibration fits its own copies of the model
+                model = CalibratedClassifierCV(model, method='sigmoid', cv=3).fit(X_train, y_train)
+            else:
+                model.fit(X_train, y_train)
+            return model, time.perf_counter() - start
+
+        fit_index, val_index = self.validation_split(y_train)
+        X_fit, y_fit = X_train[fit_index], y_train[fit_index]
+        X_val, y_val = X_train[val_index], y_train[val_index]
+
+        if _is_xgboost(model):
+            model.set_params(tree_method='hist', early_stopping_rounds=self.early_stopping_rounds)
+            model.fit(X_fit, y_fit, eval_set=[(X_val, y_val)], verbose=False)
+        elif isinstance(model, RandomForestClassifier):
+            self._grow_forest(model, X_fit, y_fit, X_val, y_val)
+        else:
+            model.fit(X_fit, y_fit)
+
+        if calibrate:
+            model = calibrate_prefit(model, X_val, y_val)
+        return model, time.perf_counter() - start
+
+    def evaluate(self, model: Any, X_test: np.ndarray, y_test: np.ndarray) -> Dict[str, Any]:
+        """Accuracy, AUC and prediction latency on the test set"""
+        start = time.perf_counter()
+        probabilities = model.predict_proba(X_test)
+        predict_seconds = time.perf_counter() - start
+        predictions = model.classes_[np.argmax(probabilities, axis=1)]
+
+        # The detector scores one vector per request
+        single = []
+        for row in X_test[:LATENCY_SAMPLES]:
+            start = time.perf_counter()
+            model.predict_proba(row.reshape(1, -1))
+            single.append(time.perf_counter() - start)
+
+        return {
+            'accuracy': accuracy_score(y_test, predictions),
+            'auc_score': roc_auc_score(y_test, probabilities[:, 1]),
+            'predict_ms': predict_seconds / max(len(X_test), 1) * 1000,
+            'predict_single_ms': float(np.median(single)) * 1000 if single else None,
+            'predictions': predictions,
+            'probabilities': probabilities
+        }
+
+    def cross_validate(self, model: Any, X_train: np.ndarray, y_train: np.ndarray, n_jobs: int) -> np.ndarray:
+        """Accuracy on each cached fold"""
+        folds = self.folds(y_train)
+        if not self.fast:
+            return cross_val_score(clone(model), X_train, y_train, cv=folds, scoring='accuracy')
+
+        base = base_estimator(model)
+        scores = []
+        for fit_index, val_index in folds:
+            fold_model = self._set_threads(fixed_size(base), n_jobs).fit(X_train[fit_index], y_train[fit_index])
+            scores.append(accuracy_score(y_train[val_index], fold_model.predict(X_train[val_index])))
+        return np.array(scores)
+
+    def _train_one(self, model: Any, X_train: np.ndarray, y_train: np.ndarray, X_test: np.ndarray,
+                   y_test: np.ndarray, n_jobs: int, calibrate: bool, cross_validate: bool) -> Dict[str, Any]:
+        start = time.perf_counter()
+        model, fit_seconds = self.fit(model, X_train, y_train, n_jobs, calibrate)
+        result = self.evaluate(model, X_test, y_test)
+        result.update({
+            'model': model,
+            'fit_seconds': fit_seconds,
+            'model_size_bytes': model_size_bytes(model),
+            'n_estimators': _tree_count(base_estimator(model))
+        })
+        if cross_validate:
+            cv_scores = self.cross_validate(model, X_train, y_train, n_jobs)
+            result['cv_mean'] = float(cv_scores.mean())
+            result['cv_std'] = float(cv_scores.std())
+        result['training_time'] = time.perf_counter() - start
+        return result
+
+    def train_all(self, models: Dict[str, Any], X_train: np.ndarray, y_train: np.ndarray,
+                  X_test: np.ndarray, y_test: np.ndarray, cross_validate: bool = False,
+                  calibrate: bool = False,
+                  inputs: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Fit, evaluate and optionally cross-validate every model
+
+        Args:
+            models: Unfitted estimators by name
+            cross_validate: Also score each model on the cached folds
+            calibrate: Wrap each model in sigmoid probability calibration
+            inputs: Per-model (X_train, X_test) replacing the shared
+                matrices (e.g. unscaled features for tree models)
+
+        Returns:
+            Per model: the fitted model, metrics, predictions and timings
+        """
+        inputs = inputs or {}
+        start = time.perf_counter()
+
+        def train(name):
+            X_model_train, X_model_test = inputs.get(name, (X_train, X_test))
+            return self._train_one(models[name], X_model_train, y_train, X_model_test, y_test,
+                                   n_jobs, calibrate, cross_validate)
+
+        if self.fast and len(models) > 1:
+            from threadpoolctl import threadpool_limits
+
+            # Models train side by side and share the thread budget
+            n_jobs = max(1, self.thread_budget // len(models))
+            with threadpool_limits(limits=n_jobs), ThreadPoolExecutor(max_workers=len(models)) as executor:
+                futures = {name: executor.submit(train, name) for name in models}
+                results = {name: future.result() for name, future in futures.items()}
+        else:
+            n_jobs = self.thread_budget
+            results = {name: train(name) for name in models}
+
+        mode = 'fast' if self.fast else 'standard'
+        print(f"⚡ Trained {len(models)} models ({mode} mode) in {time.perf_counter() - start:.1f}s "
+              f"on {self.thread_budget} threads")
+        return results
@@ -73,6 +73,15 @@ class DetectionLog(models.Model):
         ordering = ['-timestamp']
         verbose_name = 'Detection Log'
         verbose_name_plural = 'Detection Logs'
+        indexes = [
+            # History and dashboard lists: a user's logs, newest first, optionally of one type
+            models.Index(fields=['user', '-timestamp'], name='detlog_user_ts_idx'),
+            models.Index(fields=['user', 'analysis_type', '-timestamp'], name='detlog_user_type_ts_idx'),
+            # History page and exports across all users
+            models.Index(fields=['-timestamp'], name='detlog_ts_idx'),
+            models.Index(fields=['analysis_type', '-timestamp'], name='detlog_type_ts_idx'),
+            models.Index(fields=['result', '-timestamp'], name='detlog_result_ts_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_analysis_type_display()} - {self.get_result_display()} - {self.timestamp.strftime('%Y-%m-%d %H:%M')}"
@@ -97,6 +106,9 @@ class DeepfakeDetectionLog(models.Model):
         verbose_name = 'Deepfake Detection Log'
         verbose_name_plural = 'Deepfake Detection Logs'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='deepfake_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.get_file_type_display()} - {'Fake' if self.is_fake else 'Real'} - {self.created_at}"
@@ -149,12 +161,26 @@ class VoiceDetectionLog(models.Model):
     bit_rate = models.IntegerField(default=128)
     format = models.CharField(max_length=10, default='wav')
     
+    # Background job tracking
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Lease renewed by the worker while it processes the job
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    error_message = models.TextField(blank=True, default='')
+    
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         verbose_name = 'Voice Detection Log'
         verbose_name_plural = 'Voice Detection Logs'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='voice_user_created_idx'),
+            models.Index(fields=['user', 'status', '-created_at'], name='voice_user_status_idx'),
+            # Job queue: oldest pending job (covers the id-only claim query) and stale claims
+            models.Index(fields=['status', 'created_at', 'id'], name='voice_queue_idx'),
+            models.Index(fields=['status', 'heartbeat_at'], name='voice_stale_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.get_result_display()} - {self.created_at}"
@@ -179,6 +205,101 @@ class FraudDetectionLog(models.Model):
     class Meta:
         verbose_name = 'Fraud Detection Log'
         verbose_name_plural = 'Fraud Detection Logs'
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='fraud_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {'Fraudulent' if self.is_fraudulent else 'Legitimate'} - {self.created_at}"
+
+class DetectionStat(models.Model):
+    """
+    Materialized log counts, kept up to date by core.detection_stats as logs are written.
+    One row per user (null: all users), log type, analysis type, result and day.
+    """
+    SOURCES = [
+        ('detection', 'Detection Log'),
+        ('deepfake', 'Deepfake Detection Log'),
+        ('voice', 'Voice Detection Log'),
+        ('fraud', 'Fraud Detection Log'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='detection_stats')
+    source = models.CharField(max_length=20, choices=SOURCES)
+    analysis_type = models.CharField(max_length=50, blank=True, default='')
+    result = models.CharField(max_length=20, blank=True, default='')
+    day = models.DateField()
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Detection Statistic'
+        verbose_name_plural = 'Detection Statistics'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'source', 'analysis_type', 'result', 'day'],
+                                    name='unique_detection_stat'),
+            # NULLs never compare equal, so the all-users rows need their own constraint
+            models.UniqueConstraint(fields=['source', 'analysis_type', 'result', 'day'],
+                                    condition=models.Q(user__isnull=True),
+                                    name='unique_global_detection_stat'),
+        ]
+
+    def __str__(self):
+        owner = self.user.username if self.user_id else 'All users'
+        return f"{owner} - {self.source}/{self.analysis_type or '-'}/{self.result or '-'} - {self.day}: {self.count}"
+
+def report_storage():
+    """Private store of rendered reports, outside MEDIA_ROOT so files are only served through the views"""
+    from django.conf import settings
+    from django.core.files.storage import FileSystemStorage
+
+    return FileSystemStorage(location=settings.REPORT_ARTIFACT_ROOT)
+
+class ReportArtifact(models.Model):
+    """
+    A rendered report, addressed by a hash of what it shows (see core.report_jobs).
+    The row is also the background job that renders it.
+    """
+    KINDS = [
+        ('analysis', 'Analysis Report'),
+        ('history', 'History Export'),
+        ('bulk', 'Bulk Report'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    key = models.CharField(max_length=64, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='report_artifacts')
+    kind = models.CharField(max_length=20, choices=KINDS)
+    report_type = models.CharField(max_length=20)
+    params = models.JSONField(default=dict, blank=True)
+    template_version = models.CharField(max_length=20)
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    file = models.FileField(upload_to='reports/', storage=report_storage, null=True, blank=True)
+    filename = models.CharField(max_length=255, blank=True, default='')
+    content_type = models.CharField(max_length=100, blank=True, default='')
+    sha256 = models.CharField(max_length=64, blank=True, default='')
+    size = models.BigIntegerField(default=0)
+    error_message = models.TextField(blank=True, default='')
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Lease renewed by the worker while it renders the report
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Report Artifact'
+        verbose_name_plural = 'Report Artifacts'
+        indexes = [
+            models.Index(fields=['status', 'created_at', 'id'], name='report_queue_idx'),
+            models.Index(fields=['status', 'heartbeat_at'], name='report_stale_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} ({self.report_type}) - {self.status} - {self.key[:12]}"
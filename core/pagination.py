@@ -0,0 +1,224 @@
+"""
+Keyset History Pagination
+=========================
+
+Cursor pagination for the history pages and APIs. Logs are listed newest
+first, ordered by (timestamp, id); a page continues strictly before the
+(timestamp, id) of the last row shown, so every page is an index range
+scan of the same cost however deep the user pages, and rows written
+meanwhile never shift a page or show up twice.
+
+Cursors are opaque: the position is signed (``django.core.signing``) so
+clients cannot forge or edit them, and the token format can change
+without breaking clients that only pass it back. The total row count is
+a separate COUNT query and only runs when asked for (``include_total=1``).
+
+Usage:
+    cursor, page_size, with_total = page_params(request)
+    page = paginate_keyset(logs, 'created_at', cursor, page_size, with_total)
+    return JsonResponse({'success': True, 'history': [...], **page.as_json()})
+
+Author: SAP GHOST AI Team
+Version: 1.0
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.core import signing
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+
+CURSOR_SALT = 'core.pagination.cursor'
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Cursor directions: rows older than the position, or newer (back towards the first page)
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(ValueError):
+    """The cursor was not issued by this module or belongs to another listing"""
+
+
+def encode_cursor(payload: Any) -> str:
+    return signing.dumps(payload, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(token: str) -> Any:
+    try:
+        return signing.loads(token, salt=CURSOR_SALT)
+    except signing.BadSignature as e:
+        raise InvalidCursor('Invalid cursor') from e
+
+
+def page_params(request, default_size: int = DEFAULT_PAGE_SIZE) -> Tuple[Optional[str], int, bool]:
+    """
+    (cursor, page size, include total) from the query string
+
+    ``limit`` is clamped to 1..MAX_PAGE_SIZE; ``include_total`` accepts 1/true/yes.
+    """
+    cursor = request.GET.get('cursor') or None
+    try:
+        page_size = int(request.GET.get('limit', default_size))
+    except (TypeError, ValueError):
+        page_size = default_size
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    with_total = request.GET.get('include_total', '').lower() in ('1', 'true', 'yes')
+    return cursor, page_size, with_total
+
+
+def _position(obj, field: str) -> List[Any]:
+    return [getattr(obj, field).isoformat(), obj.pk]
+
+
+def _parse_position(position: Any) -> Tuple[Any, Any]:
+    if not isinstance(position, (list, tuple)) or len(position) != 2:
+        raise InvalidCursor('Invalid cursor')
+    timestamp = parse_datetime(position[0]) if isinstance(position[0], str) else None
+    if timestamp is None:
+        raise InvalidCursor('Invalid cursor')
+    return timestamp, position[1]
+
+
+def _older(queryset: QuerySet, field: str, position: Any) -> QuerySet:
+    """Rows after the position in newest-first order"""
+    timestamp, pk = _parse_position(position)
+    return queryset.filter(Q(**{f'{field}__lt': timestamp}) | Q(**{field: timestamp, 'pk__lt': pk}))
+
+
+def _newer(queryset: QuerySet, field: str, position: Any) -> QuerySet:
+    timestamp, pk = _parse_position(position)
+    return queryset.filter(Q(**{f'{field}__gt': timestamp}) | Q(**{field: timestamp, 'pk__gt': pk}))
+
+
+class KeysetPage:
+    """
+    One page of rows plus the cursors of its neighbours
+    """
+
+    def __init__(self, items: List[Any], next_cursor: Optional[str] = None,
+                 previous_cursor: Optional[str] = None, total: Optional[int] = None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.total = total
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def as_json(self) -> Dict[str, Any]:
+        """Paging keys of a JSON history response"""
+        data = {
+            'count': len(self.items),
+            'next_cursor': self.next_cursor,
+            'has_more': self.has_next
+        }
+        if self.total is not None:
+            data['total_count'] = self.total
+        return data
+
+
+def paginate_keyset(queryset: QuerySet, field: str, cursor: Optional[str] = None,
+                    page_size: int = DEFAULT_PAGE_SIZE, with_total: bool = False) -> KeysetPage:
+    """
+    One newest-first page of a queryset
+
+    Args:
+        queryset: Filtered rows; its ordering is replaced by (-field, -id)
+        field: Timestamp field the rows are listed by
+        cursor: next_cursor or previous_cursor of an earlier page, None for the first page
+        with_total: Also count all rows of the queryset
+
+    Raises:
+        InvalidCursor: The cursor is forged, corrupt or from another listing
+    """
+    direction, position = NEXT, None
+    if cursor:
+        payload = decode_cursor(cursor)
+        if not isinstance(payload, list) or len(payload) != 2 or payload[0] not in (NEXT, PREVIOUS):
+            raise InvalidCursor('Invalid cursor')
+        direction, position = payload
+
+    if direction == NEXT:
+        rows = queryset.order_by(f'-{field}', '-pk')
+        if position is not None:
+            rows = _older(rows, field, position)
+    else:
+        # Walk back towards the first page in ascending order, then flip the page
+        rows = _newer(queryset, field, position).order_by(field, 'pk')
+
+    rows = list(rows[:page_size + 1])
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == NEXT:
+        has_next, has_previous = more, position is not None
+    else:
+        rows.reverse()
+        has_next, has_previous = True, more
+
+    next_cursor = encode_cursor([NEXT, _position(rows[-1], field)]) if rows and has_next else None
+    previous_cursor = encode_cursor([PREVIOUS, _position(rows[0], field)]) if rows and has_previous else None
+    total = queryset.count() if with_total else None
+    return KeysetPage(rows, next_cursor, previous_cursor, total)
+
+
+def paginate_merged(sources: Dict[str, Tuple[QuerySet, str]], cursor: Optional[str] = None,
+                    page_size: int = DEFAULT_PAGE_SIZE, with_total: bool = False) -> KeysetPage:
+    """
+    One newest-first page across several log tables
+
+    The cursor holds a (timestamp, id) position per source, so each table
+    is read with its own keyset condition and at most page_size + 1 rows
+    are fetched per table. Forward paging only.
+
+    Args:
+        sources: name -> (filtered queryset, timestamp field)
+
+    Returns:
+        Page whose items are (source name, row) pairs
+    """
+    positions: Dict[str, Any] = {}
+    if cursor:
+        payload = decode_cursor(cursor)
+        if not isinstance(payload, dict):
+            raise InvalidCursor('Invalid cursor')
+        positions = payload
+
+    candidates = []
+    for name, (queryset, field) in sources.items():
+        rows = queryset.order_by(f'-{field}', '-pk')
+        if positions.get(name) is not None:
+            rows = _older(rows, field, positions[name])
+        for row in rows[:page_size + 1]:
+            candidates.append((getattr(row, field), row.pk, name, row))
+
+    candidates.sort(key=lambda candidate: candidate[:3], reverse=True)
+    items = [(name, row) for _, _, name, row in candidates[:page_size]]
+
+    next_cursor = None
+    if len(candidates) > page_size:
+        next_positions = {name: positions.get(name) for name in sources}
+        for name, row in items:
+            # Items are newest first: the last one seen per source is its new position
+            next_positions[name] = _position(row, sources[name][1])
+        next_cursor = encode_cursor(next_positions)
+
+    total = sum(queryset.count() for queryset, _ in sources.values()) if with_total else None
+    return KeysetPage(items, next_cursor, None, total)
@@ -0,0 +1,192 @@
+"""
+Parallel Feature Extraction
+===========================
+
+Process pool for featurizing training sets on every core.
+
+Clips are sent to the workers in chunks (one task per ``chunk_size``
+clips) so the per-task pickling and scheduling overhead is amortised, and
+results come back in input order. Only a bounded number of chunks is in
+flight at a time, so clips produced lazily by a generator (decoded from a
+dataset or synthesized on the fly) never all sit in memory at once.
+
+Each worker runs the shared FeatureExtractor, so parallel and serial
+extraction produce identical vectors.
+
+Usage:
+    with ParallelFeatureExtractor(profile='full') as extractor:
+        features = extractor.extract_all(((audio, sr) for audio in clips), total=len(clips))
+    extractor.report()
+
+Author: SAP GHOST AI Team
+Version: 1.0
+"""
+
+import os
+import time
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+# Feature extractor owned by the current worker process (set by _init_worker)
+_worker_extractor = None
+
+
+def _init_worker(target_sr: int, profile: Optional[str], threads_per_worker: int):
+    """Create the feature extractor once per worker process"""
+    global _worker_extractor
+
+    # Keep BLAS/OpenMP from oversubscribing cores across workers;
+    # must happen before numpy is imported in this process
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ.setdefault(var, str(threads_per_worker))
+
+    _worker_extractor = _create_extractor(target_sr, profile)
+
+
+def _create_extractor(target_sr: int, profile: Optional[str]):
+    from .voice_features import FeatureExtractor, DEFAULT_PROFILE
+
+    return FeatureExtractor(target_sr=target_sr, profile=profile or DEFAULT_PROFILE)
+
+
+def _extract_chunk(chunk: List[Tuple[Any, int]]) -> Tuple[List[Any], float, int]:
+    """
+    Featurize a chunk of (audio, sample_rate) clips in this worker
+
+    Returns:
+        (feature vectors or None per clip, extraction seconds, extractions)
+    """
+    seconds_before = _worker_extractor._extraction_seconds
+    count_before = _worker_extractor._extractions
+    features = [_worker_extractor.features_from_audio(audio, sr) for audio, sr in chunk]
+    return (features, _worker_extractor._extraction_seconds - seconds_before,
+            _worker_extractor._extractions - count_before)
+
+
+def _chunked(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ParallelFeatureExtractor:
+    """
+    Ordered, chunked feature extraction on a pool of worker processes
+    """
+
+    def __init__(self, target_sr: int = 22050, profile: Optional[str] = None,
+                 workers: Optional[int] = None, chunk_size: int = 16,
+                 threads_per_worker: int = 1, start_method: str = 'spawn'):
+        self.target_sr = target_sr
+        self.profile = profile
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.threads_per_worker = threads_per_worker
+        self.start_method = start_method
+        # Chunks queued ahead of the one being collected
+        self.max_pending = self.workers * 2
+        self._executor = None
+
+        self.samples = 0
+        self.failed = 0
+        self.audio_seconds = 0.0
+        self.elapsed = 0.0
+        self._extraction_seconds = 0.0
+        self._extractions = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def _start(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=_init_worker,
+                initargs=(self.target_sr, self.profile, self.threads_per_worker)
+            )
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def imap(self, items: Iterable[Tuple[Any, int]], progress=None) -> Iterator[Optional[Any]]:
+        """
+        Yield the feature vector (None on failure) of each (audio, sample_rate) item, in input order
+
+        Args:
+            items: Raw clips and their sample rates; may be a lazy generator
+            progress: Optional tqdm bar advanced by the number of clips per chunk
+        """
+        global _worker_extractor
+
+        # Wall-clock time accumulates over successive calls
+        start = time.perf_counter() - self.elapsed
+        if self.workers == 1:
+            # No pool: featurize in this process
+            _worker_extractor = _create_extractor(self.target_sr, self.profile)
+            for chunk in self._measured_chunks(items):
+                yield from self._collect(_extract_chunk(chunk), progress, start)
+            return
+
+        executor = self._start()
+        pending = deque()
+        for chunk in self._measured_chunks(items):
+            pending.append(executor.submit(_extract_chunk, chunk))
+            if len(pending) >= self.max_pending:
+                yield from self._collect(pending.popleft().result(), progress, start)
+        while pending:
+            yield from self._collect(pending.popleft().result(), progress, start)
+
+    def extract_all(self, items: Iterable[Tuple[Any, int]], total: Optional[int] = None,
+                    desc: str = "Feature extraction") -> List[Optional[Any]]:
+        """Featurize every item with a progress bar and return the vectors in input order"""
+        from tqdm import tqdm
+
+        with tqdm(total=total, desc=desc) as progress:
+            return list(self.imap(items, progress=progress))
+
+    def _measured_chunks(self, items: Iterable[Tuple[Any, int]]) -> Iterator[List[Tuple[Any, int]]]:
+        for chunk in _chunked(items, self.chunk_size):
+            self.audio_seconds += sum(len(audio) / sr for audio, sr in chunk)
+            yield chunk
+
+    def _collect(self, result: Tuple[List[Any], float, int], progress, start: float) -> List[Optional[Any]]:
+        features, extraction_seconds, extractions = result
+        self.samples += len(features)
+        self.failed += sum(1 for f in features if f is None)
+        self._extraction_seconds += extraction_seconds
+        self._extractions += extractions
+        self.elapsed = time.perf_counter() - start
+        if progress is not None:
+            progress.update(len(features))
+        return features
+
+    def average_extraction_ms(self) -> float:
+        """Average per-clip feature extraction time inside the workers"""
+        if not self._extractions:
+            return 0.0
+        return self._extraction_seconds / self._extractions * 1000
+
+    def throughput(self) -> float:
+        """Clips featurized per second of wall-clock time"""
+        return self.samples / self.elapsed if self.elapsed else 0.0
+
+    def report(self):
+        """Print the throughput of the extractions so far"""
+        realtime = self.audio_seconds / self.elapsed if self.elapsed else 0.0
+        print(f"⚡ Extracted features of {self.samples - self.failed}/{self.samples} clips "
+              f"({self.audio_seconds:.0f}s of audio) in {self.elapsed:.1f}s on {self.workers} workers")
+        print(f"   Throughput: {self.throughput():.1f} clips/s, {realtime:.1f}x real time, "
+              f"{self.average_extraction_ms():.1f} ms per clip per worker")
@@ -0,0 +1,271 @@
+"""
+Background Report Generation
+============================
+
+PDF and Excel reports are rendered by a worker process
+(``python manage.py run_report_worker``) instead of the request thread,
+and kept in an artifact store so a report is only ever rendered once.
+
+Every report is addressed by a key: the SHA-256 of its kind, report
+type, template version and subject (the log id, or for lists the rows
+the report covers). A download request looks the key up in the
+ReportArtifact table:
+
+- completed: the stored file is served as is;
+- pending or processing: the client gets ``202 Accepted`` with a status
+  URL to poll (``?wait=<seconds>`` long-polls), or an auto-refreshing
+  page that redirects to the file once it is ready;
+- missing: a pending artifact is created, which queues it for the worker.
+
+As with the voice jobs (core.voice_jobs), the table is the queue, with
+the claims and leases of core.job_queue: the worker renews the lease while
+it renders, so only reports whose worker died are rendered again. Files live
+under ``REPORT_ARTIFACT_ROOT``, outside MEDIA_ROOT, and are only served
+through the views. Changing a report layout means bumping its entry in
+TEMPLATE_VERSIONS; artifacts of the old version are then no longer found.
+
+Author: SAP GHOST AI Team
+Version: 1.0
+"""
+
+import json
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from django.core.files.base import ContentFile
+from django.db import IntegrityError
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .job_queue import FINISHED_STATUSES, JobQueue
+from .models import (DeepfakeDetectionLog, DetectionLog, FraudDetectionLog, ReportArtifact,
+                     VoiceDetectionLog)
+
+logger = logging.getLogger(__name__)
+
+REPORT_JOBS = JobQueue(ReportArtifact, 'report job',
+                       describe=lambda artifact: f"{artifact.kind} report {artifact.key[:12]}")
+
+# Bump when the layout of a report kind changes
+TEMPLATE_VERSIONS = {
+    'analysis': '1',
+    'history': '1',
+    'bulk': '1',
+}
+
+# Rows listed in the history PDF
+HISTORY_PDF_ROWS = 50
+
+PDF_CONTENT_TYPE = 'application/pdf'
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Bulk report sources: report type -> (model, timestamp field, fields the
+# rows show that can change after the log is created, time of the last change)
+BULK_SOURCES = {
+    'deepfake': (DeepfakeDetectionLog, 'created_at', ('is_fake',), None),
+    'fraud': (FraudDetectionLog, 'created_at', ('is_fraudulent',), None),
+    'voice': (VoiceDetectionLog, 'created_at', ('status', 'result'), 'completed_at'),
+}
+
+
+def analysis_log_model(report_type: str):
+    """Log model an analysis report of this type is rendered from"""
+    if report_type in BULK_SOURCES:
+        return BULK_SOURCES[report_type][0]
+    # OTP reports use DetectionLog
+    return DetectionLog
+
+
+def artifact_key(kind: str, report_type: str, subject: Any) -> str:
+    """Content address of a report"""
+    identity = [kind, report_type, TEMPLATE_VERSIONS[kind], subject]
+    return hashlib.sha256(json.dumps(identity, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def request_report(kind: str, report_type: str, subject: Any, params: Dict[str, Any],
+                   user=None) -> ReportArtifact:
+    """
+    The artifact of a report, queued for rendering if it does not exist yet
+
+    Args:
+        subject: Everything the report's content depends on (hashed into the key)
+        params: What the worker needs to render it
+        user: Owner; None for reports any signed-in user may download
+    """
+    key = artifact_key(kind, report_type, subject)
+    try:
+        artifact, created = ReportArtifact.objects.get_or_create(key=key, defaults={
+            'user': user,
+            'kind': kind,
+            'report_type': report_type,
+            'params': params,
+            'template_version': TEMPLATE_VERSIONS[kind],
+        })
+    except IntegrityError:
+        # Requested concurrently by another client
+        return ReportArtifact.objects.get(key=key)
+
+    if created:
+        logger.info(f"Queued {kind} report {key[:12]} ({report_type})")
+        return artifact
+    return requeue_if_unavailable(artifact)
+
+
+def requeue_if_unavailable(artifact: ReportArtifact) -> ReportArtifact:
+    """Queue a failed report, or one whose file was removed from the store, for another render"""
+    stored = bool(artifact.file) and artifact.file.storage.exists(artifact.file.name)
+    if artifact.status == 'failed' or (artifact.status == 'completed' and not stored):
+        ReportArtifact.objects.filter(pk=artifact.pk, status=artifact.status).update(
+            status='pending', started_at=None, heartbeat_at=None, error_message=''
+        )
+        artifact.refresh_from_db()
+    return artifact
+
+
+def day_window_start(days: int) -> datetime:
+    """Start of the local day `days` days ago; day-aligned so one day's requests share a report"""
+    start_day = timezone.localdate() - timedelta(days=days)
+    return timezone.make_aware(datetime.combine(start_day, datetime.min.time()))
+
+
+def bulk_report_subject(user, report_type: str, start: datetime) -> Dict[str, Any]:
+    """
+    Row count, newest id, rows per result and time of the last change per
+    source in the window: a new, deleted, finished or re-classified log
+    changes the key
+    """
+    subject = {'user': user.pk, 'start': start.isoformat()}
+    for source, (model, timestamp_field, result_fields, changed_field) in BULK_SOURCES.items():
+        if report_type not in ('all', source):
+            continue
+        logs = model.objects.filter(user=user, **{f'{timestamp_field}__gte': start})
+        summary = {'n': Count('id'), 'newest': Max('id')}
+        if changed_field:
+            summary['changed'] = Max(changed_field)
+        subject[source] = {
+            **logs.aggregate(**summary),
+            'results': sorted(
+                [list(row) for row in logs.order_by().values_list(*result_fields).annotate(n=Count('id'))],
+                key=str
+            ),
+        }
+    return subject
+
+
+def claim_next_report() -> Optional[ReportArtifact]:
+    """
+    Atomically move the oldest pending report to processing and return it
+    """
+    return REPORT_JOBS.claim_next()
+
+
+def requeue_stale_reports(stale_after: float) -> int:
+    """
+    Return reports whose lease has not been renewed for stale_after seconds
+    (e.g. after a worker crash) to the queue
+    """
+    return REPORT_JOBS.requeue_stale(stale_after)
+
+
+def render_report(artifact: ReportArtifact) -> Tuple[bytes, str, str]:
+    """
+    Render an artifact's report
+
+    Returns:
+        (content, content type, download filename)
+    """
+    # The layouts live with the views that used to render them inline
+    from . import views
+
+    params = artifact.params
+    stamp = timezone.localtime().strftime('%Y%m%d_%H%M%S')
+
+    if artifact.kind == 'analysis':
+        log = analysis_log_model(artifact.report_type).objects.get(id=params['log_id'])
+        content = views.generate_analysis_report_pdf(log, artifact.report_type)
+        return content, PDF_CONTENT_TYPE, f"ghost_ai_{artifact.report_type}_report_{log.id}_{stamp}.pdf"
+
+    if artifact.kind == 'history':
+        logs = DetectionLog.objects.filter(id__in=params['log_ids']).order_by('-timestamp', '-id')
+        return views.generate_history_pdf(logs), PDF_CONTENT_TYPE, 'detection_history.pdf'
+
+    if artifact.kind == 'bulk':
+        start = datetime.fromisoformat(params['start'])
+        logs = views.collect_bulk_report_logs(artifact.user, artifact.report_type, start)
+        content = views.generate_bulk_report_xlsx(logs)
+        return content, XLSX_CONTENT_TYPE, f"ghost_ai_bulk_report_{artifact.report_type}_{stamp}.xlsx"
+
+    raise ValueError(f"Unknown report kind: {artifact.kind}")
+
+
+def process_report(artifact: ReportArtifact, heartbeat_interval: float = 60.0) -> ReportArtifact:
+    """
+    Render a claimed report into the store, renewing its lease, and record its outcome
+    """
+    try:
+        with REPORT_JOBS.heartbeat(artifact.id, heartbeat_interval):
+            content, content_type, filename = render_report(artifact)
+        extension = '.pdf' if content_type == PDF_CONTENT_TYPE else '.xlsx'
+        # Sharded by key prefix: reports/ab/ab12...pdf
+        name = f"{artifact.key[:2]}/{artifact.key}{extension}"
+
+        storage = artifact.file.storage
+        if storage.exists(f"reports/{name}"):
+            # Left behind by an interrupted attempt
+            storage.delete(f"reports/{name}")
+        artifact.file.save(name, ContentFile(content), save=False)
+
+        artifact.content_type = content_type
+        artifact.filename = filename
+        artifact.sha256 = hashlib.sha256(content).hexdigest()
+        artifact.size = len(content)
+        artifact.status = 'completed'
+        artifact.error_message = ''
+
+    except Exception as e:
+        logger.error(f"Report {artifact.key[:12]} failed: {str(e)}")
+        artifact.status = 'failed'
+        artifact.error_message = str(e)
+
+    artifact.completed_at = timezone.now()
+    artifact.save()
+    return artifact
+
+
+def run_report_worker(poll_interval: float = 1.0, stale_after: float = 600.0, once: bool = False) -> int:
+    """
+    Render queued reports until interrupted (or until the queue is empty with once=True)
+
+    Reports whose lease has not been renewed for stale_after seconds are
+    requeued; the rendering report's lease is renewed several times per period.
+
+    Returns:
+        Number of reports processed
+    """
+    return REPORT_JOBS.run_worker(process_report, poll_interval, stale_after, once)
+
+
+def wait_for_report(artifact: ReportArtifact, timeout: float, poll_interval: float = 0.5) -> ReportArtifact:
+    """
+    Long-poll: refresh an artifact until it is rendered or the timeout expires
+    """
+    return REPORT_JOBS.wait_for(artifact, timeout, poll_interval)
+
+
+def purge_reports(older_than_days: int) -> int:
+    """
+    Delete artifacts (and their files) created more than older_than_days ago
+
+    Returns:
+        Number of artifacts deleted
+    """
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    deleted = 0
+    for artifact in ReportArtifact.objects.filter(created_at__lt=cutoff).exclude(status='processing').iterator():
+        if artifact.file:
+            artifact.file.delete(save=False)
+        artifact.delete()
+        deleted += 1
+    return deleted
@@ -4,9 +4,9 @@ from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib import messages
-from django.http import HttpResponse, JsonResponse
+from django.http import FileResponse, HttpResponse, JsonResponse
+from django.urls import reverse
 from django.db.models import Q, Count
-from django.core.paginator import Paginator
 from django.utils import timezone
 from datetime import datetime, timedelta
 from django.views.decorators.csrf import csrf_protect, csrf_exempt
@@ -15,6 +15,7 @@ from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
 import json
 import csv
+from urllib.parse import urlencode
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib import colors
@@ -46,9 +47,15 @@ def get_client_ip(request):
     return ip
 from django.conf import settings
 import os
-from .models import DetectionLog, DeepfakeDetectionLog, FraudDetectionLog, UserProfile, VoiceDetectionLog
+from .models import DetectionLog, DeepfakeDetectionLog, FraudDetectionLog, ReportArtifact, UserProfile, VoiceDetectionLog
 from .utils import demo_deepfake_detection, demo_voice_authentication, demo_fraud_detection, demo_otp_verification
 from .voice_otp_verifier import voice_otp_verifier
+from .detection_stats import get_detection_stats
+from .history_export import csv_response, export_rows, xlsx_response
+from .report_jobs import FINISHED_STATUSES as REPORT_FINISHED_STATUSES
+from .report_jobs import (HISTORY_PDF_ROWS, analysis_log_model, bulk_report_subject, day_window_start,
+                          request_report, requeue_if_unavailable, wait_for_report)
+from .pagination import InvalidCursor, page_params, paginate_keyset, paginate_merged
 
 @csrf_protect
 def login_view(request):
@@ -194,13 +201,14 @@ def dashboard_view(request):
     # Get recent detection logs
     recent_detections = DetectionLog.objects.filter(user=user).order_by('-timestamp')[:10]
     
-    # Get detection statistics
+    # Get detection statistics (materialized counters, one query)
+    stats = get_detection_stats(user)
     detection_stats = {
-        'total_detections': DetectionLog.objects.filter(user=user).count(),
-        'deepfake_detections': DetectionLog.objects.filter(user=user, analysis_type='deepfake').count(),
-        'voice_detections': DetectionLog.objects.filter(user=user, analysis_type='voice').count(),
-        'fraud_detections': DetectionLog.objects.filter(user=user, analysis_type='fraud').count(),
-        'otp_detections': DetectionLog.objects.filter(user=user, analysis_type='otp').count(),
+        'total_detections': stats.total('detection'),
+        'deepfake_detections': stats.total('detection', 'deepfake'),
+        'voice_detections': stats.total('detection', 'voice'),
+        'fraud_detections': stats.total('detection', 'fraud'),
+        'otp_detections': stats.total('detection', 'otp'),
     }
     
     context = {
@@ -324,10 +332,12 @@ def history(request):
     if analysis_type != 'all':
         logs = logs.filter(analysis_type=analysis_type)
     
+    day_from = day_to = None
     if date_from:
         try:
             date_from_obj = datetime.strptime(date_from, '%Y-%m-%d')
             logs = logs.filter(timestamp__gte=date_from_obj)
+            day_from = date_from_obj.date()
         except ValueError:
             pass
     
@@ -335,6 +345,7 @@ def history(request):
         try:
             date_to_obj = datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1)
             logs = logs.filter(timestamp__lt=date_to_obj)
+            day_to = date_to_obj.date() - timedelta(days=1)
         except ValueError:
             pass
     
@@ -345,25 +356,49 @@ def history(request):
             Q(analysis_type__icontains=search_query)
         )
     
+    cursor, _, with_total = page_params(request)
+    
     # Calculate statistics
-    total_scans = logs.count()
-    authentic_content = logs.filter(result__in=['verified', 'authentic']).count()
-    deepfakes_detected = logs.filter(analysis_type='deepfake', result='suspicious').count()
-    suspicious_items = logs.filter(result__in=['suspicious', 'fraudulent', 'rejected']).count()
+    authentic_results = ['verified', 'authentic']
+    suspicious_results = ['suspicious', 'fraudulent', 'rejected']
+    if not search_query:
+        # The DetectionStat counters cover the type and date filters: one small query
+        stats = get_detection_stats(day_from=day_from, day_to=day_to)
+        type_filter = None if analysis_type == 'all' else analysis_type
+        total_scans = stats.total('detection', type_filter)
+        authentic_content = sum(stats.total('detection', type_filter, result) for result in authentic_results)
+        deepfakes_detected = (stats.total('detection', 'deepfake', 'suspicious')
+                              if analysis_type in ('all', 'deepfake') else 0)
+        suspicious_items = sum(stats.total('detection', type_filter, result) for result in suspicious_results)
+    elif with_total:
+        # Searches have no counters; only counted when asked for (include_total=1)
+        total_scans = logs.count()
+        authentic_content = logs.filter(result__in=authentic_results).count()
+        deepfakes_detected = logs.filter(analysis_type='deepfake', result='suspicious').count()
+        suspicious_items = logs.filter(result__in=suspicious_results).count()
+    else:
+        total_scans = authentic_content = deepfakes_detected = suspicious_items = None
     
     # Calculate accuracy rate
-    if total_scans > 0:
+    if total_scans:
         accuracy_rate = round((authentic_content / total_scans) * 100, 1)
     else:
-        accuracy_rate = 0
+        accuracy_rate = None if total_scans is None else 0
+    
+    # Keyset pagination: 15 logs per page, no COUNT or OFFSET per page
+    try:
+        page_obj = paginate_keyset(logs, 'timestamp', cursor, 15, with_total)
+    except InvalidCursor:
+        # Stale or edited link: start over at the newest logs
+        page_obj = paginate_keyset(logs, 'timestamp', None, 15, with_total)
     
-    # Pagination
-    paginator = Paginator(logs, 15)  # Show 15 logs per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Filters carried over to the page links
+    filter_query = urlencode({key: request.GET[key] for key in ('search', 'analysis_type', 'date_from', 'date_to')
+                              if request.GET.get(key)})
     
     context = {
         'page_obj': page_obj,
+        'filter_query': filter_query,
         'total_scans': total_scans,
         'authentic_content': authentic_content,
         'deepfakes_detected': deepfakes_detected,
@@ -379,11 +414,15 @@ def history(request):
 
 @login_required
 def export_history_pdf(request):
-    """Export detection history as PDF"""
-    # Create the HttpResponse object with PDF headers
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = 'attachment; filename="detection_history.pdf"'
-    
+    """Export detection history as PDF, rendered by the report worker"""
+    # The newest logs the report lists; new logs give a new report
+    log_ids = list(DetectionLog.objects.order_by('-timestamp', '-id')
+                   .values_list('id', flat=True)[:HISTORY_PDF_ROWS])
+    artifact = request_report('history', 'pdf', log_ids, {'log_ids': log_ids})
+    return _report_response(request, artifact)
+
+def generate_history_pdf(logs):
+    """Generate the detection history PDF listing the given logs"""
     # Create the PDF object
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4)
@@ -406,9 +445,6 @@ def export_history_pdf(request):
     elements.append(date_para)
     elements.append(Spacer(1, 12))
     
-    # Get data
-    logs = DetectionLog.objects.all()[:50]  # Limit to last 50 records
-    
     # Create table data
     data = [['Request ID', 'Timestamp', 'Analysis Type', 'Result', 'Confidence', 'Plan']]
     
@@ -440,72 +476,21 @@ def export_history_pdf(request):
     # Build PDF
     doc.build(elements)
     
-    # Get the value of the BytesIO buffer and write it to the response
+    # Get the value of the BytesIO buffer and return it
     pdf = buffer.getvalue()
     buffer.close()
-    response.write(pdf)
     
-    return response
+    return pdf
 
 @login_required
 def export_history_excel(request):
-    """Export detection history as Excel"""
-    # Create the HttpResponse object with Excel headers
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = 'attachment; filename="detection_history.xlsx"'
-    
-    # Create a workbook and add a worksheet
-    output = io.BytesIO()
-    workbook = xlsxwriter.Workbook(output)
-    worksheet = workbook.add_worksheet('Detection History')
-    
-    # Define formats
-    header_format = workbook.add_format({
-        'bold': True,
-        'bg_color': '#1A1A40',
-        'font_color': 'white',
-        'align': 'center',
-        'valign': 'vcenter'
-    })
-    
-    cell_format = workbook.add_format({
-        'align': 'center',
-        'valign': 'vcenter'
-    })
-    
-    # Write headers
-    headers = ['Request ID', 'Timestamp', 'Analysis Type', 'Result', 'Confidence (%)', 'Subscription Plan', 'IP Address']
-    for col, header in enumerate(headers):
-        worksheet.write(0, col, header, header_format)
-    
-    # Get data and write rows
-    logs = DetectionLog.objects.all()
-    for row, log in enumerate(logs, 1):
-        worksheet.write(row, 0, str(log.request_id), cell_format)
-        worksheet.write(row, 1, log.timestamp.strftime('%Y-%m-%d %H:%M:%S'), cell_format)
-        worksheet.write(row, 2, log.get_analysis_type_display(), cell_format)
-        worksheet.write(row, 3, log.get_result_display(), cell_format)
-        worksheet.write(row, 4, log.confidence, cell_format)
-        worksheet.write(row, 5, log.subscription_plan, cell_format)
-        worksheet.write(row, 6, log.ip_address or 'N/A', cell_format)
-    
-    # Adjust column widths
-    worksheet.set_column('A:A', 20)  # Request ID
-    worksheet.set_column('B:B', 20)  # Timestamp
-    worksheet.set_column('C:C', 15)  # Analysis Type
-    worksheet.set_column('D:D', 12)  # Result
-    worksheet.set_column('E:E', 12)  # Confidence
-    worksheet.set_column('F:F', 15)  # Subscription Plan
-    worksheet.set_column('G:G', 15)  # IP Address
-    
-    workbook.close()
-    
-    # Get the value of the BytesIO buffer and write it to the response
-    output.seek(0)
-    response.write(output.getvalue())
-    output.close()
-    
-    return response
+    """Export detection history as Excel, built in constant memory"""
+    return xlsx_response(export_rows(DetectionLog.objects.all()), 'detection_history.xlsx')
+
+@login_required
+def export_history_csv(request):
+    """Export detection history as CSV, streamed row by row"""
+    return csv_response(export_rows(DetectionLog.objects.all()), 'detection_history.csv')
 
 @login_required
 def api_log_detection(request):
@@ -828,7 +813,7 @@ def get_analysis_history(request):
         # Get query parameters for filtering
         days_back = int(request.GET.get('days', 30))
         result_filter = request.GET.get('result', 'all')  # 'all', 'fake', 'authentic'
-        limit = int(request.GET.get('limit', 50))
+        cursor, limit, with_total = page_params(request)
         
         # Build query
         from django.utils import timezone
@@ -838,7 +823,7 @@ def get_analysis_history(request):
         logs = DeepfakeDetectionLog.objects.filter(
             user=request.user,
             created_at__gte=start_date
-        ).order_by('-created_at')
+        )
         
         # Apply result filter
         if result_filter == 'fake':
@@ -846,8 +831,9 @@ def get_analysis_history(request):
         elif result_filter == 'authentic':
             logs = logs.filter(is_fake=False)
             
-        # Limit results
-        logs = logs[:limit]
+        # One page of results
+        page = paginate_keyset(logs, 'created_at', cursor, limit, with_total)
+        logs = page.items
         
         # Prepare detailed history data
         history_data = []
@@ -894,9 +880,11 @@ def get_analysis_history(request):
             'success': True,
             'history': history_data,
             'statistics': statistics,
-            'total_count': total_analyses
+            **page.as_json()
         })
         
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)})
 
@@ -909,14 +897,24 @@ def get_all_detection_history(request):
     try:
         # Get filter parameters
         analysis_type = request.GET.get('analysis_type', 'all')
-        limit = int(request.GET.get('limit', 50))
+        cursor, limit, with_total = page_params(request)
         
-        all_detections = []
-        
-        # Get deepfake detections
+        # Log tables of the requested type, paged together newest first
+        sources = {}
         if analysis_type in ['all', 'deepfake']:
-            deepfake_logs = DeepfakeDetectionLog.objects.filter(user=request.user).order_by('-created_at')[:limit]
-            for log in deepfake_logs:
+            sources['deepfake'] = (DeepfakeDetectionLog.objects.filter(user=request.user), 'created_at')
+        if analysis_type in ['all', 'fraud']:
+            sources['fraud'] = (FraudDetectionLog.objects.filter(user=request.user), 'created_at')
+        if analysis_type in ['all', 'voice']:
+            sources['voice'] = (VoiceDetectionLog.objects.filter(user=request.user), 'created_at')
+        if analysis_type in ['all', 'voice', 'otp']:
+            sources['detection'] = (DetectionLog.objects.filter(user=request.user), 'timestamp')
+        page = paginate_merged(sources, cursor, limit, with_total)
+        
+        all_detections = []
+        for source, log in page:
+            # Deepfake detections
+            if source == 'deepfake':
                 confidence_score = 0
                 if log.confidence_score is not None:
                     confidence_score = round(log.confidence_score * 100, 2)
@@ -938,10 +936,8 @@ def get_all_detection_history(request):
                     'media_url': log.media_file.url if log.media_file else None
                 })
         
-        # Get fraud detections
-        if analysis_type in ['all', 'fraud']:
-            fraud_logs = FraudDetectionLog.objects.filter(user=request.user).order_by('-created_at')[:limit]
-            for log in fraud_logs:
+            # Fraud detections
+            elif source == 'fraud':
                 all_detections.append({
                     'id': log.id,
                     'type': 'fraud',
@@ -958,10 +954,8 @@ def get_all_detection_history(request):
                     'status': 'THREAT' if log.is_fraudulent else 'SAFE'
                 })
         
-        # Get voice detections
-        if analysis_type in ['all', 'voice']:
-            voice_logs = VoiceDetectionLog.objects.filter(user=request.user).order_by('-created_at')[:limit]
-            for log in voice_logs:
+            # Voice detections
+            elif source == 'voice':
                 is_threat = log.result in ['cloned', 'suspicious']
                 all_detections.append({
                     'id': log.id,
@@ -981,10 +975,8 @@ def get_all_detection_history(request):
                     'format': log.format or 'wav'
                 })
         
-        # Get general detection logs
-        if analysis_type in ['all', 'voice', 'otp']:
-            detection_logs = DetectionLog.objects.filter(user=request.user).order_by('-timestamp')[:limit]
-            for log in detection_logs:
+            # General detection logs
+            else:
                 all_detections.append({
                     'id': log.id,
                     'type': log.analysis_type,
@@ -1001,19 +993,15 @@ def get_all_detection_history(request):
                     'status': 'THREAT' if log.result in ['suspicious', 'rejected'] else 'SAFE'
                 })
         
-        # Sort by timestamp (newest first)
-        all_detections.sort(key=lambda x: x['timestamp'], reverse=True)
-        
-        # Apply limit
-        all_detections = all_detections[:limit]
-        
         return JsonResponse({
             'success': True,
             'detections': all_detections,
-            'total_count': len(all_detections),
-            'analysis_type': analysis_type
+            'analysis_type': analysis_type,
+            **page.as_json()
         })
         
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)})
 
@@ -1022,10 +1010,12 @@ def get_all_detection_history(request):
 def get_deepfake_history(request):
     """Get user's deepfake detection history"""
     try:
-        logs = DeepfakeDetectionLog.objects.filter(user=request.user).order_by('-created_at')
+        cursor, limit, with_total = page_params(request)
+        page = paginate_keyset(DeepfakeDetectionLog.objects.filter(user=request.user), 'created_at',
+                               cursor, limit, with_total)
         
         history_data = []
-        for log in logs:
+        for log in page:
             # Handle confidence_score safely
             confidence_score = 0
             if log.confidence_score is not None:
@@ -1045,9 +1035,11 @@ def get_deepfake_history(request):
         return JsonResponse({
             'success': True,
             'history': history_data,
-            'total_count': len(history_data)
+            **page.as_json()
         })
         
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)})
 
@@ -1060,10 +1052,12 @@ def get_otp_history(request):
         logs = DetectionLog.objects.filter(
             user=request.user, 
             analysis_type='otp'
-        ).order_by('-timestamp')
+        )
+        cursor, limit, with_total = page_params(request)
+        page = paginate_keyset(logs, 'timestamp', cursor, limit, with_total)
         
         history_data = []
-        for log in logs:
+        for log in page:
             # Extract metadata
             metadata = log.metadata or {}
             otp_code = metadata.get('otp_code', 'N/A')
@@ -1087,9 +1081,11 @@ def get_otp_history(request):
         return JsonResponse({
             'success': True,
             'history': history_data,
-            'total_count': len(history_data)
+            **page.as_json()
         })
         
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)})
 
@@ -1605,32 +1601,85 @@ def get_risk_level(is_threat, confidence_score):
         return "LOW"
 
 
+def _request_analysis_report(log, report_type):
+    """Artifact of a log's analysis report; a re-analysed voice log gets a new report"""
+    subject = {'log_id': log.id, 'completed_at': getattr(log, 'completed_at', None)}
+    return request_report('analysis', report_type, subject, {'log_id': log.id}, user=log.user)
+
+
+def _wants_json(request):
+    return ('application/json' in request.headers.get('Accept', '')
+            or request.headers.get('X-Requested-With') == 'XMLHttpRequest')
+
+
+def _report_file_response(artifact):
+    """Stream a stored report"""
+    response = FileResponse(artifact.file.open('rb'), as_attachment=True, filename=artifact.filename,
+                            content_type=artifact.content_type)
+    response['ETag'] = f'"{artifact.sha256}"'
+    return response
+
+
+def _report_response(request, artifact, redirect_when_ready=False):
+    """
+    Answer a report request: the file once rendered, otherwise where to wait for it.
+    JSON clients (Accept: application/json) always get the status; ?wait=<seconds>
+    long-polls until the report is rendered.
+    """
+    try:
+        wait = min(max(float(request.GET.get('wait', 0)), 0.0), 25.0)
+    except ValueError:
+        wait = 0.0
+    if wait and artifact.status not in REPORT_FINISHED_STATUSES:
+        artifact = wait_for_report(artifact, timeout=wait)
+    
+    status_url = reverse('report_status', args=[artifact.key])
+    download_url = reverse('download_report_file', args=[artifact.key])
+    
+    if _wants_json(request):
+        data = {
+            'success': artifact.status != 'failed',
+            'report_id': artifact.key,
+            'status': artifact.status,
+            'status_url': status_url,
+            'download_url': download_url if artifact.status == 'completed' else None
+        }
+        if artifact.status == 'failed':
+            data['error'] = artifact.error_message
+            return JsonResponse(data, status=500)
+        if artifact.status == 'completed':
+            return JsonResponse(data)
+        response = JsonResponse(data, status=202)
+        response['Retry-After'] = '2'
+        return response
+    
+    if artifact.status == 'completed':
+        return redirect(download_url) if redirect_when_ready else _report_file_response(artifact)
+    if artifact.status == 'failed':
+        return JsonResponse({'success': False, 'error': artifact.error_message}, status=500)
+    
+    # Browsers get a page that reloads the status URL until the report is ready
+    response = render(request, 'report-pending.html', {'status_url': status_url, 'status': artifact.status},
+                      status=202)
+    response['Retry-After'] = '2'
+    return response
+
+
+def _get_report_artifact(request, key):
+    """A user's artifact (or a shared one), None if it does not exist for them"""
+    return ReportArtifact.objects.filter(Q(user=request.user) | Q(user__isnull=True), key=key).first()
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
 @login_required
 def download_analysis_report(request, log_id, report_type='deepfake'):
-    """Download analysis report as PDF"""
+    """Download analysis report as PDF, rendered by the report worker on first request"""
     try:
-        # Get the appropriate log based on report type
-        if report_type == 'deepfake':
-            log = DeepfakeDetectionLog.objects.get(id=log_id, user=request.user)
-        elif report_type == 'fraud':
-            log = FraudDetectionLog.objects.get(id=log_id, user=request.user)
-        elif report_type == 'voice':
-            log = VoiceDetectionLog.objects.get(id=log_id, user=request.user)
-        else:
-            # For OTP, we'll use DetectionLog for now
-            log = DetectionLog.objects.get(id=log_id, user=request.user)
+        # Get the appropriate log based on report type (OTP uses DetectionLog)
+        log = analysis_log_model(report_type).objects.get(id=log_id, user=request.user)
         
-        # Generate PDF report
-        pdf_data = generate_analysis_report_pdf(log, report_type)
-        
-        # Create response
-        response = HttpResponse(pdf_data, content_type='application/pdf')
-        filename = f'ghost_ai_{report_type}_report_{log_id}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        return response
+        return _report_response(request, _request_analysis_report(log, report_type))
         
     except (DeepfakeDetectionLog.DoesNotExist, FraudDetectionLog.DoesNotExist, DetectionLog.DoesNotExist, VoiceDetectionLog.DoesNotExist):
         return JsonResponse({'success': False, 'error': 'Analysis record not found'})
@@ -1642,124 +1691,152 @@ def download_analysis_report(request, log_id, report_type='deepfake'):
 @require_http_methods(["GET"])
 @login_required
 def generate_bulk_report(request, report_type='all'):
-    """Generate bulk report for multiple analyses"""
+    """Generate bulk report for multiple analyses, rendered by the report worker"""
     try:
-        # Get date range from query parameters
+        # Get date range from query parameters, from the start of that day
         days_back = int(request.GET.get('days', 30))
-        start_date = timezone.now() - timedelta(days=days_back)
+        start_date = day_window_start(days_back)
         
-        # Collect data from all sources
-        all_logs = []
+        subject = bulk_report_subject(request.user, report_type, start_date)
+        artifact = request_report('bulk', report_type, subject, {'start': start_date.isoformat()},
+                                  user=request.user)
+        return _report_response(request, artifact)
         
-        if report_type in ['all', 'deepfake']:
-            deepfake_logs = DeepfakeDetectionLog.objects.filter(
-                user=request.user,
-                created_at__gte=start_date
-            ).order_by('-created_at')
-            
-            for log in deepfake_logs:
-                all_logs.append({
-                    'type': 'deepfake',
-                    'id': log.id,
-                    'date': log.created_at,
-                    'result': 'DEEPFAKE' if log.is_fake else 'AUTHENTIC',
-                    'confidence': log.confidence_score * 100 if log.confidence_score else 0,
-                    'details': f"{log.file_type} via {log.source_type}" if log.file_type and log.source_type else 'Unknown'
-                })
-        
-        if report_type in ['all', 'fraud']:
-            fraud_logs = FraudDetectionLog.objects.filter(
-                user=request.user,
-                created_at__gte=start_date
-            ).order_by('-created_at')
-            
-            for log in fraud_logs:
-                all_logs.append({
-                    'type': 'fraud',
-                    'id': log.id,
-                    'date': log.created_at,
-                    'result': 'FRAUDULENT' if getattr(log, 'is_fraud', False) else 'LEGITIMATE',
-                    'confidence': getattr(log, 'confidence_score', 0) * 100,
-                    'details': f"Amount: ${getattr(log, 'amount', 0):.2f}"
-                })
-        
-        if report_type in ['all', 'voice']:
-            voice_logs = VoiceDetectionLog.objects.filter(
-                user=request.user,
-                created_at__gte=start_date
-            ).order_by('-created_at')
-            
-            for log in voice_logs:
-                all_logs.append({
-                    'type': 'voice',
-                    'id': log.id,
-                    'date': log.created_at,
-                    'result': log.result.upper(),
-                    'confidence': log.confidence_score,
-                    'details': f"{log.submission_type} | {log.audio_duration:.1f}s" if log.audio_duration else log.submission_type
-                })
-        
-        # Sort by date
-        all_logs.sort(key=lambda x: x['date'], reverse=True)
-        
-        # Generate Excel report
-        buffer = io.BytesIO()
-        workbook = xlsxwriter.Workbook(buffer)
-        worksheet = workbook.add_worksheet('Analysis Summary')
-        
-        # Define formats
-        header_format = workbook.add_format({
-            'bold': True,
-            'font_size': 12,
-            'bg_color': '#3b82f6',
-            'font_color': 'white',
-            'align': 'center'
-        })
-        
-        cell_format = workbook.add_format({
-            'align': 'center',
-            'border': 1
-        })
-        
-        # Write headers
-        headers = ['Analysis Type', 'ID', 'Date', 'Result', 'Confidence %', 'Details']
-        for col, header in enumerate(headers):
-            worksheet.write(0, col, header, header_format)
-        
-        # Write data
-        for row, log in enumerate(all_logs, 1):
-            worksheet.write(row, 0, log['type'].title(), cell_format)
-            worksheet.write(row, 1, log['id'], cell_format)
-            worksheet.write(row, 2, log['date'].strftime('%Y-%m-%d %H:%M'), cell_format)
-            worksheet.write(row, 3, log['result'], cell_format)
-            worksheet.write(row, 4, f"{log['confidence']:.1f}%", cell_format)
-            worksheet.write(row, 5, log['details'], cell_format)
-        
-        # Adjust column widths
-        worksheet.set_column('A:A', 15)
-        worksheet.set_column('B:B', 10)
-        worksheet.set_column('C:C', 18)
-        worksheet.set_column('D:D', 15)
-        worksheet.set_column('E:E', 12)
-        worksheet.set_column('F:F', 25)
-        
-        workbook.close()
-        
-        # Create response
-        excel_data = buffer.getvalue()
-        buffer.close()
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)})
+
+
+def collect_bulk_report_logs(user, report_type, start_date):
+    """Rows of a bulk report: the user's analyses since start_date, newest first"""
+    # Collect data from all sources
+    all_logs = []
+    
+    if report_type in ['all', 'deepfake']:
+        deepfake_logs = DeepfakeDetectionLog.objects.filter(
+            user=user,
+            created_at__gte=start_date
+        ).order_by('-created_at')
         
-        response = HttpResponse(
-            excel_data,
-            content_type='application/vnd.openxmlformats-officedocument.spreadshietml.sheet'
-        )
-        filename = f'ghost_ai_bulk_report_{report_type}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        for log in deepfake_logs:
+            all_logs.append({
+                'type': 'deepfake',
+                'id': log.id,
+                'date': log.created_at,
+                'result': 'DEEPFAKE' if log.is_fake else 'AUTHENTIC',
+                'confidence': log.confidence_score * 100 if log.confidence_score else 0,
+                'details': f"{log.file_type} via {log.source_type}" if log.file_type and log.source_type else 'Unknown'
+            })
+    
+    if report_type in ['all', 'fraud']:
+        fraud_logs = FraudDetectionLog.objects.filter(
+            user=user,
+            created_at__gte=start_date
+        ).order_by('-created_at')
         
-        return response
+        for log in fraud_logs:
+            all_logs.append({
+                'type': 'fraud',
+                'id': log.id,
+                'date': log.created_at,
+                'result': 'FRAUDULENT' if getattr(log, 'is_fraud', False) else 'LEGITIMATE',
+                'confidence': getattr(log, 'confidence_score', 0) * 100,
+                'details': f"Amount: ${getattr(log, 'amount', 0):.2f}"
+            })
+    
+    if report_type in ['all', 'voice']:
+        voice_logs = VoiceDetectionLog.objects.filter(
+            user=user,
+            created_at__gte=start_date
+        ).order_by('-created_at')
         
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
+        for log in voice_logs:
+            all_logs.append({
+                'type': 'voice',
+                'id': log.id,
+                'date': log.created_at,
+                'result': log.result.upper(),
+                'confidence': log.confidence_score,
+                'details': f"{log.submission_type} | {log.audio_duration:.1f}s" if log.audio_duration else log.submission_type
+            })
+    
+    # Sort by date
+    all_logs.sort(key=lambda x: x['date'], reverse=True)
+    return all_logs
+
+
+def generate_bulk_report_xlsx(all_logs):
+    """Generate the bulk report workbook"""
+    buffer = io.BytesIO()
+    workbook = xlsxwriter.Workbook(buffer)
+    worksheet = workbook.add_worksheet('Analysis Summary')
+    
+    # Define formats
+    header_format = workbook.add_format({
+        'bold': True,
+        'font_size': 12,
+        'bg_color': '#3b82f6',
+        'font_color': 'white',
+        'align': 'center'
+    })
+    
+    cell_format = workbook.add_format({
+        'align': 'center',
+        'border': 1
+    })
+    
+    # Write headers
+    headers = ['Analysis Type', 'ID', 'Date', 'Result', 'Confidence %', 'Details']
+    for col, header in enumerate(headers):
+        worksheet.write(0, col, header, header_format)
+    
+    # Write data
+    for row, log in enumerate(all_logs, 1):
+        worksheet.write(row, 0, log['type'].title(), cell_format)
+        worksheet.write(row, 1, log['id'], cell_format)
+        worksheet.write(row, 2, log['date'].strftime('%Y-%m-%d %H:%M'), cell_format)
+        worksheet.write(row, 3, log['result'], cell_format)
+        worksheet.write(row, 4, f"{log['confidence']:.1f}%", cell_format)
+        worksheet.write(row, 5, log['details'], cell_format)
+    
+    # Adjust column widths
+    worksheet.set_column('A:A', 15)
+    worksheet.set_column('B:B', 10)
+    worksheet.set_column('C:C', 18)
+    worksheet.set_column('D:D', 15)
+    worksheet.set_column('E:E', 12)
+    worksheet.set_column('F:F', 25)
+    
+    workbook.close()
+    
+    excel_data = buffer.getvalue()
+    buffer.close()
+    
+    return excel_data
+
+
+@require_http_methods(["GET"])
+@login_required
+def report_status(request, key):
+    """Status of a queued report; browsers are redirected to the file once it is ready"""
+    artifact = _get_report_artifact(request, key)
+    if artifact is None:
+        return JsonResponse({'success': False, 'error': 'Report not found'}, status=404)
+    return _report_response(request, artifact, redirect_when_ready=True)
+
+
+@require_http_methods(["GET"])
+@login_required
+def download_report_file(request, key):
+    """Download a rendered report from the artifact store"""
+    artifact = _get_report_artifact(request, key)
+    if artifact is None:
+        return JsonResponse({'success': False, 'error': 'Report not found'}, status=404)
+    if artifact.status == 'completed':
+        # Queued again if the file was removed from the store
+        artifact = requeue_if_unavailable(artifact)
+    if artifact.status == 'completed':
+        return _report_file_response(artifact)
+    return _report_response(request, artifact)
 
 
 # ============ FRAUD DETECTION ENDPOINTS ============
@@ -1937,6 +2014,66 @@ def upload_voice_data(request):
     
     return JsonResponse({'success': False, 'error': 'Invalid request method'}, status=405)
 
+def _voice_response_data(user, analysis_results):
+    """
+    Format voice clone detection results for the frontend
+    """
+    # Extract results
+    classification = analysis_results.get('classification', {})
+    ensemble_result = analysis_results.get('ensemble_result', {})
+    model_predictions = analysis_results.get('model_predictions', {})
+    audio_info = analysis_results.get('audio_info', {})
+    processing_info = analysis_results.get('processing_info', {})
+
+    return {
+        'voice_id': f"ghost-{user.id}-{int(timezone.now().timestamp())}",
+        'result': classification.get('result', 'unknown'),
+        'confidence': float(classification.get('confidence', 0.0)),
+        'confidence_score': float(classification.get('confidence', 0.0)),
+        'fake_probability': float(classification.get('fake_probability', 0.0)),
+        'authentic_probability': float(classification.get('real_probability', 0.0)),
+        'detected_language': 'Unknown',  # Our models don't detect language yet
+        'language_analysis': {
+            'detected_language': 'Unknown',
+            'language_code': 'unknown',
+            'confidence': 0,
+            'accent_analysis': {},
+            'linguistic_features': {}
+        },
+        'voice_characteristics': {
+            'frequency_consistency': 90.0,
+            'harmonic_patterns': 88.0,
+            'vocal_quality': 85.0,
+            'pitch_variation': 85.0,
+            'formant_stability': 87.0,
+            'speaker_consistency': 92.0
+        },
+        'technical_analysis': {
+            'audio_duration': float(audio_info.get('duration', 0.0)),
+            'processing_time': float(processing_info.get('processing_time', 0.0)),
+            'ai_model_version': '4.0',
+            'tech_stack': 'XGBoost + Random Forest + SVM + LibROSA Features',
+            'feature_count': processing_info.get('feature_count', 0),
+            'models_used': list(model_predictions.keys()) if model_predictions else []
+        },
+        'model_scores': {
+            'xgboost_score': float(model_predictions.get('xgboost', {}).get('confidence', 0.0)),
+            'random_forest_score': float(model_predictions.get('random_forest', {}).get('confidence', 0.0)),
+            'svm_score': float(model_predictions.get('svm', {}).get('confidence', 0.0)),
+            'ensemble_score': float(ensemble_result.get('confidence', 0.0)),
+            'authenticity_score': float(classification.get('confidence', 0.0))
+        },
+        'advanced_detection': {
+            'deepfake_score': float(classification.get('fake_probability', 0.0)),
+            'temporal_coherence': 90.0,
+            'spectral_artifacts': float(classification.get('fake_probability', 0.0))
+        },
+        'verdict': ensemble_result.get('verdict', 'UNKNOWN').upper(),
+        'risk_level': 'HIGH' if classification.get('result') == 'fake' else 'LOW',
+        # Per-window verdicts of recordings analyzed in streaming mode
+        'timeline': analysis_results.get('timeline', [])
+    }
+
 @csrf_exempt
 @login_required
 def analyze_voice_data(request):
@@ -1988,62 +2125,10 @@ def analyze_voice_data(request):
                     'message': analysis_results.get('error', 'Analysis failed')
                 }, status=400)
             
-            # Extract results
-            classification = analysis_results.get('classification', {})
-            ensemble_result = analysis_results.get('ensemble_result', {})
-            model_predictions = analysis_results.get('model_predictions', {})
-            audio_info = analysis_results.get('audio_info', {})
-            processing_info = analysis_results.get('processing_info', {})
-            
             # Format response for frontend
             response_data = {
                 'status': 'success',
-                'data': {
-                    'voice_id': f"ghost-{request.user.id}-{int(timezone.now().timestamp())}",
-                    'result': classification.get('result', 'unknown'),
-                    'confidence': float(classification.get('confidence', 0.0)),
-                    'confidence_score': float(classification.get('confidence', 0.0)),
-                    'fake_probability': float(classification.get('fake_probability', 0.0)),
-                    'authentic_probability': float(classification.get('real_probability', 0.0)),
-                    'detected_language': 'Unknown',  # Our models don't detect language yet
-                    'language_analysis': {
-                        'detected_language': 'Unknown',
-                        'language_code': 'unknown',
-                        'confidence': 0,
-                        'accent_analysis': {},
-                        'linguistic_features': {}
-                    },
-                    'voice_characteristics': {
-                        'frequency_consistency': 90.0,
-                        'harmonic_patterns': 88.0,
-                        'vocal_quality': 85.0,
-                        'pitch_variation': 85.0,
-                        'formant_stability': 87.0,
-                        'speaker_consistency': 92.0
-                    },
-                    'technical_analysis': {
-                        'audio_duration': float(audio_info.get('duration', 0.0)),
-                        'processing_time': float(processing_info.get('processing_time', 0.0)),
-                        'ai_model_version': '4.0',
-                        'tech_stack': 'XGBoost + Random Forest + SVM + LibROSA Features',
-                        'feature_count': processing_info.get('feature_count', 0),
-                        'models_used': list(model_predictions.keys()) if model_predictions else []
-                    },
-                    'model_scores': {
-                        'xgboost_score': float(model_predictions.get('xgboost', {}).get('confidence', 0.0)),
-                        'random_forest_score': float(model_predictions.get('random_forest', {}).get('confidence', 0.0)),
-                        'svm_score': float(model_predictions.get('svm', {}).get('confidence', 0.0)),
-                        'ensemble_score': float(ensemble_result.get('confidence', 0.0)),
-                        'authenticity_score': float(classification.get('confidence', 0.0))
-                    },
-                    'advanced_detection': {
-                        'deepfake_score': float(classification.get('fake_probability', 0.0)),
-                        'temporal_coherence': 90.0,
-                        'spectral_artifacts': float(classification.get('fake_probability', 0.0))
-                    },
-                    'verdict': ensemble_result.get('verdict', 'UNKNOWN').upper(),
-                    'risk_level': 'HIGH' if classification.get('result') == 'fake' else 'LOW'
-                }
+                'data': _voice_response_data(request.user, analysis_results)
             }
             
             print(f"🔍 DEBUG: Analysis completed successfully")
@@ -2064,6 +2149,90 @@ def analyze_voice_data(request):
     return JsonResponse({'status': 'error', 'message': 'Invalid request method'}, status=405)
 
 
+@csrf_exempt
+@login_required
+def submit_voice_analysis(request):
+    """
+    Queue a voice file for background clone detection and return its job id
+    """
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'message': 'Invalid request method'}, status=405)
+
+    voice_file = (request.FILES.get('voice_file') or request.FILES.get('audio_file')
+                  or request.FILES.get('file'))
+    if voice_file is None:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'No voice file provided'
+        }, status=400)
+
+    try:
+        from .voice_integration import voice_detection_service
+        from .voice_jobs import enqueue_voice_analysis
+
+        if not voice_detection_service._validate_audio_file(voice_file):
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Invalid audio file format. Supported: WAV, MP3, M4A, OGG'
+            }, status=400)
+
+        job = enqueue_voice_analysis(voice_file, request.user)
+
+        return JsonResponse({
+            'status': 'success',
+            'data': {
+                'job_id': job.id,
+                'job_status': job.status,
+                'status_url': f'/api/voice-jobs/{job.id}/'
+            }
+        }, status=202)
+
+    except Exception as e:
+        logger.error(f"Error queueing voice analysis: {str(e)}")
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Could not queue analysis: {str(e)}'
+        }, status=500)
+
+
+@login_required
+def voice_analysis_status(request, job_id):
+    """
+    Report the status of a queued voice analysis; ?wait=<seconds> long-polls
+    until the job finishes
+    """
+    from .voice_jobs import FINISHED_STATUSES, wait_for_job
+
+    try:
+        job = VoiceDetectionLog.objects.get(id=job_id, user=request.user)
+    except VoiceDetectionLog.DoesNotExist:
+        return JsonResponse({'status': 'error', 'message': 'Job not found'}, status=404)
+
+    try:
+        wait = min(max(float(request.GET.get('wait', 0)), 0.0), 25.0)
+    except ValueError:
+        wait = 0.0
+    if wait and job.status not in FINISHED_STATUSES:
+        job = wait_for_job(job, timeout=wait)
+
+    data = {
+        'job_id': job.id,
+        'job_status': job.status,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'completed_at': job.completed_at.isoformat() if job.completed_at else None
+    }
+
+    if job.status == 'completed':
+        # analysis_details keeps the detector's result sections, so the
+        # response matches the synchronous analyze endpoint
+        data['result'] = _voice_response_data(request.user, job.analysis_details)
+    elif job.status == 'failed':
+        data['error'] = job.error_message
+
+    return JsonResponse({'status': 'success', 'data': data})
+
+
 # ============ VOICE AUTHENTICATION API ENDPOINTS ============
 
 @csrf_exempt
@@ -2136,15 +2305,8 @@ def download_latest_voice_report(request):
                 'message': 'No voice analysis found'
             }, status=404)
         
-        # Generate PDF report
-        pdf_data = generate_analysis_report_pdf(voice_log, 'voice')
-        
-        # Create response
-        response = HttpResponse(pdf_data, content_type='application/pdf')
-        filename = f'ghost_ai_voice_report_{voice_log.id}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        return response
+        # Serve the stored PDF report, or queue it for the report worker
+        return _report_response(request, _request_analysis_report(voice_log, 'voice'))
         
     except Exception as e:
         return JsonResponse({
@@ -2162,11 +2324,12 @@ def get_voice_history(request):
         # Get user
         user = request.user
         
-        # Get voice detection logs
-        voice_logs = VoiceDetectionLog.objects.filter(user=user).order_by('-created_at')[:50]
+        # Get one page of voice detection logs
+        cursor, limit, with_total = page_params(request)
+        page = paginate_keyset(VoiceDetectionLog.objects.filter(user=user), 'created_at', cursor, limit, with_total)
         
         history_data = []
-        for log in voice_logs:
+        for log in page:
             history_data.append({
                 'id': log.id,
                 'created_at': log.created_at.isoformat(),
@@ -2181,9 +2344,11 @@ def get_voice_history(request):
         return JsonResponse({
             'success': True,
             'history': history_data,
-            'total_count': len(history_data)
+            **page.as_json()
         })
         
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
     except Exception as e:
         return JsonResponse({
             'success': False,
@@ -2290,35 +2455,20 @@ def analyze_otp_data(request):
 def get_dashboard_stats(request):
     """Get real-time dashboard statistics"""
     try:
-        # Get counts for different types of detections
-        deepfake_count = DeepfakeDetectionLog.objects.filter(user=request.user).count()
-        fraud_count = FraudDetectionLog.objects.filter(user=request.user).count()
-        voice_count = VoiceDetectionLog.objects.filter(user=request.user).count()
-        otp_count = DetectionLog.objects.filter(user=request.user, analysis_type='otp').count()
+        # Get counts for different types of detections (materialized counters, one query)
+        stats = get_detection_stats(request.user)
+        deepfake_count = stats.total('deepfake')
+        fraud_count = stats.total('fraud')
+        voice_count = stats.total('voice')
+        otp_count = stats.total('detection', 'otp')
         
         total_count = deepfake_count + fraud_count + voice_count + otp_count
         
-        # Calculate some additional metrics
-        recent_deepfake = DeepfakeDetectionLog.objects.filter(
-            user=request.user,
-            created_at__gte=timezone.now() - timedelta(days=7)
-        ).count()
-        
-        recent_voice = VoiceDetectionLog.objects.filter(
-            user=request.user,
-            created_at__gte=timezone.now() - timedelta(days=7)
-        ).count()
-        
-        recent_fraud = FraudDetectionLog.objects.filter(
-            user=request.user,
-            created_at__gte=timezone.now() - timedelta(days=7)
-        ).count()
-        
-        recent_otp = DetectionLog.objects.filter(
-            user=request.user,
-            analysis_type='otp',
-            timestamp__gte=timezone.now() - timedelta(days=7)
-        ).count()
+        # Calculate some additional metrics (last 7 days)
+        recent_deepfake = stats.recent('deepfake')
+        recent_voice = stats.recent('voice')
+        recent_fraud = stats.recent('fraud')
+        recent_otp = stats.recent('detection', 'otp')
         
         recent_activity = recent_deepfake + recent_voice + recent_fraud + recent_otp
         
@@ -2610,10 +2760,12 @@ def get_voice_otp_history(request):
         logs = DetectionLog.objects.filter(
             user=request.user, 
             analysis_type='voice_otp'
-        ).order_by('-timestamp')[:50]
+        )
+        cursor, limit, with_total = page_params(request)
+        page = paginate_keyset(logs, 'timestamp', cursor, limit, with_total)
         
         history_data = []
-        for log in logs:
+        for log in page:
             metadata = log.metadata or {}
             
             history_data.append({
@@ -2633,9 +2785,11 @@ def get_voice_otp_history(request):
         return JsonResponse({
             'success': True,
             'history': history_data,
-            'total_count': len(history_data)
+            **page.as_json()
         })
         
+    except InvalidCursor as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
     except Exception as e:
         logger.error(f"Error getting Voice OTP history: {str(e)}")
         return JsonResponse({
@@ -2734,11 +2888,12 @@ def get_dashboard_stats_api(request):
         if request.user.is_authenticated:
             user = request.user
             
-            # Get user statistics
-            total_detections = DetectionLog.objects.filter(user=user).count()
-            voice_otp_detections = DetectionLog.objects.filter(user=user, analysis_type='voice_otp').count()
-            deepfake_detections = DetectionLog.objects.filter(user=user, analysis_type='deepfake').count()
-            fraud_detections = DetectionLog.objects.filter(user=user, analysis_type='fraud').count()
+            # Get user statistics (materialized counters, one query)
+            stats = get_detection_stats(user)
+            total_detections = stats.total('detection')
+            voice_otp_detections = stats.total('detection', 'voice_otp')
+            deepfake_detections = stats.total('detection', 'deepfake')
+            fraud_detections = stats.total('detection', 'fraud')
             
             # Get recent activity
             recent_detections = DetectionLog.objects.filter(user=user).order_by('-timestamp')[:5]
@@ -9,242 +9,287 @@ Author: SAP GHOST AI Team
 Version: 4.0 - Production Ready
 """
 
+import io
 import os
 import json
 import time
+import shutil
 import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import numpy as np
 import librosa
 import soundfile as sf
-import joblib
 from pathlib import Path
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional, Tuple, List, Sequence, Union, BinaryIO, Iterator
 import warnings
 warnings.filterwarnings('ignore')
 
-class VoiceFeatureExtractor:
-    """Extract comprehensive acoustic features from audio"""
+from .voice_features import FeatureExtractor, feature_schema_id, FEATURE_PROFILES, DEFAULT_PROFILE, NUM_FEATURES
+from .voice_utils import ModelCache
+from .model_bundle import (
+    ModelBundle, bundle_exists, load_bundle, load_legacy_models, read_bundle_hash,
+    load_canary_set, disk_signature, reload_requested_at, LEGACY_MODEL_FILES, LEGACY_SCALER_FILE
+)
+
+# Audio input: a file path, raw encoded bytes or a binary file-like object
+AudioSource = Union[str, os.PathLike, bytes, BinaryIO]
+
+
+class VoiceFeatureExtractor(FeatureExtractor):
+    """Load audio from files, bytes and streams for the shared feature extractor"""
+    
+    # Seconds of audio analysed per clip
+    MAX_DURATION = 30
+    
+    # Containers libsndfile cannot decode; these go through librosa/ffmpeg on disk
+    FFMPEG_FORMATS = {'.m4a', '.aac', '.mp4', '.wma', '.webm'}
+    
+    # Streamed windows shorter than this after silence trimming are not scored
+    MIN_SEGMENT_DURATION = 0.5
     
-    def __init__(self, target_sr=22050):
-        self.target_sr = target_sr
-        
     def load_audio_file(self, file_path: str) -> Optional[np.ndarray]:
-        """Load and preprocess audio file"""
+        """Load and preprocess the first MAX_DURATION seconds of an audio file (see iter_segments for whole recordings)"""
         try:
-            audio, sr = librosa.load(file_path, sr=self.target_sr, duration=30)
+            audio, sr = librosa.load(file_path, sr=self.target_sr, duration=self.MAX_DURATION)
             return self.preprocess_audio(audio, sr)
         except Exception as e:
             print(f"Error loading audio file {file_path}: {e}")
             return None
     
-    def preprocess_audio(self, audio: np.ndarray, sr: int) -> Optional[np.ndarray]:
-        """Preprocess raw audio data"""
+    def load_audio(self, source: AudioSource, format_hint: Optional[str] = None) -> Optional[np.ndarray]:
+        """Load and preprocess audio from a path, raw bytes or a file-like object"""
+        if isinstance(source, (str, os.PathLike)):
+            return self.load_audio_file(str(source))
+        
+        stream = io.BytesIO(source) if isinstance(source, (bytes, bytearray, memoryview)) else source
+        format_hint = (format_hint or '').lower()
         try:
-            # Resample if needed
-            if sr != self.target_sr:
-                audio = librosa.resample(audio, orig_sr=sr, target_sr=self.target_sr)
-            
-            # Normalize audio
-            audio = librosa.util.normalize(audio)
-            
-            # Trim silence
-            audio, _ = librosa.effects.trim(audio, top_db=20)
-            
-            return audio
+            if format_hint not in self.FFMPEG_FORMATS:
+                try:
+                    audio, sr = self._decode_in_memory(stream)
+                    return self.preprocess_audio(audio, sr)
+                except RuntimeError:
+                    pass  # Not a libsndfile format; fall back to disk
+            return self._decode_via_disk(stream, format_hint)
         except Exception as e:
-            print(f"Error preprocessing audio: {e}")
+            print(f"Error loading in-memory audio: {e}")
             return None
+        finally:
+            if hasattr(stream, 'seek'):
+                stream.seek(0)
     
-    def extract_features(self, audio: np.ndarray) -> Optional[np.ndarray]:
-        """Extract comprehensive acoustic features"""
+    def get_duration(self, file_path: str) -> float:
+        """Length of a recording in seconds, read from its header where possible"""
         try:
-            features = []
-            
-            # 1. MFCC features (mel-frequency cepstral coefficients)
-            mfcc = librosa.feature.mfcc(y=audio, sr=self.target_sr, n_mfcc=13)
-            features.extend([
-                np.mean(mfcc, axis=1),  # Mean
-                np.std(mfcc, axis=1),   # Standard deviation
-                np.min(mfcc, axis=1),   # Minimum
-                np.max(mfcc, axis=1),   # Maximum
-            ])
-            
-            # 2. Spectral features
-            spectral_centroids = librosa.feature.spectral_centroid(y=audio, sr=self.target_sr)
-            spectral_rolloff = librosa.feature.spectral_rolloff(y=audio, sr=self.target_sr)
-            spectral_bandwidth = librosa.feature.spectral_bandwidth(y=audio, sr=self.target_sr)
-            spectral_contrast = librosa.feature.spectral_contrast(y=audio, sr=self.target_sr)
-            
-            features.extend([
-                [np.mean(spectral_centroids), np.std(spectral_centroids), np.min(spectral_centroids), np.max(spectral_centroids)],
-                [np.mean(spectral_rolloff), np.std(spectral_rolloff), np.min(spectral_rolloff), np.max(spectral_rolloff)],
-                [np.mean(spectral_bandwidth), np.std(spectral_bandwidth), np.min(spectral_bandwidth), np.max(spectral_bandwidth)],
-                np.mean(spectral_contrast, axis=1),
-                np.std(spectral_contrast, axis=1)
-            ])
-            
-            # 3. Zero crossing rate
-            zcr = librosa.feature.zero_crossing_rate(audio)
-            features.append([np.mean(zcr), np.std(zcr), np.min(zcr), np.max(zcr)])
-            
-            # 4. Chroma features
-            chroma = librosa.feature.chroma_stft(y=audio, sr=self.target_sr)
-            features.extend([
-                np.mean(chroma, axis=1),
-                np.std(chroma, axis=1)
-            ])
-            
-            # 5. Mel-scale spectrogram
-            mel_spectrogram = librosa.feature.melspectrogram(y=audio, sr=self.target_sr, n_mels=13)
-            mel_db = librosa.power_to_db(mel_spectrogram, ref=np.max)
-            features.extend([
-                np.mean(mel_db, axis=1),
-                np.std(mel_db, axis=1)
-            ])
-            
-            # 6. Harmonic and percussive components
-            harmonic, percussive = librosa.effects.hpss(audio)
-            harmonic_energy = np.sum(harmonic**2)
-            percussive_energy = np.sum(percussive**2)
-            total_energy = np.sum(audio**2)
-            
-            features.append([
-                harmonic_energy / (total_energy + 1e-10),
-                percussive_energy / (total_energy + 1e-10),
-                harmonic_energy / (percussive_energy + 1e-10)
-            ])
-            
-            # 7. Tempo and rhythm
+            return float(sf.info(file_path).duration)
+        except RuntimeError:
+            return float(librosa.get_duration(path=file_path))
+    
+    def iter_segments(self, source: AudioSource, segment_seconds: float,
+                      format_hint: Optional[str] = None) -> Iterator[Tuple[float, float, np.ndarray, int]]:
+        """
+        Yield (start, end, mono_audio, sample_rate) windows covering a whole recording
+        
+        Only one window is decoded at a time, so memory does not grow with
+        the length of the recording. libsndfile formats are read block by
+        block; other containers are decoded window by window through librosa.
+        """
+        is_path = isinstance(source, (str, os.PathLike))
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        suffix = Path(source).suffix.lower() if is_path else (format_hint or '').lower()
+        
+        if suffix not in self.FFMPEG_FORMATS:
             try:
-                tempo, _ = librosa.beat.beat_track(y=audio, sr=self.target_sr)
-                features.append([tempo])
-            except:
-                features.append([120.0])  # Default tempo
-            
-            # 8. RMS energy
-            rms = librosa.feature.rms(y=audio)
-            features.append([np.mean(rms), np.std(rms), np.min(rms), np.max(rms)])
-            
-            # 9. Spectral flatness
-            spectral_flatness = librosa.feature.spectral_flatness(y=audio)
-            features.append([np.mean(spectral_flatness), np.std(spectral_flatness)])
-            
-            # 10. Tonnetz (tonal centroid features)
-            tonnetz = librosa.feature.tonnetz(y=librosa.effects.harmonic(audio), sr=self.target_sr)
-            features.extend([
-                np.mean(tonnetz, axis=1),
-                np.std(tonnetz, axis=1)
-            ])
-            
-            # Flatten all features
-            flat_features = []
-            for feature_group in features:
-                if np.isscalar(feature_group):
-                    flat_features.append(feature_group)
-                elif hasattr(feature_group, 'flatten'):
-                    flat_features.extend(feature_group.flatten())
-                else:
-                    flat_features.extend(np.array(feature_group).flatten())
-            
-            return np.array(flat_features, dtype=np.float32)
+                if not is_path:
+                    source.seek(0)
+                sound_file = sf.SoundFile(str(source) if is_path else source)
+            except RuntimeError:
+                sound_file = None  # Not a libsndfile format
             
-        except Exception as e:
-            print(f"Error extracting features: {e}")
-            return None
+            if sound_file is not None:
+                with sound_file as f:
+                    sr = f.samplerate
+                    position = 0
+                    for block in f.blocks(blocksize=int(segment_seconds * sr), dtype='float32', always_2d=True):
+                        yield position / sr, (position + len(block)) / sr, block.mean(axis=1), sr
+                        position += len(block)
+                return
+        
+        if is_path:
+            yield from self._iter_segments_librosa(str(source), segment_seconds)
+            return
+        
+        # Decoders that need a path get the stream spilled to a temporary file
+        source.seek(0)
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_file:
+            shutil.copyfileobj(source, temp_file)
+            temp_path = temp_file.name
+        try:
+            yield from self._iter_segments_librosa(temp_path, segment_seconds)
+        finally:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+    
+    def _iter_segments_librosa(self, file_path: str, segment_seconds: float) -> Iterator[Tuple[float, float, np.ndarray, int]]:
+        offset = 0.0
+        while True:
+            audio, sr = librosa.load(file_path, sr=None, mono=True, offset=offset, duration=segment_seconds)
+            if len(audio) == 0:
+                return
+            yield offset, offset + len(audio) / sr, audio, sr
+            if len(audio) < int(segment_seconds * sr):
+                return
+            offset += segment_seconds
+    
+    def _decode_in_memory(self, stream: BinaryIO) -> Tuple[np.ndarray, int]:
+        """Decode up to MAX_DURATION seconds with soundfile, downmixed to mono"""
+        stream.seek(0)
+        with sf.SoundFile(stream) as f:
+            frames = int(self.MAX_DURATION * f.samplerate)
+            if 0 < f.frames < frames:
+                frames = f.frames
+            audio = f.read(frames=frames, dtype='float32', always_2d=True)
+            return audio.mean(axis=1), f.samplerate
+    
+    def _decode_via_disk(self, stream: BinaryIO, format_hint: str) -> Optional[np.ndarray]:
+        """Spill the stream to a temporary file for decoders that need a path (ffmpeg)"""
+        stream.seek(0)
+        with tempfile.NamedTemporaryFile(suffix=format_hint, delete=False) as temp_file:
+            shutil.copyfileobj(stream, temp_file)
+            temp_path = temp_file.name
+        try:
+            return self.load_audio_file(temp_path)
+        finally:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
+
+# Batch input: a file path, encoded bytes, a mono array at the detector's
+# sample rate, or an (array, sample_rate) tuple
+BatchItem = Union[str, os.PathLike, bytes, np.ndarray, Tuple[np.ndarray, int]]
+
+
+def _extract_batch_item(item: BatchItem, target_sr: int,
+                        profile: str) -> Tuple[Optional[np.ndarray], float, Optional[str], Optional[str]]:
+    """
+    Load, preprocess and featurize one batch item (runs in a worker process)
+    
+    Returns:
+        (features, duration, error, audio hash for the result cache)
+    """
+    extractor = VoiceFeatureExtractor(target_sr=target_sr, profile=profile)
+    
+    if isinstance(item, (np.ndarray, tuple)):
+        data, sr = item if isinstance(item, tuple) else (item, target_sr)
+        audio = extractor.preprocess_audio(np.asarray(data, dtype=np.float32), int(sr))
+    else:
+        audio = extractor.load_audio(item)
+    
+    if audio is None:
+        return None, 0.0, 'Failed to load audio', None
+    
+    audio_hash = ModelCache.get_audio_hash(audio)
+    features = extractor.extract_features(audio)
+    if features is None:
+        return None, 0.0, 'Failed to extract features', audio_hash
+    
+    return features, len(audio) / target_sr, None, audio_hash
 
 
 class VoiceCloneDetectionProduction:
     """Production-ready voice clone detection system"""
     
-    def __init__(self, models_dir=None):
+    def __init__(self, models_dir=None, feature_profile=None, cache_size=256, mmap_mode='c',
+                 canary_min_accuracy=0.8, cascade_threshold=None, cascade_order=None):
+        if feature_profile is not None and feature_profile not in FEATURE_PROFILES:
+            raise ValueError(f"Unknown feature profile '{feature_profile}'. Available: {', '.join(FEATURE_PROFILES)}")
+        
         if models_dir is None:
-            # Default to trained_models directory in project root
+            # Default to trained_models directory in project root;
+            # non-default profiles live in a subdirectory named after the profile
             current_dir = Path(__file__).parent.parent
             self.models_dir = current_dir / "trained_models"
+            if feature_profile not in (None, DEFAULT_PROFILE):
+                self.models_dir = self.models_dir / feature_profile
         else:
             self.models_dir = Path(models_dir)
         
-        self.models = {}
-        self.scaler = None
-        self.metadata = {}
-        self.feature_extractor = VoiceFeatureExtractor()
+        self.requested_profile = feature_profile
+        self.mmap_mode = mmap_mode
+        self.canary_min_accuracy = canary_min_accuracy
+        
+        # Early-exit cascade: consult models one at a time (cascade_order, default
+        # best model first) and stop at the first whose top class probability
+        # reaches cascade_threshold. None runs every model.
+        self.cascade_threshold = cascade_threshold
+        self.cascade_order = list(cascade_order) if cascade_order else None
+        
+        # The active model set; replaced as a whole on reload, so an analysis
+        # that took a reference to it keeps using consistent models
+        self._bundle = None
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._watcher_stop = threading.Event()
+        
+        self.feature_extractor = VoiceFeatureExtractor(profile=feature_profile or DEFAULT_PROFILE)
         self.is_initialized = False
         
+        # Re-submitted recordings are answered from here (cache_size=0 disables)
+        self.result_cache = ModelCache(max_entries=cache_size)
+        
         print(f"🚀 Initializing Production Voice Clone Detection System")
         print(f"📁 Models directory: {self.models_dir}")
     
+    REQUIRED_FILES = list(LEGACY_MODEL_FILES.values()) + [LEGACY_SCALER_FILE]
+    
+    @property
+    def models(self) -> Dict[str, Any]:
+        return self._bundle.models if self._bundle is not None else {}
+    
+    @property
+    def scaler(self):
+        return self._bundle.scaler if self._bundle is not None else None
+    
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self._bundle.metadata if self._bundle is not None else {}
+    
+    @property
+    def model_version(self) -> Optional[str]:
+        return self._bundle.version if self._bundle is not None else None
+    
     def models_available(self) -> bool:
-        """Check if required model files are available"""
-        required_files = [
-            "xgboost_model.pkl",
-            "random_forest_model.pkl", 
-            "svm_model.pkl",
-            "scaler.pkl"
-        ]
-        
-        return all((self.models_dir / f).exists() for f in required_files)
+        """Check if a model bundle or the required per-model files are available"""
+        if bundle_exists(self.models_dir):
+            return True
+        return all((self.models_dir / f).exists() for f in self.REQUIRED_FILES)
     
     def initialize(self) -> bool:
         """Initialize the detection system by loading models"""
         try:
-            if not self.models_dir.exists():
-                print(f"❌ Models directory not found: {self.models_dir}")
+            bundle = self._load_from_disk()
+            if bundle is None:
                 return False
             
-            if not self.models_available():
-                print("❌ Required model files not found!")
-                print("Please run the training script first: python train_simple_voice_detector.py")
-                return False
-            
-            # Load metadata
-            metadata_path = self.models_dir / "model_metadata.json"
-            if metadata_path.exists():
-                with open(metadata_path, 'r') as f:
-                    self.metadata = json.load(f)
-                print(f"✅ Loaded model metadata")
-                print(f"   Best model: {self.metadata.get('best_model', 'Unknown')}")
-                print(f"   Training date: {self.metadata.get('training_date', 'Unknown')}")
-            else:
-                print("⚠️  No metadata found, using default settings")
-                self.metadata = {'best_model': 'xgboost'}
-            
-            # Load scaler
-            scaler_path = self.models_dir / "scaler.pkl"
-            if scaler_path.exists():
-                self.scaler = joblib.load(scaler_path)
-                print("✅ Loaded feature scaler")
-            else:
-                print("❌ Scaler not found!")
-                return False
-            
-            # Load models
-            model_files = {
-                'xgboost': 'xgboost_model.pkl',
-                'random_forest': 'random_forest_model.pkl',
-                'svm': 'svm_model.pkl'
-            }
-            
-            loaded_models = 0
-            for name, filename in model_files.items():
-                model_path = self.models_dir / filename
-                if model_path.exists():
-                    try:
-                        self.models[name] = joblib.load(model_path)
-                        print(f"✅ Loaded {name} model")
-                        loaded_models += 1
-                    except Exception as e:
-                        print(f"❌ Error loading {name} model: {e}")
-                else:
-                    print(f"⚠️  {name} model not found")
+            # Serve features from the profile the models were trained on
+            profile = bundle.metadata.get('feature_profile', DEFAULT_PROFILE)
+            if profile != self.feature_extractor.profile:
+                self.feature_extractor = VoiceFeatureExtractor(profile=profile)
             
-            if loaded_models == 0:
-                print("❌ No models loaded successfully!")
-                return False
+            self._activate(bundle)
             
             self.is_initialized = True
             print(f"✅ Production Voice Clone Detection System initialized!")
-            print(f"   Models loaded: {loaded_models}")
-            print(f"   Feature dimensions: {getattr(self.scaler, 'n_features_in_', 'Unknown')}")
+            print(f"   Models loaded: {len(bundle.models)}")
+            print(f"   Model version: {bundle.version}")
+            print(f"   Feature dimensions: {getattr(bundle.scaler, 'n_features_in_', 'Unknown')}")
             
             return True
             
@@ -252,26 +297,453 @@ class VoiceCloneDetectionProduction:
             print(f"❌ Error initializing detection system: {e}")
             return False
     
-    def _predict_with_model(self, features: np.ndarray, model_name: str) -> Tuple[Optional[int], Optional[np.ndarray]]:
-        """Make prediction with a specific model"""
+    def _activate(self, bundle: ModelBundle):
+        """Make a loaded model set the one new analyses use"""
+        self._bundle = bundle
+        # Cached verdicts from a previous model set are no longer valid
+        self.result_cache.set_model_version(bundle.version)
+    
+    def _load_from_disk(self) -> Optional[ModelBundle]:
+        """Load and check the model set in models_dir without activating it"""
+        if not self.models_dir.exists():
+            print(f"❌ Models directory not found: {self.models_dir}")
+            return None
+        
+        if not self.models_available():
+            print("❌ Required model files not found!")
+            print("Please run the training script first: python train_simple_voice_detector.py")
+            return None
+        
+        # One bundle when available, per-model pickles otherwise
+        if bundle_exists(self.models_dir):
+            bundle = load_bundle(self.models_dir, mmap_mode=self.mmap_mode)
+            print(f"✅ Loaded model bundle {bundle.version}")
+        else:
+            try:
+                bundle = load_legacy_models(self.models_dir)
+            except Exception as e:
+                print(f"❌ Error loading model pickles: {e}")
+                return None
+            print(f"✅ Loaded models from pickles: {', '.join(bundle.models) or 'none'}")
+        
+        if bundle.metadata:
+            print(f"✅ Loaded model metadata")
+            print(f"   Best model: {bundle.metadata.get('best_model', 'Unknown')}")
+            print(f"   Training date: {bundle.metadata.get('training_date', 'Unknown')}")
+        else:
+            print("⚠️  No metadata found, using default settings")
+            bundle.metadata = {'best_model': 'xgboost'}
+        
+        profile = bundle.metadata.get('feature_profile', DEFAULT_PROFILE)
+        if profile not in FEATURE_PROFILES:
+            print(f"❌ Models were trained on unknown feature profile '{profile}'")
+            return None
+        if self.requested_profile is not None and profile != self.requested_profile:
+            print(f"❌ Models in {self.models_dir} use the '{profile}' feature profile, "
+                  f"not the requested '{self.requested_profile}'")
+            return None
+        print(f"   Feature profile: {profile}")
+        
+        # Models only make sense on the exact features they were trained on
+        expected_schema = feature_schema_id(profile, self.feature_extractor.target_sr)
+        schema = bundle.metadata.get('feature_schema')
+        if schema is None:
+            n_features = getattr(bundle.scaler, 'n_features_in_', NUM_FEATURES)
+            if n_features != NUM_FEATURES:
+                print(f"❌ Models expect {n_features} features, the feature library produces {NUM_FEATURES}")
+                return None
+            print(f"⚠️  Models carry no feature schema; assuming {expected_schema}")
+        elif schema != expected_schema:
+            print(f"❌ Models were trained on feature schema {schema}, "
+                  f"this build produces {expected_schema}. Retrain the models.")
+            return None
+        else:
+            print(f"   Feature schema: {schema}")
+        
+        if not bundle.models:
+            print("❌ No models loaded successfully!")
+            return None
+        
+        return bundle
+    
+    def verify_models(self, bundle: Optional[ModelBundle] = None) -> Dict[str, Any]:
+        """
+        Check a model set (default: the active one) on the canary set of
+        models_dir before it serves traffic
+        
+        Every model must return finite probabilities for the canary feature
+        vectors, and the best model must reach canary_min_accuracy. Without a
+        canary set only the feature dimensions and outputs are checked.
+        """
+        bundle = bundle or self._bundle
+        report = {'passed': False, 'samples': 0, 'accuracy': {}}
         try:
-            if model_name not in self.models:
-                return None, None
-                
-            model = self.models[model_name]
-            features_scaled = self.scaler.transform(features.reshape(1, -1))
+            canary = load_canary_set(self.models_dir)
+            if canary is not None:
+                features, labels = canary
+            else:
+                n_features = getattr(bundle.scaler, 'n_features_in_', NUM_FEATURES)
+                features, labels = np.zeros((1, n_features), dtype=np.float32), None
+            report['samples'] = len(features)
+            
+            features_scaled = bundle.scaler.transform(features)
+            for model_name, model in bundle.models.items():
+                proba = model.predict_proba(features_scaled)
+                if proba.shape != (len(features), 2) or not np.all(np.isfinite(proba)):
+                    report['error'] = f"{model_name} returned invalid probabilities"
+                    return report
+                if labels is not None:
+                    report['accuracy'][model_name] = float(np.mean(np.argmax(proba, axis=1) == labels))
             
-            prediction = model.predict(features_scaled)[0]
-            probability = model.predict_proba(features_scaled)[0]
+            if labels is not None:
+                best_model = bundle.metadata.get('best_model')
+                if best_model not in report['accuracy']:
+                    best_model = max(report['accuracy'], key=report['accuracy'].get)
+                if report['accuracy'][best_model] < self.canary_min_accuracy:
+                    report['error'] = (f"{best_model} canary accuracy {report['accuracy'][best_model]:.3f} "
+                                       f"is below {self.canary_min_accuracy:.3f}")
+                    return report
             
-            return int(prediction), probability
+            report['passed'] = True
+            
+        except Exception as e:
+            report['error'] = f"Canary check failed: {str(e)}"
+        
+        return report
+    
+    def reload_models(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Load the model set currently in models_dir and swap it in if it passes the canary check
+        
+        Analyses already running finish on the models they started with.
+        The swap is skipped when the models on disk are the ones already
+        loaded, unless force=True.
+        """
+        with self._reload_lock:
+            if not self.is_initialized:
+                # Nothing to swap yet; the first analysis loads whatever is on disk
+                return {'success': True, 'reloaded': False, 'model_version': None}
+            
+            previous_version = self.model_version
+            try:
+                if not force and bundle_exists(self.models_dir):
+                    if (read_bundle_hash(self.models_dir) or '')[:16] == previous_version:
+                        return {'success': True, 'reloaded': False, 'model_version': previous_version}
+                
+                print(f"🔄 Loading new models from {self.models_dir}")
+                candidate = self._load_from_disk()
+                if candidate is None:
+                    return {'success': False, 'error': 'Failed to load models', 'model_version': previous_version}
+                
+                if not force and candidate.version == previous_version:
+                    return {'success': True, 'reloaded': False, 'model_version': previous_version}
+                
+                profile = candidate.metadata.get('feature_profile', DEFAULT_PROFILE)
+                if profile != self.feature_extractor.profile:
+                    return {
+                        'success': False,
+                        'error': f"New models use the '{profile}' feature profile, "
+                                 f"not the active '{self.feature_extractor.profile}'",
+                        'model_version': previous_version
+                    }
+                
+                canary = self.verify_models(candidate)
+                if not canary['passed']:
+                    print(f"❌ New models rejected: {canary.get('error')}")
+                    return {'success': False, 'error': canary.get('error'), 'canary': canary,
+                            'model_version': previous_version}
+                
+                self._activate(candidate)
+                print(f"✅ Models reloaded: {previous_version} -> {candidate.version}")
+                return {
+                    'success': True,
+                    'reloaded': True,
+                    'model_version': candidate.version,
+                    'previous_version': previous_version,
+                    'canary': canary
+                }
+                
+            except Exception as e:
+                print(f"❌ Error reloading models: {e}")
+                return {'success': False, 'error': str(e), 'model_version': previous_version}
+    
+    def start_model_watcher(self, interval: float = 30.0):
+        """
+        Reload in a background thread whenever new model files appear in
+        models_dir or its reload.request file is touched
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._watcher_stop.clear()
+        self._watcher = threading.Thread(target=self._watch_models, args=(interval,),
+                                         name='voice-model-watcher', daemon=True)
+        self._watcher.start()
+    
+    def stop_model_watcher(self):
+        self._watcher_stop.set()
+        self._watcher = None
+    
+    def _watch_models(self, interval: float):
+        loaded_signature = disk_signature(self.models_dir)
+        last_signature = loaded_signature
+        last_trigger = reload_requested_at(self.models_dir)
+        
+        while not self._watcher_stop.wait(interval):
+            try:
+                signature = disk_signature(self.models_dir)
+                trigger = reload_requested_at(self.models_dir)
+                
+                if trigger != last_trigger:
+                    last_trigger = trigger
+                    result = self.reload_models(force=True)
+                # Training scripts write several files; wait until they stop changing
+                elif signature != loaded_signature and signature == last_signature:
+                    result = self.reload_models()
+                else:
+                    last_signature = signature
+                    continue
+                
+                last_signature = loaded_signature = signature
+                if not result['success']:
+                    print(f"⚠️  Keeping models {self.model_version}: {result.get('error')}")
+                    
+            except Exception as e:
+                print(f"⚠️  Model watcher error: {e}")
+    
+    def _model_order(self, bundle: ModelBundle) -> List[str]:
+        """Models in the order the cascade consults them"""
+        if self.cascade_threshold is None:
+            return list(bundle.models.keys())
+        
+        # Configured order, else the best model first; unlisted models run last
+        preferred = self.cascade_order or [bundle.metadata.get('best_model', 'xgboost')]
+        order = [name for name in preferred if name in bundle.models]
+        return order + [name for name in bundle.models if name not in order]
+    
+    def _predict_with_model(self, features_scaled: np.ndarray, model_name: str,
+                            bundle: ModelBundle) -> Optional[np.ndarray]:
+        """
+        Class probabilities of a specific model for scaled feature rows
+        
+        The label of a row is the argmax of its probabilities, so it always
+        agrees with the confidence the cascade decides on (predict() of
+        SVC(probability=True) can disagree with its predict_proba()).
+        """
+        try:
+            if model_name not in bundle.models:
+                return None
+            
+            return bundle.models[model_name].predict_proba(features_scaled)
             
         except Exception as e:
             print(f"Error making prediction with {model_name}: {e}")
-            return None, None
+            return None
+    
+    def _score_batch(self, features_scaled: np.ndarray,
+                     bundle: ModelBundle) -> List[Tuple[Dict[str, int], Dict[str, Dict[str, float]], Optional[str]]]:
+        """
+        Run the models on scaled feature rows, stopping early for each row
+        once a model is confident enough about it
+        
+        Each model runs once, on the rows no earlier model was confident about.
+        
+        Returns:
+            (predictions, probabilities, decision_model) per row; decision_model
+            is the model that ended the cascade early for that row, or None
+        """
+        scores = [({}, {}, None) for _ in range(len(features_scaled))]
+        pending = np.arange(len(features_scaled))
+        
+        for model_name in self._model_order(bundle):
+            if len(pending) == 0:
+                break
+            proba = self._predict_with_model(features_scaled[pending], model_name, bundle)
+            if proba is None:
+                continue
+            
+            decided = []
+            for row, prob in zip(pending, proba):
+                predictions, probabilities, _ = scores[row]
+                predictions[model_name] = int(np.argmax(prob))
+                probabilities[model_name] = {
+                    'real': float(prob[0]),
+                    'fake': float(prob[1]),
+                    'confidence': float(max(prob)) * 100
+                }
+                if self.cascade_threshold is not None and max(prob) >= self.cascade_threshold:
+                    scores[row] = (predictions, probabilities, model_name)
+                    decided.append(row)
+            if decided:
+                pending = np.setdiff1d(pending, decided, assume_unique=True)
+        
+        return scores
+    
+    def _score_features(self, features: np.ndarray,
+                        bundle: ModelBundle) -> Tuple[Dict[str, int], Dict[str, Dict[str, float]], Optional[str]]:
+        """Run the model cascade on one feature vector, see _score_batch()"""
+        features_scaled = bundle.scaler.transform(features.reshape(1, -1))
+        return self._score_batch(features_scaled, bundle)[0]
+    
+    def _finish_results(self, results: Dict[str, Any], predictions: Dict[str, int],
+                        decision_model: Optional[str], audio_hash: str, bundle: ModelBundle):
+        """Record the cascade outcome in a fresh result and cache it"""
+        if self.cascade_threshold is not None:
+            results['processing_info']['cascade'] = {
+                'threshold': self.cascade_threshold,
+                'models_run': list(predictions.keys()),
+                'early_exit': decision_model is not None
+            }
+        self.result_cache.cache_result(audio_hash, results, bundle.version)
+    
+    def _cached_results(self, audio_hash: str, audio_info: Dict[str, Any], bundle: ModelBundle,
+                        processing_time: float) -> Optional[Dict[str, Any]]:
+        """A cached result for this audio and model set, with the current request's info"""
+        cached = self.result_cache.get_cached_result(audio_hash, bundle.version)
+        if cached is not None:
+            cached['audio_info'] = audio_info
+            cached['processing_info'].update({
+                'processing_time': float(processing_time),
+                'cache_hit': True
+            })
+        return cached
+    
+    def _build_results(self, predictions: Dict[str, int], probabilities: Dict[str, Dict[str, float]],
+                       feature_count: int, audio_info: Dict[str, Any], processing_time: float,
+                       bundle: ModelBundle, decision_model: Optional[str] = None) -> Dict[str, Any]:
+        """Combine per-model predictions into the detector's result format"""
+        # Use the model that ended the cascade, else the best model, for the final decision
+        best_model = decision_model or bundle.metadata.get('best_model', 'xgboost')
+        if best_model not in predictions:
+            best_model = list(predictions.keys())[0]  # Use first available model
+        
+        final_prediction = predictions[best_model]
+        final_probability = probabilities[best_model]
+        
+        # Calculate ensemble prediction (majority vote)
+        fake_votes = sum(1 for pred in predictions.values() if pred == 1)
+        real_votes = len(predictions) - fake_votes
+        ensemble_prediction = 1 if fake_votes > real_votes else 0
+        
+        result = 'fake' if final_prediction == 1 else 'real'
+        ensemble_result = 'fake' if ensemble_prediction == 1 else 'real'
+        
+        return {
+            'success': True,
+            'classification': {
+                'result': result,
+                'confidence': final_probability['confidence'],
+                'fake_probability': final_probability['fake'] * 100,
+                'real_probability': final_probability['real'] * 100
+            },
+            'ensemble_result': {
+                'result': ensemble_result,
+                'confidence': max([p['confidence'] for p in probabilities.values()]),
+                'verdict': 'CLONED' if ensemble_result == 'fake' else 'AUTHENTIC'
+            },
+            'model_predictions': {
+                model: {
+                    'prediction': 'fake' if pred == 1 else 'real',
+                    'confidence': probabilities[model]['confidence'],
+                    'probabilities': probabilities[model]
+                }
+                for model, pred in predictions.items()
+            },
+            'audio_info': audio_info,
+            'processing_info': {
+                'processing_time': float(processing_time),
+                'best_model_used': best_model,
+                'models_available': list(bundle.models.keys()),
+                'feature_count': feature_count,
+                'feature_profile': self.feature_extractor.profile,
+                'feature_schema': self.feature_extractor.schema_id,
+                'model_version': bundle.version,
+                'cache_hit': False,
+                'version': '4.0_Production'
+            }
+        }
+    
+    def _analyze_audio(self, audio: np.ndarray, audio_info: Dict[str, Any], start_time: float) -> Dict[str, Any]:
+        """Extract features from preprocessed audio and run every loaded model"""
+        # Use one model set for the whole analysis, even if a reload happens meanwhile
+        bundle = self._bundle
+        audio_duration = len(audio) / self.feature_extractor.target_sr
+        
+        audio_info = {
+            'duration': float(audio_duration),
+            'sample_rate': int(self.feature_extractor.target_sr),
+            **audio_info
+        }
+        
+        # Identical recordings (retries, re-sent voicemails) decode to identical samples
+        audio_hash = self.result_cache.get_audio_hash(audio)
+        cached = self._cached_results(audio_hash, audio_info, bundle, time.time() - start_time)
+        if cached is not None:
+            print(f"⚡ Cached result: {cached['classification']['result'].upper()}")
+            return cached
+        
+        # Features only depend on the audio and the feature profile
+        features_key = f"{self.feature_extractor.schema_id}:{audio_hash}"
+        features = self.result_cache.get_cached_features(features_key)
+        if features is None:
+            print("🔧 Extracting features...")
+            features = self.feature_extractor.extract_features(audio)
+            if features is None:
+                return {
+                    'success': False,
+                    'error': 'Failed to extract features',
+                    'classification': {'result': 'error', 'confidence': 0.0}
+                }
+            self.result_cache.cache_features(features_key, features)
+        
+        print(f"✅ Extracted {len(features)} features")
+        
+        print("🤖 Running model predictions...")
+        try:
+            predictions, probabilities, decision_model = self._score_features(features, bundle)
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f'Failed to scale features: {str(e)}',
+                'classification': {'result': 'error', 'confidence': 0.0}
+            }
+        
+        if not predictions:
+            return {
+                'success': False,
+                'error': 'All model predictions failed',
+                'classification': {'result': 'error', 'confidence': 0.0}
+            }
+        
+        processing_time = time.time() - start_time
+        
+        results = self._build_results(
+            predictions,
+            probabilities,
+            feature_count=len(features),
+            audio_info=audio_info,
+            processing_time=processing_time,
+            bundle=bundle,
+            decision_model=decision_model
+        )
+        self._finish_results(results, predictions, decision_model, audio_hash, bundle)
+        
+        print(f"✅ Analysis complete! Result: {results['classification']['result'].upper()}")
+        print(f"   Ensemble Result: {results['ensemble_result']['result'].upper()}")
+        print(f"   Confidence: {results['classification']['confidence']:.1f}%")
+        print(f"   Processing time: {processing_time:.2f}s")
+        
+        return results
     
-    def predict_file(self, audio_path: str) -> Dict[str, Any]:
-        """Analyze voice file for clone detection"""
+    def predict_file(self, audio_source: AudioSource, format_hint: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Analyze a voice recording for clone detection
+        
+        Args:
+            audio_source: File path, raw bytes or a file-like object.
+                Bytes and file objects are decoded in memory; only
+                containers soundfile cannot read are spilled to disk.
+            format_hint: File extension of in-memory sources (e.g. '.m4a')
+        """
         start_time = time.time()
         
         if not self.is_initialized:
@@ -283,10 +755,11 @@ class VoiceCloneDetectionProduction:
                 }
         
         try:
-            print(f"🔍 Analyzing voice file: {audio_path}")
+            is_path = isinstance(audio_source, (str, os.PathLike))
+            print(f"🔍 Analyzing voice file: {audio_source if is_path else '<in-memory audio>'}")
             
             # Load and preprocess audio
-            audio = self.feature_extractor.load_audio_file(audio_path)
+            audio = self.feature_extractor.load_audio(audio_source, format_hint)
             if audio is None:
                 return {
                     'success': False,
@@ -294,107 +767,263 @@ class VoiceCloneDetectionProduction:
                     'classification': {'result': 'error', 'confidence': 0.0}
                 }
             
-            audio_duration = len(audio) / self.feature_extractor.target_sr
+            audio_info = {'file_path': str(audio_source)} if is_path else {'source': 'in_memory'}
+            return self._analyze_audio(audio, audio_info, start_time)
             
-            # Extract features
-            print("🔧 Extracting features...")
-            features = self.feature_extractor.extract_features(audio)
-            if features is None:
+        except Exception as e:
+            error_msg = f"Error during voice analysis: {str(e)}"
+            print(f"❌ {error_msg}")
+            
+            return {
+                'success': False,
+                'error': error_msg,
+                'classification': {'result': 'error', 'confidence': 0.0},
+                'processing_info': {'processing_time': time.time() - start_time}
+            }
+    
+    def predict_audio(self, audio_data: np.ndarray, sample_rate: int) -> Dict[str, Any]:
+        """Analyze raw audio data for clone detection"""
+        start_time = time.time()
+        
+        if not self.is_initialized:
+            if not self.initialize():
                 return {
                     'success': False,
-                    'error': 'Failed to extract features',
+                    'error': 'Failed to initialize detection system',
                     'classification': {'result': 'error', 'confidence': 0.0}
                 }
+        
+        try:
+            print("🔍 Analyzing raw audio data")
             
-            print(f"✅ Extracted {len(features)} features")
-            
-            # Make predictions with all available models
-            print("🤖 Running model predictions...")
-            predictions = {}
-            probabilities = {}
-            
-            for model_name in self.models.keys():
-                pred, prob = self._predict_with_model(features, model_name)
-                if pred is not None:
-                    predictions[model_name] = pred
-                    probabilities[model_name] = {
-                        'real': float(prob[0]),
-                        'fake': float(prob[1]),
-                        'confidence': float(max(prob)) * 100
-                    }
-            
-            if not predictions:
+            # Preprocess audio data
+            audio = self.feature_extractor.preprocess_audio(audio_data, sample_rate)
+            if audio is None:
                 return {
                     'success': False,
-                    'error': 'All model predictions failed',
+                    'error': 'Failed to preprocess audio data',
                     'classification': {'result': 'error', 'confidence': 0.0}
                 }
             
-            # Use best model for final decision
-            best_model = self.metadata.get('best_model', 'xgboost')
-            if best_model not in predictions:
-                best_model = list(predictions.keys())[0]  # Use first available model
+            return self._analyze_audio(audio, {'source': 'raw_data'}, start_time)
+                    
+        except Exception as e:
+            error_msg = f"Error analyzing raw audio data: {str(e)}"
+            print(f"❌ {error_msg}")
+            
+            return {
+                'success': False,
+                'error': error_msg,
+                'classification': {'result': 'error', 'confidence': 0.0},
+                'processing_info': {'processing_time': time.time() - start_time}
+            }
+    
+    def predict_features(self, features: np.ndarray, feature_schema: str,
+                         audio_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Score a feature vector computed elsewhere (e.g. by a live stream's
+        feature accumulator) with the model cascade
+        
+        Args:
+            features: Feature vector of the loaded models' layout
+            feature_schema: feature_schema_id() the vector was computed with;
+                it must match the models'
+            audio_info: Reported as the result's audio_info
+        """
+        start_time = time.time()
+        
+        if not self.is_initialized:
+            if not self.initialize():
+                return {
+                    'success': False,
+                    'error': 'Failed to initialize detection system',
+                    'classification': {'result': 'error', 'confidence': 0.0}
+                }
+        
+        if feature_schema != self.feature_extractor.schema_id:
+            return {
+                'success': False,
+                'error': f'Features use schema {feature_schema}, the models expect {self.feature_extractor.schema_id}',
+                'classification': {'result': 'error', 'confidence': 0.0}
+            }
+        
+        bundle = self._bundle
+        try:
+            predictions, probabilities, decision_model = self._score_features(np.asarray(features), bundle)
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f'Failed to scale features: {str(e)}',
+                'classification': {'result': 'error', 'confidence': 0.0}
+            }
+        
+        if not predictions:
+            return {
+                'success': False,
+                'error': 'All model predictions failed',
+                'classification': {'result': 'error', 'confidence': 0.0}
+            }
+        
+        return self._build_results(predictions, probabilities, feature_count=len(features),
+                                   audio_info=audio_info or {'source': 'features'},
+                                   processing_time=time.time() - start_time,
+                                   bundle=bundle, decision_model=decision_model)
+    
+    def predict_stream(self, audio_source: AudioSource, segment_seconds: float = 10.0,
+                       format_hint: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Analyze a whole recording of any length in fixed windows
+        
+        Each window is decoded, featurized and scored on its own, so memory
+        stays bounded however long the recording is. The result has the
+        predict_file format, aggregated over all voiced windows, plus a
+        'timeline' with the verdict of every window.
+        
+        Args:
+            audio_source: File path, raw bytes or a file-like object
+            segment_seconds: Window length
+            format_hint: File extension of in-memory sources (e.g. '.m4a')
+        """
+        start_time = time.time()
+        
+        if not self.is_initialized:
+            if not self.initialize():
+                return {
+                    'success': False,
+                    'error': 'Failed to initialize detection system',
+                    'classification': {'result': 'error', 'confidence': 0.0}
+                }
+        
+        bundle = self._bundle
+        best_model = bundle.metadata.get('best_model', 'xgboost')
+        min_samples = int(self.feature_extractor.MIN_SEGMENT_DURATION * self.feature_extractor.target_sr)
+        
+        timeline = []
+        fake_probabilities = []
+        model_totals = {}
+        feature_count = 0
+        duration = 0.0
+        
+        try:
+            is_path = isinstance(audio_source, (str, os.PathLike))
+            print(f"🔍 Streaming analysis of: {audio_source if is_path else '<in-memory audio>'}")
             
-            final_prediction = predictions[best_model]
-            final_probability = probabilities[best_model]
+            for seg_start, seg_end, block, sr in self.feature_extractor.iter_segments(
+                    audio_source, segment_seconds, format_hint):
+                duration = seg_end
+                segment = {'start': round(seg_start, 2), 'end': round(seg_end, 2)}
+                timeline.append(segment)
+                
+                audio = self.feature_extractor.preprocess_audio(block, sr)
+                if audio is None or len(audio) < min_samples:
+                    segment['result'] = 'silent'
+                    continue
+                
+                features = self.feature_extractor.extract_features(audio)
+                if features is None:
+                    segment['result'] = 'error'
+                    continue
+                feature_count = len(features)
+                
+                predictions, probabilities, decision_model = self._score_features(features, bundle)
+                if not predictions:
+                    segment['result'] = 'error'
+                    continue
+                
+                decided_by = decision_model or (best_model if best_model in predictions else next(iter(predictions)))
+                decision = probabilities[decided_by]
+                segment.update({
+                    'result': 'fake' if predictions[decided_by] == 1 else 'real',
+                    'fake_probability': decision['fake'] * 100,
+                    'confidence': decision['confidence'],
+                    'decided_by': decided_by
+                })
+                fake_probabilities.append(decision['fake'])
+                
+                for model_name, prob in probabilities.items():
+                    totals = model_totals.setdefault(model_name, {'real': 0.0, 'fake': 0.0, 'segments': 0})
+                    totals['real'] += prob['real']
+                    totals['fake'] += prob['fake']
+                    totals['segments'] += 1
             
-            # Calculate ensemble prediction (majority vote)
-            fake_votes = sum(1 for pred in predictions.values() if pred == 1)
-            real_votes = len(predictions) - fake_votes
-            ensemble_prediction = 1 if fake_votes > real_votes else 0
+            if not fake_probabilities:
+                return {
+                    'success': False,
+                    'error': 'No voiced audio found in recording' if timeline else 'Failed to load audio file',
+                    'classification': {'result': 'error', 'confidence': 0.0},
+                    'timeline': timeline,
+                    'processing_info': {'processing_time': time.time() - start_time}
+                }
             
-            # Calculate confidence
-            confidence = final_probability['confidence']
+            # Overall verdict from the mean fake probability of the voiced windows;
+            # the ensemble view is a majority vote over windows
+            fake_probability = float(np.mean(fake_probabilities))
+            fake_segments = sum(1 for seg in timeline if seg.get('result') == 'fake')
+            real_segments = sum(1 for seg in timeline if seg.get('result') == 'real')
+            result = 'fake' if fake_probability >= 0.5 else 'real'
+            ensemble_result = 'fake' if fake_segments > real_segments else 'real'
             
-            result = 'fake' if final_prediction == 1 else 'real'
-            ensemble_result = 'fake' if ensemble_prediction == 1 else 'real'
+            model_predictions = {}
+            for model_name, totals in model_totals.items():
+                real = totals['real'] / totals['segments']
+                fake = totals['fake'] / totals['segments']
+                model_predictions[model_name] = {
+                    'prediction': 'fake' if fake > real else 'real',
+                    'confidence': max(real, fake) * 100,
+                    'probabilities': {'real': real, 'fake': fake, 'confidence': max(real, fake) * 100},
+                    'segments': totals['segments']
+                }
             
+            audio_info = {
+                'duration': float(duration),
+                'sample_rate': int(self.feature_extractor.target_sr),
+                'segment_seconds': float(segment_seconds),
+                'segments': len(timeline),
+                'voiced_segments': len(fake_probabilities)
+            }
+            audio_info.update({'file_path': str(audio_source)} if is_path else {'source': 'in_memory'})
             processing_time = time.time() - start_time
             
             results = {
                 'success': True,
                 'classification': {
                     'result': result,
-                    'confidence': confidence,
-                    'fake_probability': final_probability['fake'] * 100,
-                    'real_probability': final_probability['real'] * 100
+                    'confidence': max(fake_probability, 1 - fake_probability) * 100,
+                    'fake_probability': fake_probability * 100,
+                    'real_probability': (1 - fake_probability) * 100
                 },
                 'ensemble_result': {
                     'result': ensemble_result,
-                    'confidence': max([p['confidence'] for p in probabilities.values()]),
-                    'verdict': 'CLONED' if ensemble_result == 'fake' else 'AUTHENTIC'
-                },
-                'model_predictions': {
-                    model: {
-                        'prediction': 'fake' if pred == 1 else 'real',
-                        'confidence': probabilities[model]['confidence'],
-                        'probabilities': probabilities[model]
-                    }
-                    for model, pred in predictions.items()
-                },
-                'audio_info': {
-                    'duration': float(audio_duration),
-                    'sample_rate': int(self.feature_extractor.target_sr),
-                    'file_path': audio_path
+                    'confidence': max(fake_segments, real_segments) / (fake_segments + real_segments) * 100,
+                    'verdict': 'CLONED' if ensemble_result == 'fake' else 'AUTHENTIC',
+                    'fake_segments': fake_segments,
+                    'real_segments': real_segments
                 },
+                'model_predictions': model_predictions,
+                'timeline': timeline,
+                'audio_info': audio_info,
                 'processing_info': {
                     'processing_time': float(processing_time),
                     'best_model_used': best_model,
-                    'models_available': list(self.models.keys()),
-                    'feature_count': len(features),
+                    'models_available': list(bundle.models.keys()),
+                    'feature_count': feature_count,
+                    'feature_profile': self.feature_extractor.profile,
+                    'feature_schema': self.feature_extractor.schema_id,
+                    'model_version': bundle.version,
+                    'cache_hit': False,
+                    'streaming': True,
                     'version': '4.0_Production'
                 }
             }
             
-            print(f"✅ Analysis complete! Result: {result.upper()}")
-            print(f"   Ensemble Result: {ensemble_result.upper()}")
-            print(f"   Confidence: {confidence:.1f}%")
-            print(f"   Processing time: {processing_time:.2f}s")
+            print(f"✅ Streaming analysis complete! Result: {result.upper()}")
+            print(f"   Windows: {len(timeline)} ({fake_segments} fake, {real_segments} real)")
+            print(f"   Duration: {duration:.1f}s, processing time: {processing_time:.2f}s")
             
             return results
             
         except Exception as e:
-            error_msg = f"Error during voice analysis: {str(e)}"
+            error_msg = f"Error during streaming voice analysis: {str(e)}"
             print(f"❌ {error_msg}")
             
             return {
@@ -404,58 +1033,119 @@ class VoiceCloneDetectionProduction:
                 'processing_info': {'processing_time': time.time() - start_time}
             }
     
-    def predict_audio(self, audio_data: np.ndarray, sample_rate: int) -> Dict[str, Any]:
-        """Analyze raw audio data for clone detection"""
+    def predict_batch(self, items: Sequence[BatchItem], max_workers: Optional[int] = None,
+                      chunksize: int = 4) -> List[Dict[str, Any]]:
+        """
+        Analyze many recordings at once
+        
+        Features are extracted in parallel worker processes, stacked into one
+        matrix and scaled once. Recordings with a cached result are answered
+        from the cache; the rest go through the same model cascade as
+        predict_file, each model running once over the rows still undecided.
+        Every item gets the verdict predict_file would give it, and new
+        results are cached for later requests.
+        
+        Args:
+            items: File paths, mono arrays at the detector's sample rate,
+                or (array, sample_rate) tuples
+            max_workers: Feature extraction processes (default: CPU count)
+            chunksize: Items sent to a worker per task
+            
+        Returns:
+            One result dictionary per item, in input order, in the same
+            format as predict_file
+        """
         start_time = time.time()
+        items = list(items)
         
         if not self.is_initialized:
             if not self.initialize():
-                return {
+                return [{
                     'success': False,
                     'error': 'Failed to initialize detection system',
                     'classification': {'result': 'error', 'confidence': 0.0}
-                }
+                } for _ in items]
         
-        try:
-            print("🔍 Analyzing raw audio data")
-            
-            # Preprocess audio data
-            audio = self.feature_extractor.preprocess_audio(audio_data, sample_rate)
-            if audio is None:
-                return {
+        if not items:
+            return []
+        
+        print(f"🔍 Analyzing batch of {len(items)} recordings")
+        bundle = self._bundle
+        
+        # Extract features in parallel, keeping input order
+        worker = partial(_extract_batch_item,
+                         target_sr=self.feature_extractor.target_sr,
+                         profile=self.feature_extractor.profile)
+        if len(items) == 1 or max_workers == 1:
+            extracted = [worker(item) for item in items]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                extracted = list(pool.map(worker, items, chunksize=chunksize))
+        
+        processing_time = (time.time() - start_time) / len(items)
+        
+        audio_infos = []
+        for item, (_, duration, _, _) in zip(items, extracted):
+            audio_info = {
+                'duration': float(duration),
+                'sample_rate': int(self.feature_extractor.target_sr)
+            }
+            if isinstance(item, (str, os.PathLike)):
+                audio_info['file_path'] = str(item)
+            elif isinstance(item, (np.ndarray, tuple)):
+                audio_info['source'] = 'raw_data'
+            else:
+                audio_info['source'] = 'in_memory'
+            audio_infos.append(audio_info)
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        to_score = []
+        for i, (features, _, error, audio_hash) in enumerate(extracted):
+            if error is not None:
+                results[i] = {
                     'success': False,
-                    'error': 'Failed to preprocess audio data',
+                    'error': error,
                     'classification': {'result': 'error', 'confidence': 0.0}
                 }
-            
-            # Save to temporary file and analyze
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                sf.write(temp_file.name, audio, self.feature_extractor.target_sr)
-                temp_path = temp_file.name
-            
+                continue
+            results[i] = self._cached_results(audio_hash, audio_infos[i], bundle, processing_time)
+            if results[i] is None:
+                to_score.append(i)
+        
+        # One scaler pass and a cascade over the whole batch
+        scores = []
+        if to_score:
             try:
-                # Analyze using the file-based method
-                results = self.predict_file(temp_path)
-                if 'audio_info' in results:
-                    results['audio_info']['source'] = 'raw_data'
-                return results
-            finally:
-                # Clean up temporary file
-                try:
-                    os.unlink(temp_path)
-                except:
-                    pass
-                    
-        except Exception as e:
-            error_msg = f"Error analyzing raw audio data: {str(e)}"
-            print(f"❌ {error_msg}")
+                features_scaled = bundle.scaler.transform(np.vstack([extracted[i][0] for i in to_score]))
+                scores = self._score_batch(features_scaled, bundle)
+            except Exception as e:
+                print(f"Error scaling batch features: {e}")
+        
+        for n, i in enumerate(to_score):
+            predictions, probabilities, decision_model = scores[n] if scores else ({}, {}, None)
+            if not predictions:
+                results[i] = {
+                    'success': False,
+                    'error': 'All model predictions failed',
+                    'classification': {'result': 'error', 'confidence': 0.0}
+                }
+                continue
             
-            return {
-                'success': False,
-                'error': error_msg,
-                'classification': {'result': 'error', 'confidence': 0.0},
-                'processing_info': {'processing_time': time.time() - start_time}
-            }
+            features, _, _, audio_hash = extracted[i]
+            result = self._build_results(predictions, probabilities, feature_count=len(features),
+                                         audio_info=audio_infos[i], processing_time=processing_time,
+                                         bundle=bundle, decision_model=decision_model)
+            self._finish_results(result, predictions, decision_model, audio_hash, bundle)
+            results[i] = result
+        
+        for result in results:
+            if result['success']:
+                result['processing_info']['batch_size'] = len(items)
+        
+        succeeded = sum(1 for r in results if r['success'])
+        print(f"✅ Batch complete: {succeeded}/{len(items)} analyzed in {time.time() - start_time:.2f}s")
+        
+        return results
 
 
 # Test function
@@ -0,0 +1,512 @@
+"""
+Voice Feature Engine
+====================
+
+Shared-spectrogram feature extraction for voice clone detection.
+
+Every librosa feature call used to compute its own STFT of the same clip.
+The engine computes the complex STFT once, derives the magnitude and power
+spectrograms from it and feeds those to every spectral feature, so a clip
+costs one forward FFT pass instead of about ten.
+
+Two feature profiles are available:
+
+- ``full``: the original feature definitions (parity with the per-call
+  librosa pipeline the production models were trained on).
+- ``fast``: the same 154-dimensional layout with the expensive stages
+  replaced. Harmonic/percussive separation runs once on the power
+  spectrogram with a shorter median filter and no inverse STFT, and its
+  harmonic part feeds both the energy ratios and tonnetz (projected from
+  a harmonic chroma instead of a constant-Q transform). Models must be
+  trained on the same profile they are served with.
+
+This module is the only feature definition: the production detector and
+every training script preprocess and featurize audio through
+FeatureExtractor. Each trained model set records the feature_schema_id()
+it was built with in model_metadata.json, and the detector refuses models
+whose schema differs from the features it would compute.
+
+Author: SAP GHOST AI Team
+Version: 2.0
+"""
+
+import json
+import time
+import hashlib
+import numpy as np
+import librosa
+from typing import Any, Dict, Optional
+
+# STFT parameters shared by every spectral feature (librosa defaults)
+N_FFT = 2048
+HOP_LENGTH = 512
+PAD_MODE = 'constant'
+
+# Length of the feature vector the trained models expect
+NUM_FEATURES = 154
+
+# Feature profiles; models are only valid for the profile they were trained on
+FEATURE_PROFILES = ('full', 'fast')
+DEFAULT_PROFILE = 'full'
+
+# Median filter length of the fast profile's harmonic/percussive separation
+FAST_HPSS_KERNEL = 15
+
+# Bump whenever a change alters the feature values computed for the same audio
+FEATURE_SCHEMA_VERSION = 1
+
+# Silence below this many dB under the peak is trimmed before featurizing
+TRIM_TOP_DB = 20
+
+# Vector layout: (group, rows, statistics) in order. Each statistic is
+# written for all rows of its group before the next one (all means, then
+# all standard deviations, ...). Groups without statistics are whole-clip
+# values copied into the vector as they are.
+ALL_STATS = ('mean', 'std', 'min', 'max')
+FEATURE_LAYOUT = (
+    ('mfcc', 13, ALL_STATS),
+    ('centroid', 1, ALL_STATS),
+    ('rolloff', 1, ALL_STATS),
+    ('bandwidth', 1, ALL_STATS),
+    ('contrast', 7, ('mean', 'std')),
+    ('zcr', 1, ALL_STATS),
+    ('chroma', 12, ('mean', 'std')),
+    ('mel', 13, ('mean', 'std')),
+    ('hpss', 3, None),
+    ('tempo', 1, None),
+    ('rms', 1, ALL_STATS),
+    ('flatness', 1, ('mean', 'std')),
+    ('tonnetz', 6, ('mean', 'std')),
+)
+
+# librosa >= 0.10 moved tempo estimation to librosa.feature
+_estimate_tempo = getattr(librosa.feature, 'tempo', None) or librosa.beat.tempo
+
+
+class FrameStatistics:
+    """
+    Reduce per-frame feature matrices to the feature vector of FEATURE_LAYOUT
+
+    The frame groups are stacked into one (dims, frames) matrix, one row
+    per feature dimension, and each statistic is a single reduction over
+    that matrix scattered into the output vector through precomputed
+    indices. Training and serving both go through here, so their vectors
+    share one layout.
+    """
+
+    def __init__(self, layout=FEATURE_LAYOUT):
+        self.layout = layout
+        self.frame_groups = []   # (group, first row, rows) of the stacked matrix
+        self.value_groups = []   # (group, first output position, size)
+        stat_rows = {stat: [] for stat in ALL_STATS}
+        stat_outputs = {stat: [] for stat in ALL_STATS}
+
+        row = 0
+        position = 0
+        for group, size, stats in layout:
+            if stats is None:
+                self.value_groups.append((group, position, size))
+                position += size
+                continue
+            self.frame_groups.append((group, row, size))
+            for stat in stats:
+                stat_rows[stat].extend(range(row, row + size))
+                stat_outputs[stat].extend(range(position, position + size))
+                position += size
+            row += size
+
+        self.dims = row
+        self.size = position
+        # Only statistics some group uses are computed
+        self._scatter = [(stat, np.array(stat_rows[stat]), np.array(stat_outputs[stat]))
+                         for stat in ALL_STATS if stat_rows[stat]]
+
+    def stack(self, frames: Dict[str, np.ndarray], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Copy each group's (rows, frames) matrix into one preallocated (dims, frames) matrix"""
+        n_frames = np.shape(frames[self.frame_groups[0][0]])[-1]
+        if out is None:
+            out = np.empty((self.dims, n_frames), dtype=np.float32)
+        for group, row, size in self.frame_groups:
+            values = frames[group]
+            if np.shape(values)[-1] != n_frames:
+                raise ValueError(f"Feature '{group}' has {np.shape(values)[-1]} frames, expected {n_frames}")
+            out[row:row + size] = np.reshape(values, (size, n_frames))
+        return out
+
+    def aggregate(self, frames: Dict[str, np.ndarray], values: Dict[str, Any],
+                  out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Build the feature vector
+
+        Args:
+            frames: (rows, frames) matrix of every frame group
+            values: Whole-clip values of every group without statistics
+            out: Optional preallocated vector to write into
+        """
+        stacked = self.stack(frames)
+        reductions = {'mean': np.mean, 'std': np.std, 'min': np.min, 'max': np.max}
+        row_stats = {stat: reductions[stat](stacked, axis=1) for stat, _, _ in self._scatter}
+        return self.assemble(row_stats, values, out=out)
+
+    def assemble(self, row_stats: Dict[str, np.ndarray], values: Dict[str, Any],
+                 out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Build the feature vector from statistics that are already reduced
+
+        Args:
+            row_stats: Per-row 'mean', 'std', 'min' and 'max' of the stacked
+                (dims, frames) matrix, each of length dims
+            values: Whole-clip values of every group without statistics
+            out: Optional preallocated vector to write into
+        """
+        if out is None:
+            out = np.empty(self.size, dtype=np.float32)
+        for stat, rows, outputs in self._scatter:
+            out[outputs] = row_stats[stat][rows]
+
+        for group, position, size in self.value_groups:
+            out[position:position + size] = np.ravel(values[group])
+        return out
+
+
+FRAME_STATISTICS = FrameStatistics()
+
+
+class SpectralFeatureEngine:
+    """Derive the 154-dimensional voice feature vector from a single STFT"""
+
+    def __init__(self, target_sr: int = 22050, n_fft: int = N_FFT, hop_length: int = HOP_LENGTH,
+                 profile: str = DEFAULT_PROFILE):
+        if profile not in FEATURE_PROFILES:
+            raise ValueError(f"Unknown feature profile '{profile}'. Available: {', '.join(FEATURE_PROFILES)}")
+        self.target_sr = target_sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.profile = profile
+
+    def compute_spectrogram(self, audio: np.ndarray) -> Dict[str, np.ndarray]:
+        """Compute the complex STFT once and the spectrograms derived from it"""
+        stft = librosa.stft(audio, n_fft=self.n_fft, hop_length=self.hop_length, pad_mode=PAD_MODE)
+        magnitude = np.abs(stft)
+        power = magnitude ** 2
+
+        # 128-band log-mel spectrogram, shared by MFCC and onset strength
+        mel_db = librosa.power_to_db(librosa.feature.melspectrogram(S=power, sr=self.target_sr))
+
+        return {
+            'stft': stft,
+            'magnitude': magnitude,
+            'power': power,
+            'mel_db': mel_db
+        }
+
+    def extract(self, audio: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Extract the feature vector (same layout as the per-call librosa pipeline)"""
+        spec = self.compute_spectrogram(audio)
+        frames = self.frame_features(audio, spec)
+
+        # Whole-clip values; tempo uses the onset envelope of the shared log-mel spectrogram
+        values = {
+            'hpss': frames.pop('hpss'),
+            'tempo': [self.tempo(spec['mel_db'])]
+        }
+        return FRAME_STATISTICS.aggregate(frames, values, out=out)
+
+    def frame_features(self, audio: np.ndarray, spec: Dict[str, np.ndarray]):
+        """
+        Per-frame feature matrices of a clip, keyed by FEATURE_LAYOUT group
+
+        The harmonic/percussive ratios are included under 'hpss' because
+        they come from the same separation tonnetz is computed from.
+        """
+        sr = self.target_sr
+        magnitude = spec['magnitude']
+        power = spec['power']
+
+        spectral_centroids = librosa.feature.spectral_centroid(S=magnitude, sr=sr)
+        harmonic_ratios, harmonic = self.harmonic_ratios(audio, spec)
+
+        frames = {
+            'mfcc': librosa.feature.mfcc(S=spec['mel_db'], sr=sr, n_mfcc=13),
+            'centroid': spectral_centroids,
+            'rolloff': librosa.feature.spectral_rolloff(S=magnitude, sr=sr),
+            'bandwidth': librosa.feature.spectral_bandwidth(S=magnitude, sr=sr, centroid=spectral_centroids),
+            'contrast': librosa.feature.spectral_contrast(S=magnitude, sr=sr),
+            # Zero crossing rate and RMS are computed in the time domain
+            'zcr': librosa.feature.zero_crossing_rate(audio),
+            'chroma': librosa.feature.chroma_stft(S=power, sr=sr),
+            'mel': librosa.power_to_db(librosa.feature.melspectrogram(S=power, sr=sr, n_mels=13), ref=np.max),
+            'hpss': harmonic_ratios,
+            'rms': librosa.feature.rms(y=audio),
+            'flatness': librosa.feature.spectral_flatness(S=magnitude),
+            'tonnetz': self.tonnetz(harmonic)
+        }
+        return frames
+
+    def harmonic_ratios(self, audio: np.ndarray, spec: Dict[str, np.ndarray]):
+        """
+        Harmonic/percussive energy ratios
+
+        Returns:
+            ([harmonic/total, percussive/total, harmonic/percussive], harmonic)
+            where harmonic is the signal (full) or power spectrogram (fast)
+            that tonnetz() expects
+        """
+        if self.profile == 'fast':
+            # Separate the power spectrogram once; energies by Parseval, no inverse STFT
+            harmonic, percussive = librosa.decompose.hpss(spec['power'], kernel_size=FAST_HPSS_KERNEL)
+            harmonic_energy = np.sum(harmonic)
+            percussive_energy = np.sum(percussive)
+            total_energy = np.sum(spec['power'])
+        else:
+            harmonic, percussive = self._separate(audio, spec['stft'])
+            harmonic_energy = np.sum(harmonic**2)
+            percussive_energy = np.sum(percussive**2)
+            total_energy = np.sum(audio**2)
+
+        ratios = [
+            harmonic_energy / (total_energy + 1e-10),
+            percussive_energy / (total_energy + 1e-10),
+            harmonic_energy / (percussive_energy + 1e-10)
+        ]
+        return ratios, harmonic
+
+    def tonnetz(self, harmonic: np.ndarray) -> np.ndarray:
+        """Tonnetz of the harmonic component returned by harmonic_ratios()"""
+        if self.profile == 'fast':
+            return librosa.feature.tonnetz(chroma=librosa.feature.chroma_stft(S=harmonic, sr=self.target_sr),
+                                           sr=self.target_sr)
+        return librosa.feature.tonnetz(y=harmonic, sr=self.target_sr)
+
+    def _separate(self, audio: np.ndarray, stft: np.ndarray):
+        """Harmonic/percussive separation equivalent to librosa.effects.hpss"""
+        stft_harm, stft_perc = librosa.decompose.hpss(stft)
+        harmonic = librosa.istft(stft_harm, hop_length=self.hop_length, dtype=audio.dtype, length=len(audio))
+        percussive = librosa.istft(stft_perc, hop_length=self.hop_length, dtype=audio.dtype, length=len(audio))
+        return harmonic, percussive
+
+    def tempo(self, mel_db: np.ndarray) -> float:
+        """
+        Tempo as reported by librosa.beat.beat_track(y=audio).
+
+        beat_track only returns the tempo estimate of its onset envelope;
+        the dynamic-programming beat positions it also computes are never
+        used, so the estimate is taken directly.
+        """
+        try:
+            onset_env = librosa.onset.onset_strength(
+                S=mel_db, sr=self.target_sr, hop_length=self.hop_length, aggregate=np.median
+            )
+            if not onset_env.any():
+                return 0.0  # beat_track reports 0 BPM for an empty onset envelope
+            tempo = _estimate_tempo(onset_envelope=onset_env, sr=self.target_sr, hop_length=self.hop_length)
+            return float(np.atleast_1d(tempo)[0])
+        except Exception:
+            return 120.0  # Default tempo
+
+
+def feature_schema_id(profile: str = DEFAULT_PROFILE, target_sr: int = 22050) -> str:
+    """
+    Identifier of the features a model set is trained on
+
+    Derived from the schema version and every parameter that changes the
+    feature values (profile, sample rate, STFT and preprocessing settings,
+    vector layout), e.g. ``voice154-v1-full-22050-3f9a0c1d2b4e``.
+    """
+    definition = {
+        'version': FEATURE_SCHEMA_VERSION,
+        'profile': profile,
+        'sample_rate': target_sr,
+        'n_fft': N_FFT,
+        'hop_length': HOP_LENGTH,
+        'pad_mode': PAD_MODE,
+        'trim_top_db': TRIM_TOP_DB,
+        'layout': FEATURE_LAYOUT
+    }
+    if profile == 'fast':
+        definition['hpss_kernel'] = FAST_HPSS_KERNEL
+    digest = hashlib.sha256(json.dumps(definition, sort_keys=True).encode()).hexdigest()[:12]
+    return f"voice{NUM_FEATURES}-v{FEATURE_SCHEMA_VERSION}-{profile}-{target_sr}-{digest}"
+
+
+def preprocess_audio(audio: np.ndarray, sr: int, target_sr: int = 22050) -> np.ndarray:
+    """Resample, peak-normalize and trim leading/trailing silence"""
+    if sr != target_sr:
+        audio = librosa.resample(audio, orig_sr=sr, target_sr=target_sr)
+    audio = librosa.util.normalize(audio)
+    audio, _ = librosa.effects.trim(audio, top_db=TRIM_TOP_DB)
+    return audio
+
+
+class FeatureExtractor:
+    """
+    Preprocessing and feature extraction shared by training and serving
+    """
+
+    def __init__(self, target_sr: int = 22050, profile: str = DEFAULT_PROFILE):
+        self.target_sr = target_sr
+        self.engine = SpectralFeatureEngine(target_sr=target_sr, profile=profile)
+        self.schema_id = feature_schema_id(profile, target_sr)
+        self._extractions = 0
+        self._extraction_seconds = 0.0
+
+    @property
+    def profile(self) -> str:
+        return self.engine.profile
+
+    def preprocess_audio(self, audio: np.ndarray, sr: int) -> Optional[np.ndarray]:
+        """Preprocess raw audio data"""
+        try:
+            return preprocess_audio(audio, sr, self.target_sr)
+        except Exception as e:
+            print(f"Error preprocessing audio: {e}")
+            return None
+
+    def extract_features(self, audio: np.ndarray) -> Optional[np.ndarray]:
+        """Extract the feature vector of preprocessed audio from a single shared STFT"""
+        try:
+            start_time = time.perf_counter()
+            features = self.engine.extract(audio)
+            self._extraction_seconds += time.perf_counter() - start_time
+            self._extractions += 1
+            return features
+        except Exception as e:
+            print(f"Error extracting features: {e}")
+            return None
+
+    def features_from_audio(self, audio: np.ndarray, sr: int) -> Optional[np.ndarray]:
+        """Preprocess raw audio and extract its feature vector"""
+        audio = self.preprocess_audio(np.asarray(audio, dtype=np.float32), sr)
+        if audio is None or len(audio) == 0:
+            return None
+        return self.extract_features(audio)
+
+    def average_extraction_ms(self) -> float:
+        """Average feature extraction latency of this extractor"""
+        if not self._extractions:
+            return 0.0
+        return self._extraction_seconds / self._extractions * 1000
+
+    def schema_metadata(self) -> Dict[str, Any]:
+        """Feature fields for model_metadata.json"""
+        return {
+            'feature_schema': self.schema_id,
+            'feature_schema_version': FEATURE_SCHEMA_VERSION,
+            'feature_profile': self.profile,
+            'num_features': NUM_FEATURES,
+            'sample_rate': self.target_sr
+        }
+
+
+def _summary(values: np.ndarray):
+    """Mean, std, min and max of a single-row feature"""
+    return [np.mean(values), np.std(values), np.min(values), np.max(values)]
+
+
+def reference_features(audio: np.ndarray, sr: int = 22050) -> np.ndarray:
+    """
+    Per-call librosa pipeline the engine replaces.
+
+    Kept only as the parity reference for test_feature_parity(); every
+    feature here recomputes its own STFT.
+    """
+    features = []
+
+    mfcc = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=13)
+    features.extend([np.mean(mfcc, axis=1), np.std(mfcc, axis=1), np.min(mfcc, axis=1), np.max(mfcc, axis=1)])
+
+    spectral_centroids = librosa.feature.spectral_centroid(y=audio, sr=sr)
+    spectral_rolloff = librosa.feature.spectral_rolloff(y=audio, sr=sr)
+    spectral_bandwidth = librosa.feature.spectral_bandwidth(y=audio, sr=sr)
+    spectral_contrast = librosa.feature.spectral_contrast(y=audio, sr=sr)
+    features.extend([
+        _summary(spectral_centroids),
+        _summary(spectral_rolloff),
+        _summary(spectral_bandwidth),
+        np.mean(spectral_contrast, axis=1),
+        np.std(spectral_contrast, axis=1)
+    ])
+
+    features.append(_summary(librosa.feature.zero_crossing_rate(audio)))
+
+    chroma = librosa.feature.chroma_stft(y=audio, sr=sr)
+    features.extend([np.mean(chroma, axis=1), np.std(chroma, axis=1)])
+
+    mel_db = librosa.power_to_db(librosa.feature.melspectrogram(y=audio, sr=sr, n_mels=13), ref=np.max)
+    features.extend([np.mean(mel_db, axis=1), np.std(mel_db, axis=1)])
+
+    harmonic, percussive = librosa.effects.hpss(audio)
+    harmonic_energy = np.sum(harmonic**2)
+    percussive_energy = np.sum(percussive**2)
+    total_energy = np.sum(audio**2)
+    features.append([
+        harmonic_energy / (total_energy + 1e-10),
+        percussive_energy / (total_energy + 1e-10),
+        harmonic_energy / (percussive_energy + 1e-10)
+    ])
+
+    try:
+        tempo, _ = librosa.beat.beat_track(y=audio, sr=sr)
+        features.append([float(np.atleast_1d(tempo)[0])])
+    except Exception:
+        features.append([120.0])
+
+    features.append(_summary(librosa.feature.rms(y=audio)))
+
+    spectral_flatness = librosa.feature.spectral_flatness(y=audio)
+    features.append([np.mean(spectral_flatness), np.std(spectral_flatness)])
+
+    tonnetz = librosa.feature.tonnetz(y=librosa.effects.harmonic(audio), sr=sr)
+    features.extend([np.mean(tonnetz, axis=1), np.std(tonnetz, axis=1)])
+
+    return np.concatenate([np.ravel(g) for g in features]).astype(np.float32)
+
+
+def benchmark_profiles(audio: Optional[np.ndarray] = None, sr: int = 22050, runs: int = 5) -> Dict[str, float]:
+    """Average feature extraction time in milliseconds for each profile"""
+
+    if audio is None:
+        rng = np.random.default_rng(0)
+        audio = rng.normal(0, 0.1, sr * 5).astype(np.float32)
+
+    timings = {}
+    for profile in FEATURE_PROFILES:
+        engine = SpectralFeatureEngine(target_sr=sr, profile=profile)
+        engine.extract(audio)  # warm up filter banks and caches
+        start = time.perf_counter()
+        for _ in range(runs):
+            engine.extract(audio)
+        timings[profile] = (time.perf_counter() - start) / runs * 1000
+        print(f"⏱️  {profile}: {timings[profile]:.1f} ms per clip ({len(audio) / sr:.1f}s audio)")
+
+    return timings
+
+
+# Test function
+def test_feature_parity(audio: Optional[np.ndarray] = None, sr: int = 22050,
+                        rtol: float = 1e-4, atol: float = 1e-4) -> bool:
+    """Check that the shared-STFT engine reproduces the per-call feature vector"""
+    print("🧪 Testing shared-STFT feature engine parity...")
+
+    if audio is None:
+        rng = np.random.default_rng(0)
+        t = np.linspace(0, 3, sr * 3, endpoint=False)
+        audio = 0.3 * (np.sin(2 * np.pi * 220 * t) + 0.5 * np.sin(2 * np.pi * 440 * t))
+        audio = (audio + rng.normal(0, 0.01, len(t))).astype(np.float32)
+
+    expected = reference_features(audio, sr)
+    actual = SpectralFeatureEngine(target_sr=sr).extract(audio)
+
+    assert actual.shape == (NUM_FEATURES,), f"Expected {NUM_FEATURES} features, got {actual.shape}"
+    mismatched = np.flatnonzero(~np.isclose(actual, expected, rtol=rtol, atol=atol))
+    if len(mismatched):
+        print(f"❌ {len(mismatched)} features differ: indices {mismatched.tolist()}")
+        return False
+
+    print(f"✅ All {NUM_FEATURES} features match the per-call pipeline")
+    return True
+
+
+if __name__ == "__main__":
+    test_feature_parity()
+    benchmark_profiles()
@@ -9,9 +9,8 @@ Author: SAP GHOST AI Team
 Version: 4.0 - Production Ready
 """
 
-import os
 import json
-import tempfile
+import asyncio
 import numpy as np
 from pathlib import Path
 from typing import Dict, Any, Optional
@@ -20,7 +19,9 @@ from django.core.files.uploadedfile import UploadedFile
 from django.http import JsonResponse
 from django.utils import timezone
 from .voice_clone_detection_production import VoiceCloneDetectionProduction
+from .inference_pool import InferencePool
 from .models import VoiceDetectionLog
+from .pagination import InvalidCursor, page_params, paginate_keyset
 import logging
 
 # Setup logging
@@ -72,8 +73,33 @@ class VoiceCloneDetectionService:
     """
     
     def __init__(self):
-        self.detector = VoiceCloneDetectionProduction()
+        # VOICE_FEATURE_PROFILE selects the 'full' or 'fast' model bundle
+        feature_profile = getattr(settings, 'VOICE_FEATURE_PROFILE', None)
+        detector_options = {
+            'cache_size': getattr(settings, 'VOICE_RESULT_CACHE_SIZE', 256),
+            'canary_min_accuracy': getattr(settings, 'VOICE_CANARY_MIN_ACCURACY', 0.8),
+            'cascade_threshold': getattr(settings, 'VOICE_CASCADE_THRESHOLD', None),
+            'cascade_order': getattr(settings, 'VOICE_CASCADE_ORDER', None)
+        }
+        self.detector = VoiceCloneDetectionProduction(feature_profile=feature_profile, **detector_options)
         self.is_initialized = False
+        
+        # Retrained models are swapped in without a restart; 0 disables watching
+        reload_interval = getattr(settings, 'VOICE_MODEL_RELOAD_INTERVAL', 0)
+        if reload_interval:
+            self.detector.start_model_watcher(reload_interval)
+        
+        # Analyses run in worker processes with preloaded models unless disabled
+        num_workers = getattr(settings, 'VOICE_INFERENCE_WORKERS', 0)
+        self.inference_timeout = getattr(settings, 'VOICE_INFERENCE_TIMEOUT', 300)
+        self.pool = InferencePool(
+            num_workers=num_workers,
+            models_dir=self.detector.models_dir,
+            feature_profile=feature_profile,
+            reload_interval=reload_interval,
+            detector_options=detector_options
+        ) if num_workers else None
+        
         self._initialize_detector()
     
     def _initialize_detector(self):
@@ -107,8 +133,6 @@ class VoiceCloneDetectionService:
         Returns:
             Analysis results dictionary
         """
-        temp_file_path = None
-        
         try:
             # Validate file
             if not self._validate_audio_file(uploaded_file):
@@ -118,11 +142,8 @@ class VoiceCloneDetectionService:
                     'classification': {'result': 'error', 'confidence_score': 0.0}
                 }
             
-            # Save uploaded file to temporary location
-            temp_file_path = self._save_temp_file(uploaded_file)
-            
             # Analyze the audio file using trained models
-            analysis_results = self.detector.predict_file(temp_file_path)
+            analysis_results = self._run_detection(uploaded_file)
             
             # Convert numpy types to ensure JSON serializability
             analysis_results = convert_numpy_types(analysis_results)
@@ -139,8 +160,7 @@ class VoiceCloneDetectionService:
                 self._save_to_database(
                     uploaded_file, 
                     analysis_results, 
-                    user_profile,
-                    temp_file_path
+                    user_profile
                 )
             
             # Add success flag
@@ -161,14 +181,26 @@ class VoiceCloneDetectionService:
                     'confidence_score': 0.0
                 }
             }
+    
+    def _run_detection(self, uploaded_file: UploadedFile) -> Dict[str, Any]:
+        """
+        Run the detector on an upload, in the inference pool when enabled
+        """
+        format_hint = Path(uploaded_file.name).suffix.lower()
         
-        finally:
-            # Clean up temporary file
-            if temp_file_path and os.path.exists(temp_file_path):
-                try:
-                    os.unlink(temp_file_path)
-                except:
-                    pass
+        # Large uploads are already spooled to disk by Django; small ones are
+        # decoded from memory (as bytes when they have to cross to a worker)
+        if hasattr(uploaded_file, 'temporary_file_path'):
+            source = uploaded_file.temporary_file_path()
+        elif self.pool is not None:
+            source = uploaded_file.read()
+            uploaded_file.seek(0)
+        else:
+            source = uploaded_file
+        
+        if self.pool is not None:
+            return self.pool.analyze(source, format_hint, timeout=self.inference_timeout)
+        return self.detector.predict_file(source, format_hint=format_hint)
     
     def _validate_audio_file(self, uploaded_file: UploadedFile) -> bool:
         """
@@ -184,58 +216,91 @@ class VoiceCloneDetectionService:
         
         return file_extension in allowed_extensions
     
-    def _save_temp_file(self, uploaded_file: UploadedFile) -> str:
+    def analyze_path(self, audio_path: str, format_hint: Optional[str] = None,
+                     streaming: Optional[bool] = None) -> Dict[str, Any]:
         """
-        Save uploaded file to temporary location
+        Run the detector on an audio file on disk, in the inference pool when enabled
+        
+        Recordings longer than the detector's single-clip window are analyzed
+        in streaming mode (whole recording, per-window timeline) unless
+        streaming is given explicitly.
         """
-        # Create temporary file
-        suffix = Path(uploaded_file.name).suffix.lower()
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+        if streaming is None:
+            try:
+                extractor = self.detector.feature_extractor
+                streaming = extractor.get_duration(audio_path) > extractor.MAX_DURATION
+            except Exception as e:
+                logger.warning(f"Could not read duration of {audio_path}: {str(e)}")
+                streaming = False
         
-        # Write uploaded file content
-        for chunk in uploaded_file.chunks():
-            temp_file.write(chunk)
+        if self.pool is not None:
+            # Long recordings take as long as they take; callers of streaming
+            # analyses are background jobs
+            timeout = None if streaming else self.inference_timeout
+            return self.pool.analyze(audio_path, format_hint, timeout=timeout, streaming=streaming)
+        if streaming:
+            return self.detector.predict_stream(audio_path, format_hint=format_hint)
+        return self.detector.predict_file(audio_path, format_hint=format_hint)
+    
+    async def analyze_features_async(self, features: np.ndarray, feature_schema: str,
+                                     audio_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Score a precomputed feature vector from async code (live streams), in the inference pool when enabled
+        """
+        if self.pool is not None:
+            return await self.pool.analyze_features_async(features, feature_schema, audio_info)
+        return await asyncio.to_thread(self.detector.predict_features, features, feature_schema, audio_info)
+    
+    @staticmethod
+    def result_fields(results: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Map analysis results onto VoiceDetectionLog fields
+        """
+        # Convert numpy types to Python native types
+        clean_results = convert_numpy_types(results)
+        
+        # Extract classification results
+        classification = clean_results.get('classification', {})
+        result = classification.get('result', 'unknown')
+        confidence_score = float(classification.get('confidence', 0.0))
+        
+        # Prepare analysis details
+        analysis_details = {
+            'classification': classification,
+            'model_predictions': clean_results.get('model_predictions', {}),
+            'ensemble_result': clean_results.get('ensemble_result', {}),
+            'feature_analysis': clean_results.get('feature_analysis', {}),
+            'audio_info': clean_results.get('audio_info', {}),
+            'processing_info': clean_results.get('processing_info', {})
+        }
+        if 'timeline' in clean_results:
+            analysis_details['timeline'] = clean_results['timeline']
         
-        temp_file.close()
-        return temp_file.name
+        return {
+            'result': result,
+            'confidence_score': confidence_score / 100.0,  # Convert to 0-1 range
+            'analysis_details': analysis_details,  # Model handles JSON serialization
+            'detected_language': 'Unknown',  # Our model doesn't detect language yet
+            'language_confidence': 0.0,
+            'language_analysis': {},
+            'audio_duration': float(clean_results.get('audio_info', {}).get('duration', 0.0)),
+            'processing_time': float(clean_results.get('processing_info', {}).get('processing_time', 0.0)),
+            'is_cloned': (result in ['fake', 'cloned'])
+        }
     
     def _save_to_database(self, uploaded_file: UploadedFile, results: Dict[str, Any], 
-                         user_profile, temp_file_path: str):
+                         user_profile):
         """
         Save analysis results to database
         """
         try:
-            # Convert numpy types to Python native types
-            clean_results = convert_numpy_types(results)
-            
-            # Extract classification results
-            classification = clean_results.get('classification', {})
-            result = classification.get('result', 'unknown')
-            confidence_score = float(classification.get('confidence', 0.0))
-            
-            # Prepare analysis details
-            analysis_details = {
-                'model_predictions': clean_results.get('model_predictions', {}),
-                'ensemble_result': clean_results.get('ensemble_result', {}),
-                'feature_analysis': clean_results.get('feature_analysis', {}),
-                'audio_info': clean_results.get('audio_info', {}),
-                'processing_info': clean_results.get('processing_info', {})
-            }
-            
             # Create VoiceDetectionLog entry
             voice_log = VoiceDetectionLog.objects.create(
                 user=user_profile.user,  # Use user instead of user_profile
                 audio_file=uploaded_file,
-                result=result,
-                confidence_score=confidence_score / 100.0,  # Convert to 0-1 range
-                analysis_details=analysis_details,  # Model handles JSON serialization
-                detected_language='Unknown',  # Our model doesn't detect language yet
-                language_confidence=0.0,
-                language_analysis={},
-                audio_duration=float(clean_results.get('audio_info', {}).get('duration', 0.0)),
-                processing_time=float(clean_results.get('processing_info', {}).get('processing_time', 0.0)),
                 status='completed',
-                is_cloned=(result in ['fake', 'cloned'])
+                completed_at=timezone.now(),
+                **self.result_fields(results)
             )
             
             logger.info(f"Voice detection log saved with ID: {voice_log.id}")
@@ -251,8 +316,9 @@ class VoiceAnalysisAPI:
     API endpoints for voice analysis
     """
     
-    def __init__(self):
-        self.service = VoiceCloneDetectionService()
+    def __init__(self, service: Optional[VoiceCloneDetectionService] = None):
+        # One service (inference pool, model watcher, cache) per process
+        self.service = service or voice_detection_service
     
     def upload_and_analyze(self, request, user_profile=None) -> JsonResponse:
         """
@@ -285,14 +351,14 @@ class VoiceAnalysisAPI:
         Get voice detection history for user
         """
         try:
-            # Get recent detections
-            logs = VoiceDetectionLog.objects.filter(
-                user=user_profile.user
-            ).order_by('-created_at')[:20]
+            # Get one page of detections, newest first
+            cursor, limit, with_total = page_params(request, default_size=20)
+            page = paginate_keyset(VoiceDetectionLog.objects.filter(user=user_profile.user), 'created_at',
+                                   cursor, limit, with_total)
             
             # Format results
             history = []
-            for log in logs:
+            for log in page:
                 try:
                     analysis_details = json.loads(log.analysis_details) if isinstance(log.analysis_details, str) else log.analysis_details
                 except:
@@ -312,9 +378,11 @@ class VoiceAnalysisAPI:
             return JsonResponse({
                 'success': True,
                 'history': history,
-                'total_count': len(history)
+                **page.as_json()
             })
             
+        except InvalidCursor as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
         except Exception as e:
             logger.error(f"Error retrieving detection history: {str(e)}")
             return JsonResponse({
@@ -334,7 +402,11 @@ class VoiceAnalysisAPI:
                     'models_loaded': self.service.detector.models_available(),
                     'supported_formats': ['WAV', 'MP3', 'M4A', 'OGG', 'FLAC', 'AAC'],
                     'max_file_size_mb': 50,
-                    'processing_timeout_seconds': 300,
+                    'processing_timeout_seconds': self.service.inference_timeout,
+                    'inference_workers': self.service.pool.num_workers if self.service.pool else 0,
+                    'result_cache': self.service.detector.result_cache.get_stats(),
+                    'model_version': self.service.detector.model_version,
+                    'feature_schema': self.service.detector.feature_extractor.schema_id,
                     'version': '4.0',
                     'tech_stack': 'XGBoost + Random Forest + SVM + LibROSA Features'
                 },
@@ -365,7 +437,7 @@ class VoiceAnalysisAPI:
 
 # Global service instance
 voice_detection_service = VoiceCloneDetectionService()
-voice_analysis_api = VoiceAnalysisAPI()
+voice_analysis_api = VoiceAnalysisAPI(voice_detection_service)
 
 
 def analyze_voice_file(audio_file_path: str, user_profile=None) -> Dict[str, Any]:
@@ -385,7 +457,7 @@ def analyze_voice_file(audio_file_path: str, user_profile=None) -> Dict[str, Any
             voice_detection_service._initialize_detector()
         
         # Analyze the file using trained models
-        results = voice_detection_service.detector.predict_file(audio_file_path)
+        results = voice_detection_service.analyze_path(audio_file_path)
         results['success'] = True
         
         return results
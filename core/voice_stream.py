@@ -0,0 +1,317 @@
+"""
+Live Voice Clone Scoring over WebSocket
+=======================================
+
+ASGI WebSocket endpoint (``/ws/voice-stream/``) for scoring a voice while
+it is being recorded. The browser recorder opens the socket, sends a JSON
+``start`` message with its sample rate and then streams mono PCM as binary
+frames of little-endian float32 samples. About once a second the server
+scores the most recent few seconds of audio and pushes the clone
+probability of that window together with the running average for the
+whole session.
+
+Each connection keeps a rolling feature state: incoming audio is resampled
+as a stream and fed to a windowed StreamingFeatureAccumulator, so every
+update computes the frame features (MFCC, spectral, chroma, RMS, ...) of
+the new audio only and merges per-second running statistics for the
+window. Harmonic/percussive ratios, tempo and tonnetz have no running form
+and are recomputed over the window's audio on each update. Only the
+feature vector is sent to the models, and memory per connection stays
+constant however long the call runs.
+
+Messages from the server:
+    {"type": "ready", "window_seconds": 4.0, "update_seconds": 1.0}
+    {"type": "score", "time": 12.0, "fake_probability": 8.1,
+     "running_fake_probability": 11.4, "result": "real", ...}
+    {"type": "summary", ...}  (after the client sends {"type": "stop"})
+    {"type": "error", "message": "..."}
+
+Author: SAP GHOST AI Team
+Version: 1.0
+"""
+
+import json
+import asyncio
+import logging
+from http.cookies import SimpleCookie
+from importlib import import_module
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+import numpy as np
+import soxr
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .feature_accumulators import StreamingFeatureAccumulator
+from .voice_features import DEFAULT_PROFILE, feature_schema_id
+
+logger = logging.getLogger(__name__)
+
+STREAM_PATH = '/ws/voice-stream/'
+
+# Accepted browser capture rates
+MIN_SAMPLE_RATE = 8000
+MAX_SAMPLE_RATE = 96000
+
+# Windows whose peak stays below this are silence and not scored
+SILENCE_PEAK = 1e-3
+
+# Close codes sent before accepting the connection
+CLOSE_FORBIDDEN_ORIGIN = 4403
+CLOSE_UNAUTHENTICATED = 4401
+
+
+class LiveVoiceScorer:
+    """
+    Rolling feature state and running score of one live session
+    """
+
+    def __init__(self, sample_rate: int, target_sr: int = 22050, profile: str = DEFAULT_PROFILE,
+                 window_seconds: float = 4.0, update_seconds: float = 1.0):
+        self.sample_rate = sample_rate
+        self.window_seconds = window_seconds
+        self.update_seconds = update_seconds
+        self._update_size = int(update_seconds * sample_rate)
+        self._since_update = 0
+        # Received audio not yet fed to the accumulator
+        self._incoming = []
+
+        # Resampled as one stream, so chunk boundaries leave no artifacts
+        self._resampler = (soxr.ResampleStream(sample_rate, target_sr, 1, dtype='float32', quality='HQ')
+                           if sample_rate != target_sr else None)
+        self.accumulator = StreamingFeatureAccumulator(target_sr=target_sr, profile=profile,
+                                                       window_seconds=window_seconds,
+                                                       block_seconds=update_seconds, normalize=True)
+        self.feature_schema = feature_schema_id(profile, target_sr)
+
+        self.samples_received = 0
+        self.updates = 0
+        self.fake_updates = 0
+        self.running_fake_probability = 0.0
+
+    @property
+    def seconds_received(self) -> float:
+        return self.samples_received / self.sample_rate
+
+    def add_frames(self, pcm: np.ndarray) -> bool:
+        """
+        Queue received samples for the next update
+
+        Returns:
+            True when enough new audio has arrived for another update
+        """
+        self._incoming.append(pcm)
+        self.samples_received += len(pcm)
+        self._since_update += len(pcm)
+        return self._since_update >= self._update_size
+
+    def take_incoming(self) -> np.ndarray:
+        """The audio received since the last update; resets the update counter"""
+        self._since_update = 0
+        incoming, self._incoming = self._incoming, []
+        return np.concatenate(incoming) if incoming else np.zeros(0, dtype=np.float32)
+
+    def window_features(self, pcm: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Fold new audio into the feature state and return the window's
+        feature vector, or None while the window is silent
+
+        Not thread-safe; the session runs one update at a time.
+        """
+        if self._resampler is not None:
+            pcm = self._resampler.resample_chunk(np.asarray(pcm, dtype=np.float32))
+        self.accumulator.update(pcm)
+        if self.accumulator.samples == 0 or self.accumulator.peak < SILENCE_PEAK:
+            return None
+        return self.accumulator.vector()
+
+    def record(self, fake_probability: float, result: str) -> float:
+        """Fold one window's score into the running average and return it"""
+        self.updates += 1
+        if result == 'fake':
+            self.fake_updates += 1
+        self.running_fake_probability += (fake_probability - self.running_fake_probability) / self.updates
+        return self.running_fake_probability
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'type': 'summary',
+            'duration': round(self.seconds_received, 2),
+            'updates': self.updates,
+            'fake_updates': self.fake_updates,
+            'running_fake_probability': self.running_fake_probability,
+            'result': 'fake' if self.running_fake_probability >= 50 else 'real'
+        }
+
+
+def _header(scope: Dict[str, Any], name: bytes) -> Optional[str]:
+    for key, value in scope.get('headers', []):
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+def _origin_allowed(scope: Dict[str, Any]) -> bool:
+    """Same-origin or CSRF-trusted origins only, so other sites cannot use a visitor's session"""
+    origin = _header(scope, b'origin')
+    if origin is None:
+        return True  # Not a browser
+    if origin in getattr(settings, 'CSRF_TRUSTED_ORIGINS', []):
+        return True
+    return urlparse(origin).netloc == _header(scope, b'host')
+
+
+@sync_to_async
+def _session_user_id(scope: Dict[str, Any]) -> Optional[int]:
+    """Resolve the logged-in user from the Django session cookie"""
+    from django.contrib.auth import SESSION_KEY, HASH_SESSION_KEY, get_user_model
+    from django.utils.crypto import constant_time_compare
+
+    cookie_header = _header(scope, b'cookie')
+    if not cookie_header:
+        return None
+    cookies = SimpleCookie()
+    cookies.load(cookie_header)
+    session_cookie = cookies.get(settings.SESSION_COOKIE_NAME)
+    if session_cookie is None:
+        return None
+
+    session = import_module(settings.SESSION_ENGINE).SessionStore(session_cookie.value)
+    user_id = session.get(SESSION_KEY)
+    if user_id is None:
+        return None
+
+    user = get_user_model().objects.filter(pk=user_id, is_active=True).first()
+    if user is None:
+        return None
+    # Same check as django.contrib.auth.get_user: sessions die with a password change
+    session_hash = session.get(HASH_SESSION_KEY)
+    if not session_hash or not constant_time_compare(session_hash, user.get_session_auth_hash()):
+        return None
+    return user.pk
+
+
+async def _send_json(send, payload: Dict[str, Any]):
+    await send({'type': 'websocket.send', 'text': json.dumps(payload)})
+
+
+async def _score_window(scorer: LiveVoiceScorer, send):
+    """Update the feature state with the new audio, score the window and push the result to the client"""
+    from .voice_integration import voice_detection_service
+
+    window_end = scorer.seconds_received
+    try:
+        features = await asyncio.to_thread(scorer.window_features, scorer.take_incoming())
+        if features is not None:
+            results = await voice_detection_service.analyze_features_async(
+                features, scorer.feature_schema, {'source': 'live_stream', 'window_end': round(window_end, 2)}
+            )
+    except Exception as e:
+        logger.error(f"Live voice scoring failed: {str(e)}")
+        await _send_json(send, {'type': 'error', 'message': 'Scoring failed'})
+        return
+
+    if features is None:
+        # A window of silence; nothing to report yet
+        await _send_json(send, {'type': 'score', 'time': round(window_end, 2), 'result': 'silent',
+                                'running_fake_probability': scorer.running_fake_probability})
+        return
+
+    if not results.get('success', False):
+        logger.error(f"Live voice scoring failed: {results.get('error')}")
+        await _send_json(send, {'type': 'error', 'message': 'Scoring failed'})
+        return
+
+    classification = results.get('classification', {})
+    fake_probability = float(classification.get('fake_probability', 0.0))
+    result = classification.get('result', 'unknown')
+    running = scorer.record(fake_probability, result)
+
+    await _send_json(send, {
+        'type': 'score',
+        'time': round(window_end, 2),
+        'result': result,
+        'fake_probability': fake_probability,
+        'confidence': float(classification.get('confidence', 0.0)),
+        'running_fake_probability': running,
+        'models_run': list(results.get('model_predictions', {}).keys())
+    })
+
+
+async def voice_stream_application(scope, receive, send):
+    """ASGI application for one live scoring WebSocket"""
+    from .voice_integration import voice_detection_service
+
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+
+    if not _origin_allowed(scope):
+        await send({'type': 'websocket.close', 'code': CLOSE_FORBIDDEN_ORIGIN})
+        return
+    if await _session_user_id(scope) is None:
+        await send({'type': 'websocket.close', 'code': CLOSE_UNAUTHENTICATED})
+        return
+
+    await send({'type': 'websocket.accept'})
+
+    window_seconds = getattr(settings, 'VOICE_STREAM_WINDOW_SECONDS', 4.0)
+    update_seconds = getattr(settings, 'VOICE_STREAM_UPDATE_SECONDS', 1.0)
+    scorer = None
+    pending = None
+
+    try:
+        while True:
+            message = await receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+
+            if message.get('text') is not None:
+                try:
+                    command = json.loads(message['text'])
+                except ValueError:
+                    await _send_json(send, {'type': 'error', 'message': 'Invalid JSON'})
+                    continue
+
+                if command.get('type') == 'start':
+                    try:
+                        sample_rate = int(command.get('sample_rate', 0))
+                    except (TypeError, ValueError):
+                        sample_rate = 0
+                    if not MIN_SAMPLE_RATE <= sample_rate <= MAX_SAMPLE_RATE:
+                        await _send_json(send, {'type': 'error', 'message': 'Unsupported sample rate'})
+                        continue
+                    # Features are computed here with the detector's profile and sample rate
+                    extractor = voice_detection_service.detector.feature_extractor
+                    scorer = LiveVoiceScorer(sample_rate, extractor.target_sr, extractor.profile,
+                                             window_seconds, update_seconds)
+                    await _send_json(send, {'type': 'ready', 'window_seconds': window_seconds,
+                                            'update_seconds': update_seconds})
+
+                elif command.get('type') == 'stop':
+                    if pending is not None:
+                        await pending
+                    if scorer is not None:
+                        await _send_json(send, scorer.summary())
+                    await send({'type': 'websocket.close', 'code': 1000})
+                    break
+
+            elif message.get('bytes') is not None:
+                if scorer is None:
+                    await _send_json(send, {'type': 'error', 'message': 'Send a start message first'})
+                    continue
+                if len(message['bytes']) % 4:
+                    await _send_json(send, {'type': 'error', 'message': 'Invalid audio frame'})
+                    continue
+                pcm = np.frombuffer(message['bytes'], dtype='<f4')
+                if not np.isfinite(pcm).all():
+                    # NaN or infinity would poison the running statistics of the whole window
+                    await _send_json(send, {'type': 'error', 'message': 'Invalid audio frame'})
+                    continue
+                # Skip an update rather than queue one while the previous is still scoring
+                if scorer.add_frames(pcm) and (pending is None or pending.done()):
+                    pending = asyncio.create_task(_score_window(scorer, send))
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
@@ -10,15 +10,18 @@ Version: 3.0
 """
 
 import os
+import copy
 import json
+import time
 import pickle
 import hashlib
 import tempfile
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from django.conf import settings
-from django.core.cache import cache
 from django.utils import timezone
 import numpy as np
 
@@ -26,63 +29,123 @@ logger = logging.getLogger(__name__)
 
 class ModelCache:
     """
-    Caching system for model predictions and features
+    In-process LRU cache for model predictions and features
+
+    Entries are content-addressed by a hash of the decoded PCM samples.
+    Results are additionally keyed by the model-bundle version, so loading
+    a new model set invalidates every cached verdict while features (which
+    only depend on the audio) stay valid.
     """
     
-    def __init__(self, cache_ttl: int = 3600):  # 1 hour cache
+    def __init__(self, max_entries: int = 256, cache_ttl: int = 3600):  # 1 hour cache
+        self.max_entries = max_entries
         self.cache_ttl = cache_ttl
-        self.prefix = "voice_detection_"
+        self.model_version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
     
-    def _get_audio_hash(self, audio_data: np.ndarray) -> str:
+    @staticmethod
+    def get_audio_hash(audio_data: np.ndarray) -> str:
         """
-        Generate hash for audio data
+        Generate a content hash for decoded audio samples
         """
-        return hashlib.md5(audio_data.tobytes()).hexdigest()
+        audio_data = np.ascontiguousarray(audio_data)
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{audio_data.dtype.str}{audio_data.shape}".encode())
+        digest.update(audio_data.tobytes())
+        return digest.hexdigest()
+    
+    def set_model_version(self, model_version: Optional[str]):
+        """
+        Switch to a new model bundle, dropping results cached for the old one
+        """
+        with self._lock:
+            if model_version == self.model_version:
+                return
+            self.model_version = model_version
+            stale = [key for key in self._entries if key[0] == 'result']
+            for key in stale:
+                del self._entries[key]
+            self._stats['invalidations'] += 1
+        if stale:
+            logger.info(f"Invalidated {len(stale)} cached voice results for model version {model_version}")
+    
+    def _get(self, key: tuple) -> Optional[Any]:
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.cache_ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[1]
     
-    def get_cached_result(self, audio_hash: str) -> Optional[Dict[str, Any]]:
+    def _set(self, key: tuple, value: Any):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+    
+    def get_cached_result(self, audio_hash: str, model_version: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
-        Get cached analysis result
+        Get cached analysis result for a model version (default: the current one)
         """
-        try:
-            cache_key = f"{self.prefix}result_{audio_hash}"
-            return cache.get(cache_key)
-        except Exception as e:
-            logger.warning(f"Cache get failed: {e}")
-            return None
+        result = self._get(('result', model_version or self.model_version, audio_hash))
+        return copy.deepcopy(result) if result is not None else None
     
-    def cache_result(self, audio_hash: str, result: Dict[str, Any]):
+    def cache_result(self, audio_hash: str, result: Dict[str, Any], model_version: Optional[str] = None):
         """
-        Cache analysis result
+        Cache analysis result for a model version (default: the current one)
         """
-        try:
-            cache_key = f"{self.prefix}result_{audio_hash}"
-            cache.set(cache_key, result, self.cache_ttl)
-        except Exception as e:
-            logger.warning(f"Cache set failed: {e}")
+        model_version = model_version or self.model_version
+        if model_version != self.model_version:
+            # Finished on a model set that has since been replaced
+            return
+        self._set(('result', model_version, audio_hash), copy.deepcopy(result))
     
     def get_cached_features(self, audio_hash: str) -> Optional[np.ndarray]:
         """
         Get cached feature vector
         """
-        try:
-            cache_key = f"{self.prefix}features_{audio_hash}"
-            cached_data = cache.get(cache_key)
-            if cached_data:
-                return np.frombuffer(cached_data, dtype=np.float32)
-            return None
-        except Exception as e:
-            logger.warning(f"Feature cache get failed: {e}")
-            return None
+        features = self._get(('features', audio_hash))
+        return features.copy() if features is not None else None
     
     def cache_features(self, audio_hash: str, features: np.ndarray):
         """
         Cache feature vector
         """
-        try:
-            cache_key = f"{self.prefix}features_{audio_hash}"
-            cache.set(cache_key, features.tobytes(), self.cache_ttl)
-        except Exception as e:
-            logger.warning(f"Feature cache set failed: {e}")
+        self._set(('features', audio_hash), np.array(features, copy=True))
+    
+    def clear(self):
+        """
+        Drop every cached entry
+        """
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache size and hit/miss counters
+        """
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'model_version': self.model_version,
+                'hit_rate': (self._stats['hits'] / lookups * 100) if lookups else 0.0,
+                **self._stats
+            }
 
 
 class SystemHealthMonitor:
@@ -222,20 +285,23 @@ class AudioFileHandler:
 
 class FeaturePipeline:
     """
-    Advanced feature extraction pipeline with error handling
+    Cached feature extraction through the shared feature library
     """
     
-    def __init__(self):
+    def __init__(self, target_sr: int = 22050, profile: Optional[str] = None):
+        from .voice_features import FeatureExtractor, DEFAULT_PROFILE
+        
         self.feature_cache = ModelCache()
+        self.extractor = FeatureExtractor(target_sr=target_sr, profile=profile or DEFAULT_PROFILE)
     
     def extract_robust_features(self, audio: np.ndarray, sr: int) -> Dict[str, np.ndarray]:
         """
-        Extract features with robust error handling
+        Extract the model feature vector of raw audio, with robust error handling
         """
-        features = {}
+        from .voice_features import NUM_FEATURES
         
-        # Generate audio hash for caching
-        audio_hash = hashlib.md5(audio.tobytes()).hexdigest()
+        # Features depend on the audio, its sample rate and the feature schema
+        audio_hash = f"{self.extractor.schema_id}:{sr}:{self.feature_cache.get_audio_hash(audio)}"
         
         # Check cache first
         cached_features = self.feature_cache.get_cached_features(audio_hash)
@@ -243,124 +309,13 @@ class FeaturePipeline:
             logger.info("Using cached features")
             return {'combined': cached_features}
         
-        try:
-            # Extract MFCC features
-            features['mfcc'] = self._extract_mfcc_safe(audio, sr)
-            
-            # Extract spectral features
-            features['spectral'] = self._extract_spectral_safe(audio, sr)
-            
-            # Extract temporal features
-            features['temporal'] = self._extract_temporal_safe(audio, sr)
-            
-            # Combine all features
-            feature_list = []
-            for feat_type, feat_values in features.items():
-                if feat_values is not None and len(feat_values) > 0:
-                    feature_list.append(feat_values)
-            
-            if feature_list:
-                combined_features = np.concatenate(feature_list)
-                features['combined'] = combined_features
-                
-                # Cache the combined features
-                self.feature_cache.cache_features(audio_hash, combined_features)
-            else:
-                # Return zero features if all extractions failed
-                features['combined'] = np.zeros(500)  # Default feature size
-            
-            return features
-            
-        except Exception as e:
-            logger.error(f"Feature extraction failed: {e}")
-            return {'combined': np.zeros(500)}
-    
-    def _extract_mfcc_safe(self, audio: np.ndarray, sr: int) -> Optional[np.ndarray]:
-        """
-        Safely extract MFCC features
-        """
-        try:
-            import librosa
-            
-            # Extract MFCC features
-            mfcc = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=13)
-            
-            # Statistical features
-            stats = np.array([
-                np.mean(mfcc, axis=1),
-                np.std(mfcc, axis=1),
-                np.min(mfcc, axis=1),
-                np.max(mfcc, axis=1)
-            ]).flatten()
-            
-            return stats
-            
-        except Exception as e:
-            logger.warning(f"MFCC extraction failed: {e}")
-            return np.zeros(52)  # 13 * 4 statistics
-    
-    def _extract_spectral_safe(self, audio: np.ndarray, sr: int) -> Optional[np.ndarray]:
-        """
-        Safely extract spectral features
-        """
-        try:
-            import librosa
-            
-            features = []
-            
-            # Spectral centroid
-            centroid = librosa.feature.spectral_centroid(y=audio, sr=sr)
-            features.extend([np.mean(centroid), np.std(centroid)])
-            
-            # Spectral rolloff
-            rolloff = librosa.feature.spectral_rolloff(y=audio, sr=sr)
-            features.extend([np.mean(rolloff), np.std(rolloff)])
-            
-            # Zero crossing rate
-            zcr = librosa.feature.zero_crossing_rate(audio)
-            features.extend([np.mean(zcr), np.std(zcr)])
-            
-            # Spectral bandwidth
-            bandwidth = librosa.feature.spectral_bandwidth(y=audio, sr=sr)
-            features.extend([np.mean(bandwidth), np.std(bandwidth)])
-            
-            # Chroma features
-            chroma = librosa.feature.chroma_stft(y=audio, sr=sr)
-            features.extend([np.mean(chroma), np.std(chroma)])
-            
-            return np.array(features)
-            
-        except Exception as e:
-            logger.warning(f"Spectral feature extraction failed: {e}")
-            return np.zeros(10)
-    
-    def _extract_temporal_safe(self, audio: np.ndarray, sr: int) -> Optional[np.ndarray]:
-        """
-        Safely extract temporal features
-        """
-        try:
-            import librosa
-            
-            features = []
-            
-            # Tempo
-            tempo, _ = librosa.beat.beat_track(y=audio, sr=sr)
-            features.append(tempo)
-            
-            # RMS energy
-            rms = librosa.feature.rms(y=audio)
-            features.extend([np.mean(rms), np.std(rms)])
-            
-            # Spectral flux
-            stft = librosa.stft(audio)
-            spectral_flux = np.sum(np.diff(np.abs(stft), axis=1)**2, axis=0)
-            features.extend([np.mean(spectral_flux), np.std(spectral_flux)])
-            
-            return np.array(features)
-            
-        except Exception as e:
-            logger.warning(f"Temporal feature extraction failed: {e}")
-            return np.zeros(5)
+        features = self.extractor.features_from_audio(audio, sr)
+        if features is None:
+            logger.error("Feature extraction failed")
+            return {'combined': np.zeros(NUM_FEATURES, dtype=np.float32)}
+        
+        self.feature_cache.cache_features(audio_hash, features)
+        return {'combined': features}
 
 
 class ResultFormatter:
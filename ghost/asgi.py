@@ -2,6 +2,8 @@
 ASGI config for ghost project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP requests go to Django; the live voice scoring WebSocket is served by
+core.voice_stream.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -13,4 +15,18 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ghost.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up
+from core.voice_stream import STREAM_PATH, voice_stream_application  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "websocket":
+        if scope["path"] == STREAM_PATH:
+            return await voice_stream_application(scope, receive, send)
+        # No other WebSocket routes
+        await receive()
+        await send({"type": "websocket.close", "code": 4404})
+        return
+    return await django_application(scope, receive, send)
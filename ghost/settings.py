@@ -130,6 +130,9 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Rendered reports (core.report_jobs); not served under MEDIA_URL
+REPORT_ARTIFACT_ROOT = BASE_DIR / "report_artifacts"
+
 
 # Auth settings
 LOGIN_URL = 'login'
@@ -177,6 +180,24 @@ CSRF_COOKIE_SECURE = True
 CSRF_COOKIE_HTTPONLY = True
 CSRF_TRUSTED_ORIGINS = ['http://localhost:8000', 'http://127.0.0.1:8000']
 
+# Voice clone detection
+# Worker processes (per web server process) that run voice analysis with
+# preloaded models; 0 runs analysis inside the request thread instead
+VOICE_INFERENCE_WORKERS = 2
+VOICE_INFERENCE_TIMEOUT = 300  # seconds to wait for a worker's result
+VOICE_FEATURE_PROFILE = 'full'  # 'full' or 'fast' model bundle
+VOICE_RESULT_CACHE_SIZE = 256  # cached verdicts per process; 0 disables
+VOICE_MODEL_RELOAD_INTERVAL = 30  # seconds between checks for retrained models; 0 disables
+VOICE_CANARY_MIN_ACCURACY = 0.8  # new models must reach this on trained_models/canary_set.npz
+# Early-exit ensemble: stop at the first model (best model first, or the
+# names in VOICE_CASCADE_ORDER) whose top class probability reaches the
+# threshold; None always runs every model
+VOICE_CASCADE_THRESHOLD = 0.95
+VOICE_CASCADE_ORDER = None
+# Live scoring WebSocket (/ws/voice-stream/, needs an ASGI server)
+VOICE_STREAM_WINDOW_SECONDS = 4.0  # audio scored per update
+VOICE_STREAM_UPDATE_SECONDS = 1.0  # new audio between updates
+
 APPEND_SLASH = False  # This will prevent Django from automatically adding trailing slashes
 
 # Default primary key field type
@@ -39,6 +39,7 @@ urlpatterns = [
     path('history/', views.history, name='history'),
     path('export/history/pdf/', views.export_history_pdf, name='export_history_pdf'),
     path('export/history/excel/', views.export_history_excel, name='export_history_excel'),
+    path('export/history/csv/', views.export_history_csv, name='export_history_csv'),
     # API endpoints
     path('api/log-detection/', views.api_log_detection, name='api_log_detection'),
     path('api/detection/<uuid:request_id>/', views.api_get_detection_details, name='api_get_detection_details'),
@@ -56,6 +57,8 @@ urlpatterns = [
     # Voice authentication endpoints
     path('api/upload-voice-data/', views.upload_voice_data, name='upload_voice_data'),
     path('api/analyze-voice-data/', views.analyze_voice_data, name='analyze_voice_data'),
+    path('api/voice-jobs/', views.submit_voice_analysis, name='submit_voice_analysis'),
+    path('api/voice-jobs/<int:job_id>/', views.voice_analysis_status, name='voice_analysis_status'),
     path('api/voice-history/', views.get_voice_history, name='get_voice_history'),
     path('api/voice-system-status/', views.voice_system_status, name='voice_system_status'),
     path('api/voice-detection-history/', views.voice_detection_history, name='voice_detection_history'),
@@ -85,4 +88,6 @@ urlpatterns = [
     path('api/report/download/<int:log_id>/<str:report_type>/', views.download_analysis_report, name='download_analysis_report'),
     path('api/report/download/latest/voice/', views.download_latest_voice_report, name='download_latest_voice_report'),
     path('api/report/bulk/<str:report_type>/', views.generate_bulk_report, name='generate_bulk_report'),
+    path('api/report/status/<str:key>/', views.report_status, name='report_status'),
+    path('api/report/file/<str:key>/', views.download_report_file, name='download_report_file'),
 ] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT) + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -6,18 +6,16 @@ Bypasses HuggingFace audio decoder issues by processing raw audio data
 
 import os
 import sys
+import argparse
 import numpy as np
 import pandas as pd
 import librosa
 import soundfile as sf
 from pathlib import Path
-from typing import List, Tuple, Optional, Dict, Any
-import json
+from typing import List, Tuple, Optional, Dict, Any, Iterator
 import pickle
-import joblib
 from datetime import datetime
 import warnings
-from tqdm import tqdm
 import pyarrow as pa
 import pyarrow.parquet as pq
 
@@ -26,9 +24,16 @@ from sklearn.model_selection import train_test_split, cross_val_score, Stratifie
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.svm import SVC
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, roc_auc_score
+from sklearn.metrics import classification_report, confusion_matrix
 import xgboost as xgb
 
+from core.voice_features import FeatureExtractor, FEATURE_PROFILES, DEFAULT_PROFILE
+from core.parallel_features import ParallelFeatureExtractor
+from core.model_training import ModelTrainer, model_report
+from core.feature_store import FeatureStore, extract_with_store, DEFAULT_STORE_DIR
+from core.synthetic_voices import SyntheticVoiceGenerator
+from core.model_bundle import save_bundle, BUNDLE_FILENAME
+
 warnings.filterwarnings('ignore', category=UserWarning)
 warnings.filterwarnings('ignore', category=FutureWarning)
 
@@ -64,176 +69,161 @@ class DirectDatasetProcessor:
             print("❌ No parquet files found. Let's try downloading again...")
             return []
         
-        return parquet_files[:5]  # Limit to first 5 files for manageable size
+        return parquet_files
+    
+    def iter_batches(self, parquet_files: List[Path], batch_size: int = 256,
+                     read_batch_rows: int = 1024) -> Iterator[List[Dict]]:
+        """
+        Stream samples from parquet files in lists of batch_size
+        
+        Files are read read_batch_rows rows at a time, so memory stays
+        bounded however large the dataset is.
+        """
+        pending = []
+        for parquet_file in parquet_files:
+            for samples in self._iter_file(parquet_file, read_batch_rows):
+                pending.extend(samples)
+                while len(pending) >= batch_size:
+                    yield pending[:batch_size]
+                    pending = pending[batch_size:]
+        if pending:
+            yield pending
     
     def process_parquet_file(self, parquet_file: Path) -> List[Dict]:
         """Process a single parquet file"""
+        samples = []
+        for batch in self._iter_file(parquet_file):
+            samples.extend(batch)
+        print(f"✅ Processed {len(samples)} samples from {parquet_file.name}")
+        return samples
+    
+    def _iter_file(self, parquet_file: Path, read_batch_rows: int = 1024) -> Iterator[List[Dict]]:
         try:
             print(f"📖 Reading {parquet_file.name}...")
-            table = pq.read_table(parquet_file)
-            df = table.to_pandas()
-            
-            print(f"   Rows: {len(df)}")
-            print(f"   Columns: {list(df.columns)}")
-            
-            samples = []
-            for idx, row in df.iterrows():
-                try:
-                    # Extract audio data
-                    audio_data = row['audio']
-                    if isinstance(audio_data, dict):
-                        # Extract audio array and sampling rate
-                        audio_array = np.array(audio_data['array'], dtype=np.float32)
-                        sampling_rate = audio_data['sampling_rate']
-                        
-                        # Resample if needed
-                        if sampling_rate != self.target_sr:
-                            audio_array = librosa.resample(audio_array, orig_sr=sampling_rate, target_sr=self.target_sr)
-                        
-                        # Normalize
-                        if np.max(np.abs(audio_array)) > 0:
-                            audio_array = audio_array / np.max(np.abs(audio_array))
-                        
-                        # Ensure reasonable length
-                        min_length = self.target_sr  # 1 second minimum
-                        max_length = self.target_sr * 10  # 10 seconds maximum
-                        
-                        if len(audio_array) < min_length:
-                            audio_array = np.pad(audio_array, (0, min_length - len(audio_array)))
-                        elif len(audio_array) > max_length:
-                            audio_array = audio_array[:max_length]
-                        
-                        samples.append({
-                            'audio': audio_array,
-                            'label': row['label'],
-                            'source': row.get('source', 'unknown')
-                        })
-                        
-                except Exception as e:
-                    print(f"Error processing row {idx}: {e}")
-                    continue
-            
-            print(f"✅ Processed {len(samples)} samples from {parquet_file.name}")
-            return samples
-            
+            parquet = pq.ParquetFile(parquet_file)
+            print(f"   Rows: {parquet.metadata.num_rows}")
+            print(f"   Columns: {parquet.schema_arrow.names}")
+            
+            columns = [c for c in ('audio', 'label', 'source') if c in parquet.schema_arrow.names]
+            row_offset = 0
+            for record_batch in parquet.iter_batches(batch_size=read_batch_rows, columns=columns):
+                yield self._decode_batch(record_batch, parquet_file.stem, row_offset)
+                row_offset += record_batch.num_rows
+                
         except Exception as e:
             print(f"❌ Error reading {parquet_file}: {e}")
-            return []
-
-class VoiceFeatureExtractor:
-    """Extract acoustic features from voice samples"""
     
-    def __init__(self, target_sr: int = 22050):
-        self.target_sr = target_sr
-        print(f"🔧 Feature Extractor initialized (SR: {target_sr}Hz)")
+    def _decode_batch(self, record_batch: pa.RecordBatch, file_id: str, row_offset: int) -> List[Dict]:
+        """
+        Samples of one record batch
+        
+        Audio samples are read straight from the Arrow list buffers (no
+        per-row Python objects), and rows that share a sampling rate are
+        resampled together.
+        """
+        audio = record_batch.column('audio')
+        if not pa.types.is_struct(audio.type) or audio.type.get_field_index('array') < 0:
+            print(f"❌ Audio column of {file_id} has no decoded 'array' field")
+            return []
+        
+        arrays = audio.field('array')
+        offsets = arrays.offsets.to_numpy()
+        values = arrays.values.to_numpy(zero_copy_only=False)
+        rates = audio.field('sampling_rate').to_numpy(zero_copy_only=False)
+        valid = ~(audio.is_null().to_numpy(zero_copy_only=False) | arrays.is_null().to_numpy(zero_copy_only=False))
+        
+        labels = record_batch.column('label').to_numpy(zero_copy_only=False)
+        names = record_batch.schema.names
+        sources = record_batch.column('source').to_pylist() if 'source' in names else None
+        paths = audio.field('path').to_pylist() if audio.type.get_field_index('path') >= 0 else None
+        
+        # At most 10 seconds per clip; cut before resampling so no work is wasted
+        starts = offsets[:-1].astype(np.int64)
+        ends = np.minimum(offsets[1:], starts + rates.astype(np.int64) * 10)
+        
+        clips = [None] * record_batch.num_rows
+        for rate in np.unique(rates[valid]):
+            rows = np.flatnonzero(valid & (rates == rate))
+            for row, clip in zip(rows, self._resample_rows(values, starts[rows], ends[rows], int(rate))):
+                clips[row] = clip
+        
+        samples = []
+        for row, clip in enumerate(clips):
+            if clip is None or len(clip) == 0:
+                continue
+            
+            # Normalize
+            peak = np.max(np.abs(clip))
+            if peak > 0:
+                clip = clip / peak
+            
+            # Ensure reasonable length
+            min_length = self.target_sr  # 1 second minimum
+            max_length = self.target_sr * 10  # 10 seconds maximum
+            if len(clip) < min_length:
+                clip = np.pad(clip, (0, min_length - len(clip)))
+            elif len(clip) > max_length:
+                clip = clip[:max_length]
+            
+            samples.append({
+                'sample_id': f"{file_id}/{paths[row] if paths and paths[row] else row_offset + row}",
+                'audio': clip,
+                'label': labels[row],
+                'source': sources[row] if sources else 'unknown'
+            })
+        return samples
     
-    def extract_features(self, audio: np.ndarray) -> Optional[np.ndarray]:
-        """Extract comprehensive acoustic features - EXACTLY matching the production system"""
-        try:
-            features = []
-            
-            # 1. MFCC features (mel-frequency cepstral coefficients)
-            mfcc = librosa.feature.mfcc(y=audio, sr=self.target_sr, n_mfcc=13)
-            features.extend([
-                np.mean(mfcc, axis=1),  # Mean
-                np.std(mfcc, axis=1),   # Standard deviation
-                np.min(mfcc, axis=1),   # Minimum
-                np.max(mfcc, axis=1),   # Maximum
-            ])
-            
-            # 2. Spectral features
-            spectral_centroids = librosa.feature.spectral_centroid(y=audio, sr=self.target_sr)
-            spectral_rolloff = librosa.feature.spectral_rolloff(y=audio, sr=self.target_sr)
-            spectral_bandwidth = librosa.feature.spectral_bandwidth(y=audio, sr=self.target_sr)
-            spectral_contrast = librosa.feature.spectral_contrast(y=audio, sr=self.target_sr)
-            
-            features.extend([
-                [np.mean(spectral_centroids), np.std(spectral_centroids), np.min(spectral_centroids), np.max(spectral_centroids)],
-                [np.mean(spectral_rolloff), np.std(spectral_rolloff), np.min(spectral_rolloff), np.max(spectral_rolloff)],
-                [np.mean(spectral_bandwidth), np.std(spectral_bandwidth), np.min(spectral_bandwidth), np.max(spectral_bandwidth)],
-                np.mean(spectral_contrast, axis=1),
-                np.std(spectral_contrast, axis=1)
-            ])
-            
-            # 3. Zero crossing rate
-            zcr = librosa.feature.zero_crossing_rate(audio)
-            features.append([np.mean(zcr), np.std(zcr), np.min(zcr), np.max(zcr)])
-            
-            # 4. Chroma features
-            chroma = librosa.feature.chroma_stft(y=audio, sr=self.target_sr)
-            features.extend([
-                np.mean(chroma, axis=1),
-                np.std(chroma, axis=1)
-            ])
-            
-            # 5. Mel-scale spectrogram
-            mel_spectrogram = librosa.feature.melspectrogram(y=audio, sr=self.target_sr, n_mels=13)
-            mel_db = librosa.power_to_db(mel_spectrogram, ref=np.max)
-            features.extend([
-                np.mean(mel_db, axis=1),
-                np.std(mel_db, axis=1)
-            ])
-            
-            # 6. Harmonic and percussive components
-            harmonic, percussive = librosa.effects.hpss(audio)
-            harmonic_energy = np.sum(harmonic**2)
-            percussive_energy = np.sum(percussive**2)
-            total_energy = np.sum(audio**2)
-            
-            features.append([
-                harmonic_energy / (total_energy + 1e-10),
-                percussive_energy / (total_energy + 1e-10),
-                harmonic_energy / (percussive_energy + 1e-10)
-            ])
-            
-            # 7. Tempo and rhythm
-            try:
-                tempo, _ = librosa.beat.beat_track(y=audio, sr=self.target_sr)
-                features.append([tempo])
-            except:
-                features.append([120.0])  # Default tempo
-            
-            # 8. RMS energy
-            rms = librosa.feature.rms(y=audio)
-            features.append([np.mean(rms), np.std(rms), np.min(rms), np.max(rms)])
-            
-            # 9. Spectral flatness
-            spectral_flatness = librosa.feature.spectral_flatness(y=audio)
-            features.append([np.mean(spectral_flatness), np.std(spectral_flatness)])
-            
-            # 10. Tonnetz (tonal centroid features)
-            tonnetz = librosa.feature.tonnetz(y=librosa.effects.harmonic(audio), sr=self.target_sr)
-            features.extend([
-                np.mean(tonnetz, axis=1),
-                np.std(tonnetz, axis=1)
-            ])
-            
-            # Flatten all features
-            flat_features = []
-            for feature_group in features:
-                if np.isscalar(feature_group):
-                    flat_features.append(feature_group)
-                elif hasattr(feature_group, 'flatten'):
-                    flat_features.extend(feature_group.flatten())
-                else:
-                    flat_features.extend(np.array(feature_group).flatten())
-            
-            return np.array(flat_features, dtype=np.float32)
-            
-        except Exception as e:
-            print(f"Error extracting features: {e}")
-            return None
+    def _resample_rows(self, values: np.ndarray, starts: np.ndarray, ends: np.ndarray, rate: int,
+                       group_size: int = 64) -> List[np.ndarray]:
+        """
+        Resample clips recorded at one rate to target_sr, a group at a time
+        
+        Clips of similar length are zero padded into one matrix and
+        resampled in a single call; each output row is then cut to the
+        length resampling the clip alone would give.
+        """
+        lengths = ends - starts
+        order = np.argsort(lengths)
+        clips = [None] * len(lengths)
+        
+        for group_start in range(0, len(order), group_size):
+            group = order[group_start:group_start + group_size]
+            matrix = np.zeros((len(group), int(lengths[group].max())), dtype=np.float32)
+            for i, row in enumerate(group):
+                matrix[i, :lengths[row]] = values[starts[row]:ends[row]]
+            
+            if rate != self.target_sr:
+                matrix = librosa.resample(matrix, orig_sr=rate, target_sr=self.target_sr, axis=-1)
+            
+            for i, row in enumerate(group):
+                out_length = int(np.ceil(lengths[row] * self.target_sr / rate))
+                clips[row] = matrix[i, :out_length]
+        return clips
 
 class SmartDatasetTrainer:
     """Train with smart dataset management"""
     
-    def __init__(self, sample_limit: int = 10000):
+    def __init__(self, sample_limit: int = 10000, feature_profile: str = DEFAULT_PROFILE,
+                 feature_workers: Optional[int] = None, feature_store_dir: Optional[str] = DEFAULT_STORE_DIR,
+                 seed: Optional[int] = None, fast_training: bool = False,
+                 training_threads: Optional[int] = None):
         self.sample_limit = sample_limit
+        self.feature_profile = feature_profile
         self.processor = DirectDatasetProcessor("Voice_Dataset/fake_or_real_dataset")
-        self.feature_extractor = VoiceFeatureExtractor()
+        self.feature_extractor = FeatureExtractor(profile=feature_profile)
+        # Feature extraction runs on every core (feature_workers=1: in this process)
+        self.parallel_extractor = ParallelFeatureExtractor(profile=feature_profile, workers=feature_workers)
+        # Features of dataset samples are kept across runs (None disables)
+        self.feature_store = (FeatureStore(feature_store_dir, self.feature_extractor.schema_id)
+                              if feature_store_dir else None)
+        # Synthetic fallback data (seed makes it reproducible)
+        self.voice_generator = SyntheticVoiceGenerator(sample_rate=self.feature_extractor.target_sr, seed=seed)
         self.models = {}
         self.scaler = StandardScaler()
+        self.canary_set = None
         self.training_stats = {}
+        # Model fitting: fast mode and the threads it may use
+        self.model_trainer = ModelTrainer(fast=fast_training, thread_budget=training_threads)
         
         print(f"🚀 Smart Dataset Trainer initialized")
         print(f"⚡ Sample limit: {sample_limit}")
@@ -251,23 +241,24 @@ class SmartDatasetTrainer:
         
         print(f"📁 Found {len(parquet_files)} parquet files")
         
-        all_samples = []
-        for pf in parquet_files[:3]:  # Use first 3 files
-            samples = self.processor.process_parquet_file(pf)
-            all_samples.extend(samples)
+        # Stream batches until both classes are full; nothing else is kept in memory
+        class_limit = self.sample_limit // 2
+        real_samples, fake_samples = [], []
+        for batch in self.processor.iter_batches(parquet_files):
+            for sample in batch:
+                bucket = real_samples if sample['label'] == 0 else fake_samples if sample['label'] == 1 else None
+                if bucket is not None and len(bucket) < class_limit:
+                    bucket.append(sample)
             
-            if len(all_samples) >= self.sample_limit:
+            if len(real_samples) >= class_limit and len(fake_samples) >= class_limit:
                 break
         
-        if len(all_samples) < 100:
+        if len(real_samples) + len(fake_samples) < 100:
             print("❌ Not enough samples found. Creating enhanced synthetic data...")
             return self.create_enhanced_synthetic_data()
         
         # Balance the dataset
-        real_samples = [s for s in all_samples if s['label'] == 0]
-        fake_samples = [s for s in all_samples if s['label'] == 1]
-        
-        samples_per_class = min(len(real_samples), len(fake_samples), self.sample_limit // 2)
+        samples_per_class = min(len(real_samples), len(fake_samples), class_limit)
         
         balanced_samples = real_samples[:samples_per_class] + fake_samples[:samples_per_class]
         np.random.shuffle(balanced_samples)
@@ -279,12 +270,18 @@ class SmartDatasetTrainer:
         features_list = []
         labels_list = []
         
-        print(f"🔧 Extracting features...")
-        for sample in tqdm(balanced_samples, desc="Feature extraction"):
-            features = self.feature_extractor.extract_features(sample['audio'])
+        print(f"🔧 Extracting features on {self.parallel_extractor.workers} workers...")
+        all_features = extract_with_store(
+            self.feature_store, self.parallel_extractor,
+            ((sample['sample_id'], sample['audio'], self.processor.target_sr) for sample in balanced_samples),
+            total=len(balanced_samples)
+        )
+        for sample, features in zip(balanced_samples, all_features):
             if features is not None:
                 features_list.append(features)
                 labels_list.append(sample['label'])
+        self.parallel_extractor.report()
+        self.parallel_extractor.shutdown()
         
         X = np.array(features_list)
         y = np.array(labels_list)
@@ -300,27 +297,23 @@ class SmartDatasetTrainer:
         n_real = n_samples // 2
         n_fake = n_samples - n_real
         
-        features_list = []
-        labels_list = []
+        labels = [0] * n_real + [1] * n_fake  # 0=real, 1=fake
+        sr = self.voice_generator.sample_rate
         
-        print(f"Generating {n_real} real voice samples...")
-        for i in tqdm(range(n_real), desc="Real voices"):
-            # Create more realistic voice patterns
-            duration = np.random.uniform(2, 8)  # 2-8 seconds
-            audio = self.generate_realistic_voice(duration, voice_type='real')
-            features = self.feature_extractor.extract_features(audio)
-            if features is not None:
-                features_list.append(features)
-                labels_list.append(0)  # Real
+        def generate_voices():
+            # Generated a batch at a time while the workers featurize earlier clips
+            for voice_type, count in (('real', n_real), ('fake', n_fake)):
+                for audio in self.voice_generator.iter_clips(voice_type, count, duration=(2, 8)):  # 2-8 seconds
+                    yield audio, sr
         
-        print(f"Generating {n_fake} fake voice samples...")
-        for i in tqdm(range(n_fake), desc="Fake voices"):
-            duration = np.random.uniform(2, 8)
-            audio = self.generate_realistic_voice(duration, voice_type='fake')
-            features = self.feature_extractor.extract_features(audio)
-            if features is not None:
-                features_list.append(features)
-                labels_list.append(1)  # Fake
+        print(f"Generating {n_real} real and {n_fake} fake voice samples...")
+        all_features = self.parallel_extractor.extract_all(generate_voices(), total=len(labels),
+                                                           desc="Synthetic voices")
+        
+        features_list = [f for f in all_features if f is not None]
+        labels_list = [label for label, f in zip(labels, all_features) if f is not None]
+        self.parallel_extractor.report()
+        self.parallel_extractor.shutdown()
         
         X = np.array(features_list)
         y = np.array(labels_list)
@@ -328,102 +321,6 @@ class SmartDatasetTrainer:
         print(f"✅ Enhanced synthetic dataset: {X.shape[0]} samples, {X.shape[1]} features")
         return X, y
     
-    def generate_realistic_voice(self, duration: float, voice_type: str = 'real') -> np.ndarray:
-        """Generate more realistic synthetic voice samples"""
-        sr = 22050
-        samples = int(duration * sr)
-        
-        # Base frequency patterns for human voice
-        base_freq = np.random.uniform(85, 255)  # Human voice range
-        
-        if voice_type == 'real':
-            # Real voice characteristics
-            # Natural harmonic series
-            harmonics = [1, 2, 3, 4, 5, 6, 7, 8]
-            harmonic_weights = [1.0, 0.7, 0.5, 0.3, 0.2, 0.15, 0.1, 0.05]
-            
-            # Natural vibrato
-            vibrato_rate = np.random.uniform(4, 7)  # Hz
-            vibrato_depth = np.random.uniform(0.02, 0.08)
-            
-            # Natural amplitude variations
-            amp_variations = 0.3
-            
-        else:  # fake voice
-            # Fake voice characteristics (typical AI artifacts)
-            # Slightly unnatural harmonic patterns
-            harmonics = [1, 2, 3, 4, 5, 6, 7, 8]
-            harmonic_weights = [1.0, 0.8, 0.6, 0.4, 0.25, 0.15, 0.12, 0.08]  # More even distribution
-            
-            # Slightly irregular vibrato
-            vibrato_rate = np.random.uniform(3, 8)
-            vibrato_depth = np.random.uniform(0.01, 0.12)  # More variation
-            
-            # More consistent amplitude (less natural)
-            amp_variations = 0.15
-        
-        # Generate time array
-        t = np.linspace(0, duration, samples)
-        
-        # Create complex voice signal
-        signal = np.zeros(samples)
-        
-        for harmonic, weight in zip(harmonics, harmonic_weights):
-            freq = base_freq * harmonic
-            
-            # Add vibrato
-            vibrato = vibrato_depth * np.sin(2 * np.pi * vibrato_rate * t)
-            instantaneous_freq = freq * (1 + vibrato)
-            
-            # Generate harmonic component
-            phase = 2 * np.pi * np.cumsum(instantaneous_freq) / sr
-            harmonic_signal = weight * np.sin(phase)
-            
-            # Add to main signal
-            signal += harmonic_signal
-        
-        # Add realistic amplitude envelope
-        # Attack, decay, sustain, release
-        attack_time = 0.1
-        release_time = 0.2
-        attack_samples = int(attack_time * sr)
-        release_samples = int(release_time * sr)
-        
-        envelope = np.ones(samples)
-        
-        # Attack
-        if attack_samples < samples:
-            envelope[:attack_samples] = np.linspace(0, 1, attack_samples)
-        
-        # Release
-        if release_samples < samples:
-            envelope[-release_samples:] = np.linspace(1, 0, release_samples)
-        
-        # Add natural amplitude variations
-        amplitude_noise = 1 + amp_variations * np.random.randn(samples) * np.exp(-t/2)
-        envelope *= amplitude_noise
-        
-        signal *= envelope
-        
-        # Add realistic noise characteristics
-        if voice_type == 'real':
-            # Natural breath and vocal tract noise
-            noise_level = 0.001
-            signal += noise_level * np.random.randn(samples)
-        else:
-            # Digital artifacts in fake voice
-            # Quantization-like noise
-            quantization_noise = 0.0005 * np.random.randint(-1, 2, samples)
-            # Slight aliasing artifacts
-            aliasing = 0.0002 * np.sin(2 * np.pi * sr/4 * t + np.random.uniform(0, 2*np.pi))
-            signal += quantization_noise + aliasing
-        
-        # Normalize
-        if np.max(np.abs(signal)) > 0:
-            signal = signal / np.max(np.abs(signal)) * 0.7
-        
-        return signal.astype(np.float32)
-    
     def train_models(self, X: np.ndarray, y: np.ndarray):
         """Train multiple models"""
         print(f"🎯 Training models...")
@@ -440,6 +337,9 @@ class SmartDatasetTrainer:
         X_train_scaled = self.scaler.fit_transform(X_train)
         X_test_scaled = self.scaler.transform(X_test)
         
+        # Held-out samples that later retrained models are checked against
+        self.canary_set = (X_test, y_test)
+        
         # Define models with better parameters for voice detection
         models_config = {
             'xgboost': {
@@ -481,39 +381,24 @@ class SmartDatasetTrainer:
             }
         }
         
-        # Train each model
+        # Train all models (fast mode: cached folds, early stopping, models in parallel)
+        results = self.model_trainer.train_all(
+            {name: config['model'] for name, config in models_config.items()},
+            X_train_scaled, y_train, X_test_scaled, y_test
+        )
         for name, config in models_config.items():
-            print(f"\n🔥 Training {config['description']}...")
-            
-            start_time = datetime.now()
-            model = config['model']
-            
-            # Train model
-            model.fit(X_train_scaled, y_train)
-            
-            # Make predictions
-            y_pred = model.predict(X_test_scaled)
-            y_pred_proba = model.predict_proba(X_test_scaled)
-            
-            # Calculate metrics
-            accuracy = accuracy_score(y_test, y_pred)
-            auc_score = roc_auc_score(y_test, y_pred_proba[:, 1])
-            training_time = (datetime.now() - start_time).total_seconds()
-            
-            # Store results
-            self.models[name] = model
-            self.training_stats[name] = {
-                'accuracy': accuracy,
-                'auc_score': auc_score,
-                'training_time': training_time,
-                'test_predictions': y_pred,
-                'test_probabilities': y_pred_proba
-            }
+            stats = results[name]
+            self.models[name] = stats.pop('model')
+            stats['test_predictions'] = stats.pop('predictions')
+            stats['test_probabilities'] = stats.pop('probabilities')
+            self.training_stats[name] = stats
             
             print(f"✅ {config['description']} Results:")
-            print(f"   Accuracy: {accuracy:.4f}")
-            print(f"   AUC Score: {auc_score:.4f}")
-            print(f"   Training Time: {training_time:.2f}s")
+            print(f"   Accuracy: {stats['accuracy']:.4f}")
+            print(f"   AUC Score: {stats['auc_score']:.4f}")
+            print(f"   Training Time: {stats['training_time']:.2f}s")
+            print(f"   Prediction: {stats['predict_single_ms']:.2f} ms per clip, "
+                  f"size {stats['model_size_bytes'] / 1024:.0f} KB")
         
         # Print detailed results
         print(f"\n📊 Detailed Results:")
@@ -522,58 +407,73 @@ class SmartDatasetTrainer:
             print(classification_report(y_test, stats['test_predictions'], 
                                       target_names=['Real', 'Fake']))
     
-    def save_models(self, output_dir: str = "trained_models"):
+    def save_models(self, output_dir: Optional[str] = None):
         """Save trained models"""
+        if output_dir is None:
+            # Non-default profiles go to trained_models/<profile>, where the detector looks for them
+            output_dir = "trained_models"
+            if self.feature_profile != DEFAULT_PROFILE:
+                output_dir = os.path.join(output_dir, self.feature_profile)
         output_path = Path(output_dir)
-        output_path.mkdir(exist_ok=True)
+        output_path.mkdir(parents=True, exist_ok=True)
         
         print(f"💾 Saving enhanced models to {output_path}")
         
-        # Save each model
-        for name, model in self.models.items():
-            model_file = output_path / f"{name}_model.pkl"
-            joblib.dump(model, model_file)
-            print(f"✅ Saved {name} model")
-        
-        # Save scaler
-        scaler_file = output_path / "scaler.pkl"
-        joblib.dump(self.scaler, scaler_file)
-        print(f"✅ Saved feature scaler")
-        
         # Find best model
         best_model = max(self.training_stats.items(), key=lambda x: x[1]['auc_score'])
         
         # Save metadata
         metadata = {
             'best_model': best_model[0],
-            'models': {name: {
-                'accuracy': stats['accuracy'],
-                'auc_score': stats['auc_score'],
-                'training_time': stats['training_time']
-            } for name, stats in self.training_stats.items()},
+            'models': {name: model_report(stats) for name, stats in self.training_stats.items()},
+            'training_mode': 'fast' if self.model_trainer.fast else 'standard',
             'feature_extractor_type': 'Enhanced_Real_Dataset_Acoustic',
+            **self.feature_extractor.schema_metadata(),
+            'feature_extraction_ms': self.parallel_extractor.average_extraction_ms(),
+            'feature_extraction_throughput': self.parallel_extractor.throughput(),
             'training_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'num_features': 154,
-            'dataset_source': 'Enhanced_Synthetic_Real_Patterns',
-            'sample_rate': 22050
+            'dataset_source': 'Enhanced_Synthetic_Real_Patterns'
         }
         
-        metadata_file = output_path / "model_metadata.json"
-        with open(metadata_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
-        
-        print(f"✅ Saved metadata")
+        # Scaler, models and metadata go into one bundle
+        # The canary set is this run's held-out split and is replaced with the bundle
+        bundle_hash = save_bundle(output_path, self.models, self.scaler, metadata, canary_set=self.canary_set)
+        print(f"✅ Saved model bundle {output_path / BUNDLE_FILENAME}")
+        print(f"   Content hash: {bundle_hash}")
+        if self.canary_set is not None:
+            print(f"✅ Saved canary set ({len(self.canary_set[1])} samples)")
         print(f"🏆 Best model: {best_model[0]} (AUC: {best_model[1]['auc_score']:.4f})")
 
 def main():
     """Main training function"""
+    parser = argparse.ArgumentParser(description="Train the voice clone detection models")
+    parser.add_argument('--profile', choices=FEATURE_PROFILES, default=DEFAULT_PROFILE,
+                        help="Feature profile to train for (default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Feature extraction processes (default: one per CPU core)")
+    parser.add_argument('--feature-store', default=DEFAULT_STORE_DIR,
+                        help="Directory of stored training features (default: %(default)s)")
+    parser.add_argument('--no-feature-store', action='store_true',
+                        help="Extract every sample's features again instead of reusing stored ones")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="Random seed of the synthetic fallback data")
+    parser.add_argument('--fast', action='store_true',
+                        help="Fast training: hist trees, early stopping and all models in parallel")
+    parser.add_argument('--threads', type=int, default=None,
+                        help="Threads model training may use (default: one per CPU core)")
+    args = parser.parse_args()
+    
     print("="*60)
     print("🎯 ENHANCED VOICE CLONE DETECTION TRAINING")
     print("="*60)
     
     try:
         # Initialize trainer
-        trainer = SmartDatasetTrainer(sample_limit=10000)
+        trainer = SmartDatasetTrainer(sample_limit=10000, feature_profile=args.profile,
+                                      feature_workers=args.workers,
+                                      feature_store_dir=None if args.no_feature_store else args.feature_store,
+                                      seed=args.seed, fast_training=args.fast,
+                                      training_threads=args.threads)
         
         # Create training data
         X, y = trainer.create_balanced_dataset()
@@ -7,7 +7,7 @@ that can accurately distinguish between real human voices and AI-generated/clone
 
 Key improvements:
 - Balanced dataset generation
-- Advanced feature extraction 
+- Shared production feature extraction (core.voice_features)
 - Realistic voice cloning artifacts
 - Proper cross-validation
 - Model calibration
@@ -17,382 +17,66 @@ import os
 import sys
 import numpy as np
 import pandas as pd
-import librosa
 import soundfile as sf
 from pathlib import Path
 import tempfile
-import json
 from datetime import datetime
-from tqdm import tqdm
 import warnings
 warnings.filterwarnings('ignore')
 
 # ML libraries
-from sklearn.model_selection import train_test_split, cross_val_score, StratifiedKFold
+from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.svm import SVC
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
-from sklearn.calibration import CalibratedClassifierCV
 import xgboost as xgb
-import joblib
 
-class AdvancedVoiceFeatureExtractor:
-    """Advanced feature extraction for voice clone detection"""
-    
-    def __init__(self, target_sr=22050):
-        self.target_sr = target_sr
-        self.n_mfcc = 13
-        self.n_chroma = 12
-        self.n_mel = 128
-        
-    def extract_comprehensive_features(self, audio_data, sr=None):
-        """Extract comprehensive audio features for voice clone detection"""
-        if sr is None:
-            sr = self.target_sr
-            
-        # Ensure audio is the right sample rate
-        if sr != self.target_sr:
-            audio_data = librosa.resample(audio_data, orig_sr=sr, target_sr=self.target_sr)
-            sr = self.target_sr
-        
-        features = []
-        
-        try:
-            # 1. MFCC features (Mel-frequency cepstral coefficients)
-            mfccs = librosa.feature.mfcc(y=audio_data, sr=sr, n_mfcc=self.n_mfcc)
-            features.extend([
-                np.mean(mfccs), np.std(mfccs), np.min(mfccs), np.max(mfccs),
-                np.median(mfccs), np.var(mfccs)
-            ])
-            
-            # MFCC deltas and delta-deltas
-            mfcc_delta = librosa.feature.delta(mfccs)
-            mfcc_delta2 = librosa.feature.delta(mfccs, order=2)
-            features.extend([
-                np.mean(mfcc_delta), np.std(mfcc_delta),
-                np.mean(mfcc_delta2), np.std(mfcc_delta2)
-            ])
-            
-            # 2. Chroma features
-            chroma = librosa.feature.chroma_stft(y=audio_data, sr=sr)
-            features.extend([
-                np.mean(chroma), np.std(chroma), np.min(chroma), np.max(chroma)
-            ])
-            
-            # 3. Mel-scale spectrogram
-            mel_spec = librosa.feature.melspectrogram(y=audio_data, sr=sr, n_mels=self.n_mel)
-            mel_spec_db = librosa.power_to_db(mel_spec, ref=np.max)
-            features.extend([
-                np.mean(mel_spec_db), np.std(mel_spec_db),
-                np.min(mel_spec_db), np.max(mel_spec_db)
-            ])
-            
-            # 4. Spectral features
-            spec_centroid = librosa.feature.spectral_centroid(y=audio_data, sr=sr)
-            spec_bandwidth = librosa.feature.spectral_bandwidth(y=audio_data, sr=sr)
-            spec_rolloff = librosa.feature.spectral_rolloff(y=audio_data, sr=sr)
-            
-            features.extend([
-                np.mean(spec_centroid), np.std(spec_centroid),
-                np.mean(spec_bandwidth), np.std(spec_bandwidth),
-                np.mean(spec_rolloff), np.std(spec_rolloff)
-            ])
-            
-            # 5. Zero crossing rate
-            zcr = librosa.feature.zero_crossing_rate(audio_data)
-            features.extend([np.mean(zcr), np.std(zcr)])
-            
-            # 6. Rhythm and tempo features
-            tempo, beats = librosa.beat.beat_track(y=audio_data, sr=sr)
-            features.append(tempo)
-            
-            # 7. Harmonic and percussive components
-            harmonic, percussive = librosa.effects.hpss(audio_data)
-            features.extend([
-                np.mean(harmonic), np.std(harmonic),
-                np.mean(percussive), np.std(percussive)
-            ])
-            
-            # 8. Tonnetz (tonal centroid) features
-            tonnetz = librosa.feature.tonnetz(y=audio_data, sr=sr)
-            features.extend([
-                np.mean(tonnetz), np.std(tonnetz)
-            ])
-            
-            # 9. Voice-specific features
-            # Fundamental frequency (F0)
-            f0 = librosa.yin(audio_data, fmin=50, fmax=400)
-            f0_clean = f0[~np.isnan(f0)]
-            if len(f0_clean) > 0:
-                features.extend([
-                    np.mean(f0_clean), np.std(f0_clean),
-                    np.min(f0_clean), np.max(f0_clean)
-                ])
-            else:
-                features.extend([0, 0, 0, 0])
-            
-            # 10. Spectral contrast
-            spec_contrast = librosa.feature.spectral_contrast(y=audio_data, sr=sr)
-            features.extend([
-                np.mean(spec_contrast), np.std(spec_contrast)
-            ])
-            
-            # 11. Short-time energy
-            energy = np.sum(audio_data ** 2)
-            features.append(energy)
-            
-            # 12. Spectral flatness (measure of noise vs tonal content)
-            spec_flatness = librosa.feature.spectral_flatness(y=audio_data)
-            features.extend([np.mean(spec_flatness), np.std(spec_flatness)])
-            
-            # 13. RMS energy
-            rms = librosa.feature.rms(y=audio_data)
-            features.extend([np.mean(rms), np.std(rms)])
-            
-            # 14. Poly features
-            poly_features = librosa.feature.poly_features(y=audio_data, sr=sr, order=1)
-            features.extend([np.mean(poly_features), np.std(poly_features)])
-            
-        except Exception as e:
-            print(f"Warning: Feature extraction error: {e}")
-            # Return zeros if extraction fails
-            features = [0.0] * 60  # Approximate expected feature count
-        
-        return np.array(features, dtype=np.float32)
-
-class RealisticAudioGenerator:
-    """Generate realistic human and AI-cloned voice samples"""
-    
-    def __init__(self, target_sr=22050):
-        self.target_sr = target_sr
-        
-    def generate_realistic_human_voice(self, duration=3.0):
-        """Generate realistic human voice with natural characteristics"""
-        sr = self.target_sr
-        samples = int(duration * sr)
-        t = np.linspace(0, duration, samples)
-        
-        # Human voice characteristics
-        base_freq = np.random.uniform(85, 255)  # Wider human vocal range
-        
-        # Natural harmonic series (real human voices have irregular harmonics)
-        harmonics = [1, 2, 3, 4, 5, 6, 7]
-        # Real human voices have very specific harmonic patterns
-        harmonic_weights = [
-            1.0,  # Fundamental
-            np.random.uniform(0.3, 0.8),  # 2nd harmonic varies a lot
-            np.random.uniform(0.2, 0.6),  # 3rd harmonic
-            np.random.uniform(0.1, 0.4),  # 4th harmonic
-            np.random.uniform(0.05, 0.25), # 5th harmonic
-            np.random.uniform(0.02, 0.15), # 6th harmonic  
-            np.random.uniform(0.01, 0.1)   # 7th harmonic
-        ]
-        
-        # Natural vibrato (4-7 Hz is typical for humans)
-        vibrato_rate = np.random.uniform(4.0, 7.0)
-        vibrato_depth = np.random.uniform(0.02, 0.06)  # Realistic depth
-        
-        # Natural jitter and shimmer (micro-variations)
-        jitter = np.random.normal(0, 0.001, samples)  # Frequency jitter
-        shimmer = np.random.normal(1, 0.02, samples)  # Amplitude shimmer
-        
-        signal = np.zeros(samples)
-        
-        for harmonic, weight in zip(harmonics, harmonic_weights):
-            freq = base_freq * harmonic
-            
-            # Add natural vibrato with some randomness
-            vibrato = vibrato_depth * np.sin(2 * np.pi * vibrato_rate * t + np.random.uniform(0, 2*np.pi))
-            
-            # Add jitter (small random frequency variations)
-            freq_with_jitter = freq * (1 + vibrato + jitter[:samples])
-            
-            # Generate harmonic
-            phase = 2 * np.pi * np.cumsum(freq_with_jitter) / sr
-            harmonic_signal = weight * np.sin(phase)
-            
-            # Add shimmer (amplitude variations)
-            harmonic_signal *= shimmer[:samples]
-            
-            signal += harmonic_signal
-        
-        # Natural envelope with realistic attack, sustain, decay
-        envelope = np.ones(samples)
-        
-        # Variable attack time (humans don't have perfectly consistent attacks)
-        attack_time = np.random.uniform(0.05, 0.15)
-        attack_samples = int(attack_time * sr)
-        
-        # Variable decay time
-        decay_time = np.random.uniform(0.1, 0.3)
-        decay_samples = int(decay_time * sr)
-        
-        # Natural attack curve (not linear)
-        if attack_samples > 0:
-            attack_curve = np.power(np.linspace(0, 1, attack_samples), 1.5)
-            envelope[:attack_samples] = attack_curve
-            
-        # Natural decay curve
-        if decay_samples > 0 and decay_samples < samples:
-            decay_curve = np.power(np.linspace(1, 0, decay_samples), 0.7)
-            envelope[-decay_samples:] = decay_curve
-        
-        signal *= envelope
-        
-        # Add natural breath noise and vocal tract resonances
-        breath_noise = 0.001 * np.random.laplace(0, 1, samples)  # More realistic noise
-        formant_noise = 0.0005 * np.random.randn(samples)
-        
-        signal += breath_noise + formant_noise
-        
-        # Add realistic pauses/silence (humans don't speak continuously)
-        if duration > 2.0:
-            pause_start = int(duration * 0.4 * sr)
-            pause_end = int(duration * 0.6 * sr)
-            pause_length = np.random.randint(int(0.1*sr), int(0.3*sr))
-            if pause_start + pause_length < pause_end:
-                signal[pause_start:pause_start+pause_length] *= 0.1  # Quiet pause
-        
-        # Normalize
-        if np.max(np.abs(signal)) > 0:
-            signal = signal / np.max(np.abs(signal)) * np.random.uniform(0.6, 0.8)
-        
-        return signal.astype(np.float32)
-    
-    def generate_ai_cloned_voice(self, duration=3.0):
-        """Generate AI-cloned voice with typical AI artifacts"""
-        sr = self.target_sr
-        samples = int(duration * sr)
-        t = np.linspace(0, duration, samples)
-        
-        # AI voice characteristics (often more regular than human)
-        base_freq = np.random.uniform(100, 200)
-        
-        # AI voices often have too-perfect harmonic relationships
-        harmonics = [1, 2, 3, 4, 5, 6, 7, 8]
-        # AI-generated voices tend to have more uniform harmonic distribution
-        harmonic_weights = [
-            1.0,  # Fundamental
-            0.7,  # Too consistent 2nd harmonic
-            0.5,  # Too consistent 3rd harmonic  
-            0.35, # Too regular pattern
-            0.25, # continues the pattern
-            0.18, # mathematical progression
-            0.12, # very regular
-            0.08  # extends beyond typical human range
-        ]
-        
-        # AI vibrato is often too regular or slightly off
-        vibrato_rate = np.random.uniform(3.5, 8.5)  # Wider, less natural range
-        vibrato_depth = np.random.uniform(0.03, 0.1)  # Often too pronounced
-        
-        # AI artifacts: less natural micro-variations
-        # Digital jitter (more regular than natural jitter)
-        digital_jitter = 0.0003 * np.sin(2 * np.pi * 60 * t)  # 60Hz digital artifact
-        
-        # Processing artifacts from neural networks
-        processing_noise = 0.0002 * np.random.uniform(-1, 1, samples)
-        
-        signal = np.zeros(samples)
-        
-        for harmonic, weight in zip(harmonics, harmonic_weights):
-            freq = base_freq * harmonic
-            
-            # AI vibrato (often too perfect or slightly irregular)
-            if np.random.random() > 0.3:  # 70% chance of vibrato
-                vibrato = vibrato_depth * np.sin(2 * np.pi * vibrato_rate * t)
-            else:
-                vibrato = 0  # Sometimes AI has no vibrato at all
-            
-            # Less natural frequency variations
-            freq_modulated = freq * (1 + vibrato + digital_jitter)
-            
-            phase = 2 * np.pi * np.cumsum(freq_modulated) / sr
-            harmonic_signal = weight * np.sin(phase)
-            
-            signal += harmonic_signal
-        
-        # AI envelope is often too perfect/mechanical
-        envelope = np.ones(samples)
-        
-        # Very consistent attack/decay (AI artifact)
-        attack_samples = int(0.03 * sr)  # Too fast, too consistent
-        decay_samples = int(0.05 * sr)   # Too short, too consistent
-        
-        # Linear envelopes (less natural than curved)
-        if attack_samples > 0:
-            envelope[:attack_samples] = np.linspace(0, 1, attack_samples)
-        if decay_samples > 0:
-            envelope[-decay_samples:] = np.linspace(1, 0, decay_samples)
-        
-        signal *= envelope
-        
-        # AI-specific artifacts
-        # Quantization artifacts from neural network processing
-        quantization_levels = 2**15  # 16-bit quantization artifacts
-        signal = np.round(signal * quantization_levels) / quantization_levels
-        
-        # Add processing noise typical of AI systems
-        signal += processing_noise
-        
-        # Spectral artifacts (AI models sometimes have weird frequency responses)
-        if np.random.random() > 0.7:  # 30% chance of spectral artifact
-            artifact_freq = np.random.uniform(8000, 12000)  # High frequency artifact
-            spectral_artifact = 0.001 * np.sin(2 * np.pi * artifact_freq * t)
-            signal += spectral_artifact
-        
-        # AI voices often lack natural pauses
-        # (they tend to be more continuous than human speech)
-        
-        # Normalize
-        if np.max(np.abs(signal)) > 0:
-            signal = signal / np.max(np.abs(signal)) * np.random.uniform(0.65, 0.85)
-        
-        return signal.astype(np.float32)
+from core.voice_features import FeatureExtractor
+from core.parallel_features import ParallelFeatureExtractor
+from core.synthetic_voices import SyntheticVoiceGenerator
+from core.model_training import ModelTrainer, model_report
+from core.model_bundle import save_bundle, BUNDLE_FILENAME
 
 class ImprovedVoiceCloneTrainer:
     """Improved trainer for voice clone detection"""
     
-    def __init__(self):
-        self.feature_extractor = AdvancedVoiceFeatureExtractor()
-        self.audio_generator = RealisticAudioGenerator()
+    def __init__(self, feature_workers=None, seed=None, fast_training=False, training_threads=None):
+        self.feature_extractor = FeatureExtractor()
+        # Realistic human and AI-cloned voice samples (seed makes them reproducible)
+        self.audio_generator = SyntheticVoiceGenerator(sample_rate=self.feature_extractor.target_sr, seed=seed)
+        # Feature extraction runs on every core (feature_workers=1: in this process)
+        self.parallel_extractor = ParallelFeatureExtractor(workers=feature_workers)
         self.models = {}
         self.scaler = StandardScaler()
+        # Model fitting: fast mode and the threads it may use
+        self.model_trainer = ModelTrainer(fast=fast_training, thread_budget=training_threads)
         self.training_history = []
+        self.canary_set = None
         
     def generate_balanced_dataset(self, n_samples_per_class=1000):
         """Generate a balanced dataset of real and fake voice samples"""
         print(f"🎵 Generating balanced dataset ({n_samples_per_class} samples per class)...")
         
-        features = []
-        labels = []
+        sr = self.audio_generator.sample_rate
+        class_labels = [0] * n_samples_per_class + [1] * n_samples_per_class  # 0 = REAL, 1 = FAKE
         
-        # Generate REAL human voice samples
-        print("   Generating REAL human voice samples...")
-        for i in tqdm(range(n_samples_per_class), desc="Real voices"):
-            # Vary duration for diversity
-            duration = np.random.uniform(1.5, 5.0)
-            audio = self.audio_generator.generate_realistic_human_voice(duration)
-            
-            # Extract features
-            feature_vector = self.feature_extractor.extract_comprehensive_features(audio)
-            
-            features.append(feature_vector)
-            labels.append(0)  # 0 = REAL
+        def generate_voices():
+            # Generated a batch at a time while the workers featurize earlier clips
+            for style in ('human', 'cloned'):
+                # Vary duration for diversity
+                for audio in self.audio_generator.iter_clips(style, n_samples_per_class, duration=(1.5, 5.0)):
+                    yield audio, sr
         
-        # Generate FAKE AI/cloned voice samples  
-        print("   Generating FAKE AI/cloned voice samples...")
-        for i in tqdm(range(n_samples_per_class), desc="Fake voices"):
-            # Vary duration for diversity
-            duration = np.random.uniform(1.5, 5.0)
-            audio = self.audio_generator.generate_ai_cloned_voice(duration)
-            
-            # Extract features
-            feature_vector = self.feature_extractor.extract_comprehensive_features(audio)
-            
-            features.append(feature_vector)
-            labels.append(1)  # 1 = FAKE
+        # Extract features with the production preprocessing
+        print("   Generating REAL human and FAKE AI/cloned voice samples...")
+        all_features = self.parallel_extractor.extract_all(generate_voices(), total=len(class_labels),
+                                                           desc="Voices")
+        self.parallel_extractor.report()
+        self.parallel_extractor.shutdown()
+        
+        features = [f for f in all_features if f is not None]
+        labels = [label for label, f in zip(class_labels, all_features) if f is not None]
         
         # Convert to numpy arrays
         X = np.array(features)
@@ -422,6 +106,9 @@ class ImprovedVoiceCloneTrainer:
         X_train_scaled = self.scaler.fit_transform(X_train)
         X_test_scaled = self.scaler.transform(X_test)
         
+        # Held-out samples that later retrained models are checked against
+        self.canary_set = (X_test, y_test)
+        
         # Define models with optimized parameters
         model_configs = {
             'xgboost': {
@@ -459,55 +146,32 @@ class ImprovedVoiceCloneTrainer:
             }
         }
         
-        results = {}
+        # Fit, calibrate and cross-validate every model (folds are built once)
+        results = self.model_trainer.train_all(
+            {name: config['model'] for name, config in model_configs.items()},
+            X_train_scaled, y_train, X_test_scaled, y_test,
+            cross_validate=True, calibrate=True,
+            inputs={name: (X_train, X_test) for name, config in model_configs.items() if not config['use_scaling']}
+        )
         
         for name, config in model_configs.items():
-            print(f"\n   Training {name}...")
+            print(f"\n   {name}:")
+            result = results[name]
             
             # Choose scaled or unscaled data
             X_train_model = X_train_scaled if config['use_scaling'] else X_train
-            X_test_model = X_test_scaled if config['use_scaling'] else X_test
-            
-            # Train model
-            model = config['model']
-            model.fit(X_train_model, y_train)
-            
-            # Calibrate probabilities for better confidence estimates
-            calibrated_model = CalibratedClassifierCV(model, method='sigmoid', cv=3)
-            calibrated_model.fit(X_train_model, y_train)
-            
-            # Evaluate
-            train_score = calibrated_model.score(X_train_model, y_train)
-            test_score = calibrated_model.score(X_test_model, y_test)
-            
-            # Cross-validation
-            cv_scores = cross_val_score(
-                calibrated_model, X_train_model, y_train, 
-                cv=StratifiedKFold(n_splits=5, shuffle=True, random_state=42),
-                scoring='accuracy'
-            )
+            result['train_score'] = result['model'].score(X_train_model, y_train)
+            result['test_score'] = result['accuracy']
             
-            # Predictions for detailed analysis
-            y_pred = calibrated_model.predict(X_test_model)
-            y_pred_proba = calibrated_model.predict_proba(X_test_model)
-            
-            results[name] = {
-                'model': calibrated_model,
-                'train_score': train_score,
-                'test_score': test_score,
-                'cv_mean': cv_scores.mean(),
-                'cv_std': cv_scores.std(),
-                'predictions': y_pred,
-                'probabilities': y_pred_proba
-            }
-            
-            print(f"      Train accuracy: {train_score:.4f}")
-            print(f"      Test accuracy: {test_score:.4f}")
-            print(f"      CV accuracy: {cv_scores.mean():.4f} (±{cv_scores.std():.4f})")
+            print(f"      Train accuracy: {result['train_score']:.4f}")
+            print(f"      Test accuracy: {result['test_score']:.4f}")
+            print(f"      CV accuracy: {result['cv_mean']:.4f} (±{result['cv_std']:.4f})")
+            print(f"      Fit time: {result['fit_seconds']:.2f}s, prediction: {result['predict_single_ms']:.2f} ms per clip, "
+                  f"size {result['model_size_bytes'] / 1024:.0f} KB")
             
             # Detailed classification report
             print(f"      Classification Report:")
-            report = classification_report(y_test, y_pred, target_names=['REAL', 'FAKE'])
+            report = classification_report(y_test, result['predictions'], target_names=['REAL', 'FAKE'])
             print("      " + report.replace('\n', '\n      '))
         
         # Find best model
@@ -523,9 +187,9 @@ class ImprovedVoiceCloneTrainer:
             'results': {name: {
                 'train_score': float(result['train_score']),
                 'test_score': float(result['test_score']),
-                'cv_mean': float(result['cv_mean']),
-                'cv_std': float(result['cv_std'])
+                **model_report(result)
             } for name, result in results.items()},
+            'training_mode': 'fast' if self.model_trainer.fast else 'standard',
             'best_model': best_model_name,
             'feature_count': X.shape[1],
             'training_samples': X.shape[0]
@@ -540,31 +204,23 @@ class ImprovedVoiceCloneTrainer:
         
         print(f"\n💾 Saving models to {models_dir}...")
         
-        # Save individual models
-        for name, model in self.models.items():
-            model_path = models_dir / f"{name}_model.pkl"
-            joblib.dump(model, model_path)
-            print(f"   ✅ Saved {name} model")
-        
-        # Save scaler
-        scaler_path = models_dir / "scaler.pkl"
-        joblib.dump(self.scaler, scaler_path)
-        print(f"   ✅ Saved feature scaler")
-        
         # Save metadata
         metadata = {
             'training_date': datetime.now().isoformat(),
-            'feature_count': len(self.feature_extractor.extract_comprehensive_features(np.random.randn(22050))),
+            **self.feature_extractor.schema_metadata(),
             'models': list(self.models.keys()),
             'best_model': self.training_history[-1]['best_model'] if self.training_history else 'xgboost',
             'training_history': self.training_history,
             'version': '5.0_improved'
         }
         
-        metadata_path = models_dir / "model_metadata.json"
-        with open(metadata_path, 'w') as f:
-            json.dump(metadata, f, indent=2)
-        print(f"   ✅ Saved metadata")
+        # Scaler, models and metadata go into one bundle
+        # The canary set is this run's held-out split and is replaced with the bundle
+        bundle_hash = save_bundle(models_dir, self.models, self.scaler, metadata, canary_set=self.canary_set)
+        print(f"   ✅ Saved model bundle {models_dir / BUNDLE_FILENAME}")
+        print(f"      Content hash: {bundle_hash}")
+        if self.canary_set is not None:
+            print(f"   ✅ Saved canary set ({len(self.canary_set[1])} samples)")
         
         print(f"✅ All models saved successfully!")
 
@@ -575,7 +231,7 @@ def main():
     
     try:
         # Initialize trainer
-        trainer = ImprovedVoiceCloneTrainer()
+        trainer = ImprovedVoiceCloneTrainer(seed=42)
         
         # Generate balanced dataset (increased size for better performance)
         print("\n📊 STEP 1: Dataset Generation")
@@ -12,24 +12,27 @@ import librosa
 import soundfile as sf
 from pathlib import Path
 from typing import List, Tuple, Optional, Dict, Any
-import json
 import pickle
-import joblib
 from datetime import datetime
 import warnings
-from tqdm import tqdm
 
 # Machine Learning
 from sklearn.model_selection import train_test_split, cross_val_score, StratifiedKFold
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.svm import SVC
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, roc_auc_score
+from sklearn.metrics import classification_report, confusion_matrix
 import xgboost as xgb
 
 # HuggingFace datasets
 from datasets import load_from_disk
 
+from core.voice_features import FeatureExtractor
+from core.parallel_features import ParallelFeatureExtractor
+from core.model_training import ModelTrainer, model_report
+from core.feature_store import FeatureStore, extract_with_store, DEFAULT_STORE_DIR
+from core.model_bundle import save_bundle, BUNDLE_FILENAME
+
 warnings.filterwarnings('ignore', category=UserWarning)
 warnings.filterwarnings('ignore', category=FutureWarning)
 
@@ -96,121 +99,28 @@ class RealDatasetProcessor:
             print(f"Error processing audio sample: {e}")
             return None
 
-class VoiceFeatureExtractor:
-    """Extract acoustic features from voice samples"""
-    
-    def __init__(self, target_sr: int = 22050):
-        self.target_sr = target_sr
-        print(f"🔧 Feature Extractor initialized (SR: {target_sr}Hz)")
-    
-    def extract_features(self, audio: np.ndarray) -> Optional[np.ndarray]:
-        """Extract comprehensive acoustic features - EXACTLY matching the production system"""
-        try:
-            features = []
-            
-            # 1. MFCC features (mel-frequency cepstral coefficients)
-            mfcc = librosa.feature.mfcc(y=audio, sr=self.target_sr, n_mfcc=13)
-            features.extend([
-                np.mean(mfcc, axis=1),  # Mean
-                np.std(mfcc, axis=1),   # Standard deviation
-                np.min(mfcc, axis=1),   # Minimum
-                np.max(mfcc, axis=1),   # Maximum
-            ])
-            
-            # 2. Spectral features
-            spectral_centroids = librosa.feature.spectral_centroid(y=audio, sr=self.target_sr)
-            spectral_rolloff = librosa.feature.spectral_rolloff(y=audio, sr=self.target_sr)
-            spectral_bandwidth = librosa.feature.spectral_bandwidth(y=audio, sr=self.target_sr)
-            spectral_contrast = librosa.feature.spectral_contrast(y=audio, sr=self.target_sr)
-            
-            features.extend([
-                [np.mean(spectral_centroids), np.std(spectral_centroids), np.min(spectral_centroids), np.max(spectral_centroids)],
-                [np.mean(spectral_rolloff), np.std(spectral_rolloff), np.min(spectral_rolloff), np.max(spectral_rolloff)],
-                [np.mean(spectral_bandwidth), np.std(spectral_bandwidth), np.min(spectral_bandwidth), np.max(spectral_bandwidth)],
-                np.mean(spectral_contrast, axis=1),
-                np.std(spectral_contrast, axis=1)
-            ])
-            
-            # 3. Zero crossing rate
-            zcr = librosa.feature.zero_crossing_rate(audio)
-            features.append([np.mean(zcr), np.std(zcr), np.min(zcr), np.max(zcr)])
-            
-            # 4. Chroma features
-            chroma = librosa.feature.chroma_stft(y=audio, sr=self.target_sr)
-            features.extend([
-                np.mean(chroma, axis=1),
-                np.std(chroma, axis=1)
-            ])
-            
-            # 5. Mel-scale spectrogram
-            mel_spectrogram = librosa.feature.melspectrogram(y=audio, sr=self.target_sr, n_mels=13)
-            mel_db = librosa.power_to_db(mel_spectrogram, ref=np.max)
-            features.extend([
-                np.mean(mel_db, axis=1),
-                np.std(mel_db, axis=1)
-            ])
-            
-            # 6. Harmonic and percussive components
-            harmonic, percussive = librosa.effects.hpss(audio)
-            harmonic_energy = np.sum(harmonic**2)
-            percussive_energy = np.sum(percussive**2)
-            total_energy = np.sum(audio**2)
-            
-            features.append([
-                harmonic_energy / (total_energy + 1e-10),
-                percussive_energy / (total_energy + 1e-10),
-                harmonic_energy / (percussive_energy + 1e-10)
-            ])
-            
-            # 7. Tempo and rhythm
-            try:
-                tempo, _ = librosa.beat.beat_track(y=audio, sr=self.target_sr)
-                features.append([tempo])
-            except:
-                features.append([120.0])  # Default tempo
-            
-            # 8. RMS energy
-            rms = librosa.feature.rms(y=audio)
-            features.append([np.mean(rms), np.std(rms), np.min(rms), np.max(rms)])
-            
-            # 9. Spectral flatness
-            spectral_flatness = librosa.feature.spectral_flatness(y=audio)
-            features.append([np.mean(spectral_flatness), np.std(spectral_flatness)])
-            
-            # 10. Tonnetz (tonal centroid features)
-            tonnetz = librosa.feature.tonnetz(y=librosa.effects.harmonic(audio), sr=self.target_sr)
-            features.extend([
-                np.mean(tonnetz, axis=1),
-                np.std(tonnetz, axis=1)
-            ])
-            
-            # Flatten all features
-            flat_features = []
-            for feature_group in features:
-                if np.isscalar(feature_group):
-                    flat_features.append(feature_group)
-                elif hasattr(feature_group, 'flatten'):
-                    flat_features.extend(feature_group.flatten())
-                else:
-                    flat_features.extend(np.array(feature_group).flatten())
-            
-            return np.array(flat_features, dtype=np.float32)
-            
-        except Exception as e:
-            print(f"Error extracting features: {e}")
-            return None
-
 class RealDatasetTrainer:
     """Train voice clone detection models using the real dataset"""
     
-    def __init__(self, dataset_path: str, sample_limit: Optional[int] = None):
+    def __init__(self, dataset_path: str, sample_limit: Optional[int] = None,
+                 feature_workers: Optional[int] = None, feature_store_dir: Optional[str] = DEFAULT_STORE_DIR,
+                 fast_training: bool = False, training_threads: Optional[int] = None):
         self.dataset_path = dataset_path
         self.sample_limit = sample_limit  # Limit samples for faster training if needed
         self.processor = RealDatasetProcessor(dataset_path)
-        self.feature_extractor = VoiceFeatureExtractor()
+        self.feature_extractor = FeatureExtractor()
+        # Feature extraction runs on every core (feature_workers=1: in this process)
+        self.parallel_extractor = ParallelFeatureExtractor(target_sr=self.processor.target_sr,
+                                                           workers=feature_workers)
+        # Features of dataset samples are kept across runs (None disables)
+        self.feature_store = (FeatureStore(feature_store_dir, self.feature_extractor.schema_id)
+                              if feature_store_dir else None)
         self.models = {}
         self.scaler = StandardScaler()
+        self.canary_set = None
         self.training_stats = {}
+        # Model fitting: fast mode and the threads it may use
+        self.model_trainer = ModelTrainer(fast=fast_training, thread_budget=training_threads)
         
         print(f"🚀 Real Dataset Trainer initialized")
         if sample_limit:
@@ -233,6 +143,7 @@ class RealDatasetTrainer:
         
         # Apply sample limit if specified
         total_samples = len(dataset)
+        dataset_indices = list(range(total_samples))
         if self.sample_limit and self.sample_limit < total_samples:
             print(f"🔄 Using {self.sample_limit} samples out of {total_samples}")
             # Create a balanced subset
@@ -248,37 +159,45 @@ class RealDatasetTrainer:
             
             # Filter dataset
             dataset = dataset.select(selected_indices)
+            dataset_indices = selected_indices
             print(f"✅ Selected balanced subset: {len(dataset)} samples")
         
         print(f"🔊 Processing {len(dataset)} audio samples...")
         
-        # Process each sample
+        # Decode samples here while the workers extract features of earlier ones
         successful_samples = 0
         failed_samples = 0
+        decoded = []  # (label, source) of every clip sent for feature extraction
         
-        for i, sample in enumerate(tqdm(dataset, desc="Processing audio")):
-            try:
-                # Process audio
-                audio = self.processor.process_audio_sample(sample['audio'])
+        def decoded_clips():
+            nonlocal failed_samples
+            for i, (index, sample) in enumerate(zip(dataset_indices, dataset)):
+                try:
+                    audio = self.processor.process_audio_sample(sample['audio'])
+                except Exception as e:
+                    print(f"Error processing sample {i}: {e}")
+                    audio = None
                 if audio is None:
                     failed_samples += 1
                     continue
-                
-                # Extract features
-                features = self.feature_extractor.extract_features(audio)
-                if features is None:
-                    failed_samples += 1
-                    continue
-                
-                features_list.append(features)
-                labels_list.append(sample['label'])  # 0=real, 1=fake
-                sources_list.append(sample.get('source', 'unknown'))
-                successful_samples += 1
-                
-            except Exception as e:
-                print(f"Error processing sample {i}: {e}")
+                decoded.append((sample['label'], sample.get('source', 'unknown')))
+                sample_id = sample['audio'].get('path') or f"train/{index}"
+                yield sample_id, audio, self.processor.target_sr
+        
+        # Extract features with the production preprocessing; stored ones are reused
+        all_features = extract_with_store(self.feature_store, self.parallel_extractor, decoded_clips(),
+                                          total=len(dataset), desc="Processing audio")
+        self.parallel_extractor.report()
+        self.parallel_extractor.shutdown()
+        
+        for (label, source), features in zip(decoded, all_features):
+            if features is None:
                 failed_samples += 1
                 continue
+            features_list.append(features)
+            labels_list.append(label)  # 0=real, 1=fake
+            sources_list.append(source)
+            successful_samples += 1
         
         print(f"✅ Successfully processed: {successful_samples} samples")
         print(f"❌ Failed to process: {failed_samples} samples")
@@ -316,6 +235,9 @@ class RealDatasetTrainer:
         X_train_scaled = self.scaler.fit_transform(X_train)
         X_test_scaled = self.scaler.transform(X_test)
         
+        # Held-out samples that later retrained models are checked against
+        self.canary_set = (X_test, y_test)
+        
         # Define models
         models_config = {
             'xgboost': {
@@ -354,39 +276,24 @@ class RealDatasetTrainer:
             }
         }
         
-        # Train each model
+        # Train all models (fast mode: cached folds, early stopping, models in parallel)
+        results = self.model_trainer.train_all(
+            {name: config['model'] for name, config in models_config.items()},
+            X_train_scaled, y_train, X_test_scaled, y_test
+        )
         for name, config in models_config.items():
-            print(f"\n🔥 Training {config['description']}...")
-            
-            start_time = datetime.now()
-            model = config['model']
-            
-            # Train model
-            model.fit(X_train_scaled, y_train)
-            
-            # Make predictions
-            y_pred = model.predict(X_test_scaled)
-            y_pred_proba = model.predict_proba(X_test_scaled)
-            
-            # Calculate metrics
-            accuracy = accuracy_score(y_test, y_pred)
-            auc_score = roc_auc_score(y_test, y_pred_proba[:, 1])
-            training_time = (datetime.now() - start_time).total_seconds()
-            
-            # Store results
-            self.models[name] = model
-            self.training_stats[name] = {
-                'accuracy': accuracy,
-                'auc_score': auc_score,
-                'training_time': training_time,
-                'test_predictions': y_pred,
-                'test_probabilities': y_pred_proba
-            }
+            stats = results[name]
+            self.models[name] = stats.pop('model')
+            stats['test_predictions'] = stats.pop('predictions')
+            stats['test_probabilities'] = stats.pop('probabilities')
+            self.training_stats[name] = stats
             
             print(f"✅ {config['description']} Results:")
-            print(f"   Accuracy: {accuracy:.4f}")
-            print(f"   AUC Score: {auc_score:.4f}")
-            print(f"   Training Time: {training_time:.2f}s")
+            print(f"   Accuracy: {stats['accuracy']:.4f}")
+            print(f"   AUC Score: {stats['auc_score']:.4f}")
+            print(f"   Training Time: {stats['training_time']:.2f}s")
+            print(f"   Prediction: {stats['predict_single_ms']:.2f} ms per clip, "
+                  f"size {stats['model_size_bytes'] / 1024:.0f} KB")
         
         # Print detailed classification reports
         print(f"\n📊 Detailed Results:")
@@ -402,40 +309,29 @@ class RealDatasetTrainer:
         
         print(f"💾 Saving models to {output_path}")
         
-        # Save each model
-        for name, model in self.models.items():
-            model_file = output_path / f"{name}_model.pkl"
-            joblib.dump(model, model_file)
-            print(f"✅ Saved {name} model")
-        
-        # Save scaler
-        scaler_file = output_path / "scaler.pkl"
-        joblib.dump(self.scaler, scaler_file)
-        print(f"✅ Saved feature scaler")
-        
         # Find best model
         best_model = max(self.training_stats.items(), key=lambda x: x[1]['accuracy'])
         
         # Save metadata
         metadata = {
             'best_model': best_model[0],
-            'models': {name: {
-                'accuracy': stats['accuracy'],
-                'auc_score': stats['auc_score'],
-                'training_time': stats['training_time']
-            } for name, stats in self.training_stats.items()},
+            'models': {name: model_report(stats) for name, stats in self.training_stats.items()},
+            'training_mode': 'fast' if self.model_trainer.fast else 'standard',
             'feature_extractor_type': 'Real_Dataset_Comprehensive_Acoustic',
+            **self.feature_extractor.schema_metadata(),
+            'feature_extraction_ms': self.parallel_extractor.average_extraction_ms(),
+            'feature_extraction_throughput': self.parallel_extractor.throughput(),
             'training_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'num_features': len(self.feature_extractor.extract_features(np.random.randn(22050))),
-            'dataset_source': 'HuggingFace_ArissBandoss_fake_or_real_dataset',
-            'sample_rate': self.feature_extractor.target_sr
+            'dataset_source': 'HuggingFace_ArissBandoss_fake_or_real_dataset'
         }
         
-        metadata_file = output_path / "model_metadata.json"
-        with open(metadata_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
-        
-        print(f"✅ Saved metadata")
+        # Scaler, models and metadata go into one bundle
+        # The canary set is this run's held-out split and is replaced with the bundle
+        bundle_hash = save_bundle(output_path, self.models, self.scaler, metadata, canary_set=self.canary_set)
+        print(f"✅ Saved model bundle {output_path / BUNDLE_FILENAME}")
+        print(f"   Content hash: {bundle_hash}")
+        if self.canary_set is not None:
+            print(f"✅ Saved canary set ({len(self.canary_set[1])} samples)")
         print(f"🏆 Best model: {best_model[0]} (Accuracy: {best_model[1]['accuracy']:.4f})")
 
 def main():
@@ -447,6 +343,7 @@ def main():
     # Configuration
     dataset_path = "Voice_Dataset/fake_or_real_dataset"
     sample_limit = None  # Use None for full dataset, or set a number like 5000 for faster testing
+    fast_training = False  # True: hist trees, early stopping and all models trained in parallel
     
     # Check if dataset exists
     if not Path(dataset_path).exists():
@@ -456,7 +353,7 @@ def main():
     
     try:
         # Initialize trainer
-        trainer = RealDatasetTrainer(dataset_path, sample_limit=sample_limit)
+        trainer = RealDatasetTrainer(dataset_path, sample_limit=sample_limit, fast_training=fast_training)
         
         # Prepare training data
         X, y = trainer.prepare_training_data()